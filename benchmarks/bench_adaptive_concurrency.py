@@ -0,0 +1,99 @@
+"""Fixed pool vs AIMD limiter against a simulated rate-limited provider.
+
+The stand-in provider serves up to `capacity` calls at once; calls beyond
+that get a 429 after a short delay, like a real per-key concurrency limit.
+Every call takes `latency` seconds. Chunk calls go through the real
+_process_chunks_parallel, so the limiter, the SDK-retry override and the
+throttle retries are all exercised; only call_llm_with_system is replaced.
+
+Usage: python benchmarks/bench_adaptive_concurrency.py [chunks] [capacity] [latency_ms]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import concurrency, config, llm_client  # noqa: E402
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class SimulatedProvider:
+    def __init__(self, capacity: int, latency: float):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.calls = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, system_prompt, user_prompt, model=None, temperature=0.3, max_retries=None):
+        with self.lock:
+            self.calls += 1
+            over = self.in_flight >= self.capacity
+            if over:
+                self.throttled += 1
+            else:
+                self.in_flight += 1
+        if over:
+            time.sleep(self.latency / 10)
+            raise RateLimitError("429 Too Many Requests")
+        try:
+            time.sleep(self.latency)
+            return json.dumps({"moments": []})
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def run(label: str, chunks: int, provider: SimulatedProvider, adaptive: bool) -> None:
+    concurrency._limiter = None
+    concurrency._latency_tracker = None
+    run_config = replace(config.default_run_config(), adaptive_concurrency=adaptive, hedged_requests=False,
+                         cache_enabled=False, compact_prompts=False)
+    texts = [f"chunk {i}" for i in range(chunks)]
+
+    started = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        llm_client._process_chunks_parallel(texts, run_config)
+    elapsed = time.monotonic() - started
+
+    answered = provider.calls - provider.throttled
+    line = (f"{label:>22}: {elapsed:5.2f}s, {answered}/{chunks} chunks answered, {provider.calls} calls, "
+            f"{provider.throttled / max(provider.calls, 1):.0%} throttled")
+    if adaptive:
+        history = concurrency.get_llm_limiter().metrics()["history"]
+        limits = [h["limit"] for h in history]
+        line += f", limit {min(limits)}..{max(limits)} (final {limits[-1]})"
+    print(line)
+
+
+def main():
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 50.0) / 1000
+
+    # Scale retry backoff to the simulated latency
+    config.THROTTLE_RETRY_BASE_SECONDS = latency / 5
+    original = llm_client.call_llm_with_system
+    try:
+        print(f"Provider: {capacity} concurrent calls, {latency * 1000:.0f} ms per call")
+        llm_client.call_llm_with_system = provider = SimulatedProvider(capacity, latency)
+        run(f"fixed pool of {config.MAX_PARALLEL_CHUNKS}", chunks, provider, adaptive=False)
+        llm_client.call_llm_with_system = provider = SimulatedProvider(capacity, latency)
+        run("adaptive (AIMD)", chunks, provider, adaptive=True)
+    finally:
+        llm_client.call_llm_with_system = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Output tokens and latency of the compact vs legacy cut sheet protocols.
+
+The compact protocol (src.cutsheets.CUT_SHEET_PROMPT) answers with only the
+cut sheet fields keyed by moment id. The legacy protocol, kept below as it
+shipped before the switch, echoed every moment header and persona caption
+block ahead of each cut sheet. Both prompts are built from
+tests/fixtures/cutsheets/moments.json.
+
+--live sends each prompt to the primary model (needs OPENAI_API_KEY), times
+every call and saves the responses and latencies under
+benchmarks/captures/cutsheets/. Runs without --live re-measure those saved
+captures. Before any live run has been captured, the hand-written parser
+fixtures are counted instead; they have no timings, so only token counts
+are reported, and the output says so.
+
+Usage: python benchmarks/bench_cutsheet_tokens.py [--live] [--runs N]
+"""
+
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_prompt_tokens import token_counter  # noqa: E402
+from src import config  # noqa: E402
+from src.cutsheet_fields import create_fallback_cut_sheet  # noqa: E402
+from src.cutsheets import CUT_SHEET_PROMPT, format_moments_for_cutsheet_prompt, parse_cut_sheet_response  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures", "cutsheets")
+CAPTURES = os.path.join(ROOT, "benchmarks", "captures", "cutsheets")
+PROTOCOLS = ("legacy", "compact")
+
+LEGACY_CUT_SHEET_PROMPT = r"""
+You are optimizing already-extracted viral moments for a short-form video editor.
+
+INPUT:
+I will give you one or more "Moment" blocks in the following format:
+
+MOMENT HEADER
+- timestamps: 00:00–00:00
+- quote: "EXACT RAW QUOTE"
+- clip duration: X seconds
+- viral trigger: TRIGGER_TAG
+- why it hits: one blunt sentence
+- energy tag: 3–5 words
+- flags: (may be empty, or contain BROKEN RULE MAJOR REEL, REWATCH, SILENCE FIX
+REQUIRED)
+
+PERSONA CAPTION LINES
+- Historian: ...
+- Thomist: ...
+- Ex-Protestant: ...
+- Meme Catholic: ...
+- Old World Catholic: ...
+- Catholic: ...
+
+TASK:
+For EACH moment you receive, keep the original content untouched, and ADD an "EDITOR
+CUT SHEET" section directly under it.
+
+Do NOT change any quotes or captions.
+
+For every moment, output exactly this structure:
+
+MOMENT HEADER
+[unchanged, copy from input]
+
+PERSONA CAPTION LINES
+[unchanged, copy from input]
+
+EDITOR CUT SHEET
+- clip_label: [UPPER_SNAKE_CASE name for the moment]
+- in_point: [copy start timestamp from moment header]
+- out_point: [copy end timestamp from moment header]
+- aspect_ratio: 9:16
+- crop_note: [1 short line: e.g. "tight on face, slow push in", "medium shot, quick punch-in on last
+line"]
+- opening_hook_subtitle: [1–2 lines under 3 seconds, strongest idea in the quote]
+- emphasis_words_caps: [3–8 words or phrases from the quote to be in ALL CAPS in subtitles]
+- pacing_note: [e.g. "fast, no pauses", "let last line breathe", "trim any filler before the hook"]
+- b_roll_ideas: [optional; only if naturally obvious, 1 short line or "none"]
+- text_on_screen_idea: [optional big text word/phrase or "none"]
+- silence_handling: ["none", "hard cut silence", or "cover with b-roll"] — if the moment was
+flagged SILENCE FIX REQUIRED, you MUST choose one.
+- thumbnail_text: [2–5 word all-caps phrase that matches the punch of the quote]
+- thumbnail_face_cue: [1 short line: e.g., "use frame where he leans in", "use frame where he
+looks deadly serious"]
+- platform_priority: [TikTok / Reels / YouTube Shorts / All]
+- use_persona_caption: [choose the single strongest persona caption line to use as default;
+copy it exactly]
+
+RULES:
+- Never paraphrase the quote or the persona captions.
+- Keep all notes short, sharp, and literal so the editor can execute without thinking.
+- Always make the opening_hook_subtitle the hardest-hitting idea from the quote.
+- Thumbnail_text must be brutal and simple, not pious or wordy.
+"""
+
+
+def format_moments_legacy(moments):
+    """The legacy MOMENT HEADER / PERSONA CAPTION LINES input blocks."""
+    blocks = []
+    for moment in moments:
+        duration = moment.get("clip_duration_seconds")
+        captions = moment.get("persona_captions", {})
+        blocks.append("\n".join([
+            "MOMENT HEADER",
+            f"- timestamps: {moment.get('timestamps', '')}",
+            f"- quote: \"{moment.get('quote', '')}\"",
+            f"- clip duration: {duration} seconds" if duration else "- clip duration: unknown",
+            f"- viral trigger: {moment.get('viral_trigger', '')}",
+            f"- why it hits: {moment.get('why_it_hits', '')}",
+            f"- energy tag: {moment.get('energy_tag', '')}",
+            f"- flags: {', '.join(moment.get('flags', []))}" if moment.get("flags") else "- flags: ",
+            "",
+            "PERSONA CAPTION LINES",
+            f"- Historian: {captions.get('historian', '')}",
+            f"- Thomist: {captions.get('thomist', '')}",
+            f"- Ex-Protestant: {captions.get('ex_protestant', '')}",
+            f"- Meme Catholic: {captions.get('meme_catholic', '')}",
+            f"- Old World Catholic: {captions.get('old_world_catholic', '')}",
+            f"- Catholic: {captions.get('catholic', '')}",
+        ]))
+    return "\n\n" + "=" * 60 + "\n\n".join([""] + blocks)
+
+
+def build_prompt(protocol, moments):
+    if protocol == "legacy":
+        return f"{LEGACY_CUT_SHEET_PROMPT}\n\n{format_moments_legacy(moments)}"
+    return f"{CUT_SHEET_PROMPT}\n\n{format_moments_for_cutsheet_prompt(moments)}"
+
+
+def capture(moments, runs):
+    """Call the model with both prompts, saving each response and its latency."""
+    from src.llm_client import call_llm
+
+    model = config.default_run_config().primary_model
+    seconds = {}
+    for run in range(1, runs + 1):
+        # Alternate the order so neither protocol always runs on a warm connection
+        for protocol in (PROTOCOLS if run % 2 else PROTOCOLS[::-1]):
+            started = time.monotonic()
+            response = call_llm(build_prompt(protocol, moments), model=model)
+            name = f"{protocol}_{run}.txt"
+            seconds[name] = time.monotonic() - started
+            os.makedirs(CAPTURES, exist_ok=True)
+            with open(os.path.join(CAPTURES, name), "w", encoding="utf-8") as f:
+                f.write(response)
+            print(f"[bench] {name}: {seconds[name]:.1f}s")
+    with open(os.path.join(CAPTURES, "timings.json"), "w", encoding="utf-8") as f:
+        json.dump({"model": model, "seconds": seconds}, f, indent=2)
+
+
+def load_responses():
+    """Return ({protocol: [(text, seconds or None)]}, source label)."""
+    timings_path = os.path.join(CAPTURES, "timings.json")
+    if os.path.exists(timings_path):
+        with open(timings_path, encoding="utf-8") as f:
+            timings = json.load(f)
+        responses = {protocol: [] for protocol in PROTOCOLS}
+        for name, seconds in sorted(timings["seconds"].items()):
+            with open(os.path.join(CAPTURES, name), encoding="utf-8") as f:
+                responses[name.split("_", 1)[0]].append((f.read(), seconds))
+        return responses, f"captured from {timings['model']}"
+
+    print("[bench] No live captures yet (run with --live); counting the hand-written parser fixtures, "
+          "which have no timings")
+    responses = {}
+    for protocol in PROTOCOLS:
+        with open(os.path.join(FIXTURES, f"{protocol}_response.txt"), encoding="utf-8") as f:
+            responses[protocol] = [(f.read(), None)]
+    return responses, "hand-written fixtures"
+
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 3
+    with open(os.path.join(FIXTURES, "moments.json"), encoding="utf-8") as f:
+        moments = json.load(f)
+    if "--live" in args:
+        capture(moments, runs)
+
+    count, label = token_counter()
+    responses, source = load_responses()
+    print(f"Token counts: {label}; responses: {source}; {len(moments)} moments")
+
+    results = {}
+    for protocol in PROTOCOLS:
+        texts = [text for text, _ in responses[protocol]]
+        seconds = [s for _, s in responses[protocol] if s is not None]
+        with contextlib.redirect_stdout(io.StringIO()):
+            parsed = [parse_cut_sheet_response(text, moments) for text in texts]
+        # Moments the response actually covered (the rest get a fallback cut sheet)
+        covered = sum(
+            1 for moments_out in parsed for m, original in zip(moments_out, moments)
+            if m["editor_cut_sheet"] != create_fallback_cut_sheet(original)
+        )
+        results[protocol] = (statistics.mean(count(t) for t in texts), statistics.median(seconds) if seconds else None)
+        latency = f"median {results[protocol][1]:.1f}s" if seconds else "no timings"
+        print(f"{protocol:>8}: input {count(build_prompt(protocol, moments)):,} tokens, "
+              f"output {results[protocol][0]:,.0f} tokens (mean of {len(texts)}), {latency}, "
+              f"{covered}/{len(moments) * len(texts)} cut sheets parsed")
+
+    (legacy_tokens, legacy_s), (compact_tokens, compact_s) = results["legacy"], results["compact"]
+    line = f"compact vs legacy: {compact_tokens / legacy_tokens - 1:+.0%} output tokens"
+    if legacy_s and compact_s:
+        line += f", {compact_s / legacy_s - 1:+.0%} latency"
+    print(line)
+
+
+if __name__ == "__main__":
+    main()
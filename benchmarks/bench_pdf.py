@@ -0,0 +1,73 @@
+"""PDF export throughput (pages/sec) for each layout.
+
+Usage: python benchmarks/bench_pdf.py [clip_count] [repeats]
+"""
+
+import os
+import re
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.export_utils_pdf import PDF_LAYOUTS, write_pdf  # noqa: E402
+
+_PAGE_RE = re.compile(rb"/Type\s*/Page[^s]")
+
+
+def synthetic_moments(n: int):
+    """Clips with realistic field lengths (long quote, six persona captions)."""
+    return [
+        {
+            "id": f"m{i:05d}",
+            "timestamps": "12:01.00-12:44.50",
+            "quote": "The Church does not invent the sacraments; she receives them. " * 6,
+            "clip_duration_seconds": 43,
+            "viral_trigger": "Contrast",
+            "why_it_hits": "Turns a common objection around in one line.",
+            "energy_tag": "HIGH",
+            "flags": ["quote"],
+            "persona_captions": {key: "A caption of ordinary length for this persona." for key in (
+                "historian", "thomist", "ex_protestant", "meme_catholic", "old_world_catholic", "catholic")},
+            "editor_cut_sheet": {
+                "clip_label": f"SACRAMENTS_{i}",
+                "in_point": "12:01.00",
+                "out_point": "12:44.50",
+                "aspect_ratio": "9:16",
+                "opening_hook_subtitle": "She receives them",
+                "emphasis_words_caps": ["RECEIVES", "SACRAMENTS"],
+                "b_roll_ideas": "Altar, chalice close-up",
+                "thumbnail_text": "NOT INVENTED",
+                "platform_priority": "Reels",
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def bench(layout: str, moments, repeats: int):
+    best = None
+    pages = 0
+    for _ in range(repeats):
+        buffer = BytesIO()
+        started = time.perf_counter()
+        write_pdf(moments, buffer, {"title": "Benchmark"}, layout=layout)
+        elapsed = time.perf_counter() - started
+        pages = len(_PAGE_RE.findall(buffer.getvalue()))
+        best = elapsed if best is None else min(best, elapsed)
+    return pages, best
+
+
+def main():
+    clips = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    moments = synthetic_moments(clips)
+    for layout in PDF_LAYOUTS:
+        pages, seconds = bench(layout, moments, repeats)
+        print(f"{layout:>6}: {clips} clips, {pages} pages in {seconds:.3f}s "
+              f"-> {pages / seconds:.1f} pages/s, {clips / seconds:.1f} clips/s")
+
+
+if __name__ == "__main__":
+    main()
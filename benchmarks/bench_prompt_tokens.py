@@ -0,0 +1,93 @@
+"""Input tokens per extraction chunk with and without compact prompts.
+
+Counts real tokens with tiktoken (o200k_base, the GPT-4o/4.1/5 encoding)
+when it is installed and its encoding file is available; otherwise falls
+back to the ~4 characters/token estimate and says so.
+
+Usage: python benchmarks/bench_prompt_tokens.py [transcript.txt]
+"""
+
+import os
+import random
+import sys
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config  # noqa: E402
+from src.llm_client import build_chunk_prompt, build_system_prompt, split_transcript_into_chunks  # noqa: E402
+from src.transcript_utils import seconds_to_timestamp  # noqa: E402
+
+SENTENCES = [
+    "The Church does not invent the sacraments, she receives them from Christ.",
+    "If the Eucharist is only a symbol, why did so many disciples walk away in John six?",
+    "Grace does not destroy nature, it perfects it.",
+    "Every saint has a past and every sinner has a future.",
+    "We are not saved by feelings, we are saved by a person.",
+    "You cannot love what you refuse to know.",
+    "The early Christians were not Protestants, and you can read them for yourself.",
+    "Confession is not a courtroom, it is a hospital.",
+]
+
+
+def synthetic_transcript(lines: int, words_per_line: int, seconds_per_line: float, seed: int = 0) -> str:
+    """Timestamped lines cut from a stream of sermon-like sentences."""
+    rng = random.Random(seed)
+    words = []
+    while len(words) < lines * words_per_line:
+        words.extend(rng.choice(SENTENCES).split())
+    out = []
+    for i in range(lines):
+        start, end = i * seconds_per_line, (i + 1) * seconds_per_line
+        text = " ".join(words[i * words_per_line:(i + 1) * words_per_line])
+        out.append(f"[{seconds_to_timestamp(start)}–{seconds_to_timestamp(end)}] {text}")
+    return "\n".join(out)
+
+
+def token_counter():
+    """Return (count_fn, label): tiktoken when usable, else chars/4."""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return (lambda text: len(encoding.encode(text))), "tiktoken o200k_base"
+    except Exception as e:  # Not installed, or the encoding file can't be fetched
+        print(f"[bench] tiktoken unavailable ({e.__class__.__name__}) – estimating 4 chars/token")
+        return (lambda text: len(text) // 4), "chars/4 estimate"
+
+
+def measure(transcript: str, count) -> dict:
+    results = {}
+    for compact in (False, True):
+        run_config = replace(config.default_run_config(), compact_prompts=compact)
+        chunks = split_transcript_into_chunks(transcript, run_config.chars_per_chunk)
+        system_tokens = count(build_system_prompt(run_config.fused_cut_sheets, compact))
+        user_tokens = sum(
+            count(build_chunk_prompt(chunk, i, len(chunks), run_config)[0])
+            for i, chunk in enumerate(chunks, 1)
+        )
+        results[compact] = (len(chunks), system_tokens * len(chunks) + user_tokens)
+    return results
+
+
+def main():
+    count, label = token_counter()
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            samples = {os.path.basename(sys.argv[1]): f.read()}
+    else:
+        samples = {
+            "auto captions (600 x 3s lines)": synthetic_transcript(600, 7, 3.0),
+            "whisper (300 x 6s lines)": synthetic_transcript(300, 18, 6.0),
+        }
+
+    print(f"Token counts: {label}")
+    for name, transcript in samples.items():
+        results = measure(transcript, count)
+        (chunks_full, full), (chunks_compact, compact) = results[False], results[True]
+        saved = 1 - compact / full if full else 0.0
+        print(f"{name}: full {full:,} tokens in {chunks_full} chunks, "
+              f"compact {compact:,} tokens in {chunks_compact} chunks -> {saved:.1%} fewer input tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Asynchronous Apify client for YouTube transcript runs.
+
+Instead of blocking a thread on run-sync-get-dataset-items for up to five
+minutes, each video starts an actor run, polls its status with exponential
+backoff and then pages through the run's dataset. Many videos can be fetched
+concurrently from a single event loop without pinning threads.
+
+Endpoints used (Apify API v2):
+    POST /v2/acts/{actor_id}/runs             start a run
+    GET  /v2/actor-runs/{run_id}              run status
+    GET  /v2/datasets/{dataset_id}/items      dataset items (offset/limit)
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from src import config
+from src.transcript_utils import (
+    build_apify_payload,
+    build_video_metadata,
+    flatten_transcript,
+    normalize_youtube_url,
+    validate_apify_items,
+)
+
+# Terminal run states reported by Apify
+RUN_SUCCEEDED = "SUCCEEDED"
+RUN_FAILED_STATES = {"FAILED", "TIMED-OUT", "ABORTED"}
+
+
+class ApifyAsyncClient:
+    """Minimal async wrapper around the Apify run/dataset endpoints.
+
+    Use as an async context manager so the underlying httpx.AsyncClient
+    (and its connection pool) is closed afterwards. It is not taken from
+    src.http_clients: async connections are bound to the event loop that
+    opened them, so one client serves one event loop. Fetch many videos
+    through fetch_transcripts_async to share its pool.
+    """
+
+    def __init__(self, token: Optional[str] = None, actor_id: Optional[str] = None,
+                 base_url: Optional[str] = None, timeout: float = 30.0):
+        import httpx
+
+        if not (token and actor_id):
+            config.validate_config()
+        self.token = token or config.APIFY_TOKEN
+        self.actor_id = actor_id or config.APIFY_ACTOR_ID
+        self.base_url = (base_url or config.APIFY_BASE_URL).rstrip("/")
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.token}"},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            ),
+        )
+
+    async def __aenter__(self) -> "ApifyAsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        response = await self._http.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"Apify request {method} {path} failed ({response.status_code}): {response.text}"
+            )
+        return response.json()
+
+    async def start_run(self, run_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Start an actor run and return its run object."""
+        body = await self._request("POST", f"/v2/acts/{self.actor_id}/runs", json=run_input)
+        return body.get("data", body)
+
+    async def get_run(self, run_id: str) -> Dict[str, Any]:
+        """Fetch the current run object."""
+        body = await self._request("GET", f"/v2/actor-runs/{run_id}")
+        return body.get("data", body)
+
+    async def wait_for_run(self, run_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Poll a run with exponential backoff until it reaches a terminal state.
+
+        Raises:
+            RuntimeError: If the run fails, is aborted, or exceeds the timeout
+        """
+        timeout = timeout or config.APIFY_RUN_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout
+        delay = config.APIFY_POLL_INITIAL_SECONDS
+
+        while True:
+            run = await self.get_run(run_id)
+            status = run.get("status", "")
+            if status == RUN_SUCCEEDED:
+                return run
+            if status in RUN_FAILED_STATES:
+                raise RuntimeError(f"Apify run {run_id} ended with status {status}")
+            if time.monotonic() + delay > deadline:
+                raise RuntimeError(f"Apify run {run_id} did not finish within {timeout:.0f}s (last status: {status})")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, config.APIFY_POLL_MAX_SECONDS)
+
+    async def iter_dataset_items(self, dataset_id: str, page_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield dataset items page by page."""
+        page_size = page_size or config.APIFY_DATASET_PAGE_SIZE
+        offset = 0
+
+        while True:
+            page = await self._request(
+                "GET",
+                f"/v2/datasets/{dataset_id}/items",
+                params={"offset": offset, "limit": page_size, "clean": "true", "format": "json"},
+            )
+            if not isinstance(page, list):
+                raise RuntimeError(f"Unexpected dataset page from Apify: {page!r}")
+            for item in page:
+                yield item
+            if len(page) < page_size:
+                return
+            offset += len(page)
+
+    async def run_and_collect(self, run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Start a run, wait for it and return all of its dataset items."""
+        run = await self.start_run(run_input)
+        run_id = run.get("id")
+        if not run_id:
+            raise RuntimeError(f"Apify did not return a run id: {run!r}")
+
+        run = await self.wait_for_run(run_id)
+        dataset_id = run.get("defaultDatasetId")
+        if not dataset_id:
+            raise RuntimeError(f"Apify run {run_id} has no default dataset")
+
+        return [item async for item in self.iter_dataset_items(dataset_id)]
+
+
+async def fetch_transcript_async(client: ApifyAsyncClient, youtube_url: str, language: str = "en") -> Tuple[str, Dict[str, Any]]:
+    """Async equivalent of get_transcript_from_youtube using a run + dataset.
+
+    Returns:
+        Tuple of (formatted_transcript_text, metadata_dict)
+    """
+    canonical_url = normalize_youtube_url(youtube_url)
+    items = await client.run_and_collect(build_apify_payload(canonical_url, language))
+    item = validate_apify_items(items, canonical_url)
+    return flatten_transcript(item), build_video_metadata(item, youtube_url, language)
+
+
+async def fetch_transcripts_async(
+    youtube_urls: Sequence[str],
+    language: str = "en",
+    max_concurrency: Optional[int] = None,
+    base_url: Optional[str] = None,
+) -> List[Union[Tuple[str, Dict[str, Any]], Exception]]:
+    """Fetch transcripts for many videos concurrently.
+
+    Args:
+        youtube_urls: Video URLs (any YouTube format)
+        language: Transcript language
+        max_concurrency: Simultaneous actor runs (defaults to APIFY_MAX_CONCURRENT_RUNS)
+        base_url: Override the Apify API base URL (e.g. a local fake server)
+
+    Returns:
+        One entry per URL, in order: (transcript_text, metadata) on success or
+        the exception raised for that video.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or config.APIFY_MAX_CONCURRENT_RUNS)
+
+    async with ApifyAsyncClient(base_url=base_url) as client:
+        async def fetch_one(url: str):
+            async with semaphore:
+                return await fetch_transcript_async(client, url, language)
+
+        return await asyncio.gather(*(fetch_one(url) for url in youtube_urls), return_exceptions=True)
+
+
+def get_transcripts_from_youtube_batch(youtube_urls: Sequence[str], language: str = "en",
+                                       max_concurrency: Optional[int] = None) -> List[Union[Tuple[str, Dict[str, Any]], Exception]]:
+    """Blocking wrapper around fetch_transcripts_async for non-async callers."""
+    return asyncio.run(fetch_transcripts_async(youtube_urls, language, max_concurrency))
@@ -8,18 +8,28 @@ import streamlit as st
 import traceback
 import sys
 import os
+import tempfile
+from dataclasses import replace
 from typing import Optional, Dict, Any
 
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src import config
+from src import http_clients
 from src.transcript_utils import get_transcript_from_youtube
+from src.caption_utils import CAPTION_EXTENSIONS, parse_caption_file
+from src.upload_utils import open_upload_text, read_upload_text
 from src.llm_client import extract_moments
 from src.cutsheets import generate_cut_sheets
+from src.concurrency import concurrency_metrics
 from src.export_utils import to_csv, to_markdown, format_clip_summary
-from src.export_utils_pdf import clips_to_pdf
-from src.audio_utils import transcribe_video_to_text, get_supported_video_formats, format_file_size
+from src.export_nle import to_edl, to_fcpxml, to_premiere_xml
+from src.export_subtitles import SegmentIndex, build_clip_subtitles, build_transcript_index, subtitles_to_zip
+from src.audio_utils import (
+    transcribe_media, get_supported_video_formats, format_file_size, max_media_upload_bytes,
+    local_transcription_available,
+)
 
 
 def inject_catholic_gothic_css():
@@ -267,16 +277,33 @@ def inject_catholic_gothic_css():
     st.markdown(css, unsafe_allow_html=True)
 
 
-def run_catholic_cuts(transcript_text: str, source_id: str) -> tuple:
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_subtitle_index(transcript_text: str) -> SegmentIndex:
+    """Segment index of a transcript, parsed once and shared by the SRT and VTT exports."""
+    return build_transcript_index(transcript_text)
+
+
+@st.cache_resource
+def get_client_registry() -> http_clients.ClientRegistry:
+    """One pooled client registry shared by every session in this process."""
+    return http_clients.ClientRegistry()
+
+
+def run_catholic_cuts(transcript_text: str, source_id: str, run_config: Optional[config.RunConfig] = None,
+                      intensity: Optional[Dict[str, Any]] = None) -> tuple:
     """Unified pipeline entry point for Catholic Cuts processing.
 
     Args:
         transcript_text: The transcript to process
         source_id: Identifier for the source (URL, filename, etc.)
+        run_config: Per-run settings (defaults to the module defaults)
+        intensity: Optional audio intensity timeline from transcription
 
     Returns:
         Tuple of (moments_with_cuts, metadata) or None on error
     """
+    run_config = run_config or config.default_run_config()
+
     try:
         # Create basic metadata
         metadata = {
@@ -287,7 +314,7 @@ def run_catholic_cuts(transcript_text: str, source_id: str) -> tuple:
 
         # Extract moments using existing LLM client
         st.info("🎯 **Extracting viral moments...**")
-        moments = extract_moments(transcript_text, metadata)
+        moments = extract_moments(transcript_text, metadata, run_config, intensity)
 
         if not moments:
             st.warning("⚠️ No viral moments found in the transcript.")
@@ -297,7 +324,7 @@ def run_catholic_cuts(transcript_text: str, source_id: str) -> tuple:
 
         # Generate cut sheets using existing function
         st.info("📋 **Generating editor cut sheets...**")
-        moments_with_cuts = generate_cut_sheets(moments)
+        moments_with_cuts = generate_cut_sheets(moments, run_config)
         st.success("✅ Cut sheets generated successfully")
 
         return moments_with_cuts, metadata
@@ -319,22 +346,51 @@ def render_input_section():
 
     with tab1:
         st.markdown("### Upload Transcript File")
-        st.markdown("*Upload a .txt or .md file containing your transcript*")
+        st.markdown("*Upload a .txt or .md transcript, or SRT/VTT/JSON3 captions (timestamps are kept)*")
 
         transcript_file = st.file_uploader(
             "Choose transcript file",
-            type=['txt', 'md'],
-            help="Upload a text or markdown file containing the transcript",
+            type=['txt', 'md'] + list(CAPTION_EXTENSIONS),
+            help="Upload a text/markdown transcript or a caption file exported from your editor or YouTube",
             key="transcript_uploader"
         )
 
         if transcript_file:
             try:
-                # Read the uploaded file
-                transcript_text = str(transcript_file.read(), "utf-8").strip()
+                caption_metadata = None
+                extension = os.path.splitext(transcript_file.name)[1].lstrip(".").lower()
+
+                if extension in CAPTION_EXTENSIONS:
+                    caption_kind = st.radio(
+                        "**Caption type**",
+                        ["Detect", "Auto-generated", "Edited"],
+                        horizontal=True,
+                        key="caption_kind",
+                        help="Auto-generated captions are merged from rolling fragments into sentences"
+                    )
+                    auto_generated = {"Auto-generated": True, "Edited": False}.get(caption_kind)
+
+                    # Captions are decoded and parsed line by line straight from the upload
+                    caption_stream = open_upload_text(transcript_file)
+                    try:
+                        transcript_text, caption_metadata = parse_caption_file(
+                            caption_stream, transcript_file.name, auto_generated=auto_generated
+                        )
+                    finally:
+                        caption_stream.detach()
+                else:
+                    # Decode the upload block by block
+                    transcript_text = read_upload_text(transcript_file).strip()
 
                 if transcript_text:
                     st.success(f"✅ **Transcript loaded:** {len(transcript_text)} characters")
+                    if caption_metadata:
+                        st.caption(
+                            f"{caption_metadata['caption_format'].upper()} captions"
+                            f"{' (auto-generated)' if caption_metadata['is_auto_generated'] else ''} • "
+                            f"{caption_metadata['segment_count']} segments • "
+                            f"{caption_metadata['duration_seconds'] // 60} min"
+                        )
 
                     # Show preview
                     with st.expander("👀 **Preview Transcript**"):
@@ -342,7 +398,7 @@ def render_input_section():
 
                     # Process button
                     if st.button("🚀 **Process Transcript**", type="primary", key="process_transcript"):
-                        process_content(transcript_text, transcript_file.name)
+                        process_content(transcript_text, transcript_file.name, caption_metadata)
                 else:
                     st.error("⚠️ **Uploaded file appears to be empty**")
 
@@ -355,7 +411,19 @@ def render_input_section():
 
         # Show supported formats
         formats = get_supported_video_formats()
-        st.caption(f"**Supported formats:** {', '.join(formats)} • **Max size:** 25MB")
+        backend = config.TRANSCRIPTION_BACKEND
+        if local_transcription_available():
+            backend = st.radio(
+                "Transcription engine",
+                options=["openai", "local"],
+                index=0 if config.TRANSCRIPTION_BACKEND == "openai" else 1,
+                format_func=lambda name: "OpenAI Whisper (hosted)" if name == "openai" else "Local faster-whisper (CPU, offline)",
+                horizontal=True,
+                key="transcription_backend",
+            )
+
+        max_upload = max_media_upload_bytes(backend)
+        st.caption(f"**Supported formats:** {', '.join(formats)} • **Max size:** {format_file_size(max_upload)}")
         st.caption("⚠️ **Cloud deployment note:** .mov/.mkv/.avi not supported on Streamlit Community Cloud")
 
         video_file = st.file_uploader(
@@ -371,22 +439,33 @@ def render_input_section():
             st.info(f"📁 **File:** {video_file.name} ({file_size})")
 
             # Check file size
-            if video_file.size > 25 * 1024 * 1024:  # 25MB limit
-                st.error("❌ **File too large.** Please upload a video smaller than 25MB.")
+            if video_file.size > max_upload:
+                st.error(f"❌ **File too large.** Please upload a video smaller than {format_file_size(max_upload)}.")
             else:
                 if st.button("🎙️ **Transcribe Video**", type="primary", key="transcribe_video"):
                     with st.spinner("🔄 **Transcribing video using AI...** This may take a few minutes."):
                         try:
-                            transcript_text = transcribe_video_to_text(video_file)
+                            transcript_text, transcribe_stats = transcribe_media(
+                                video_file, backend=backend, run_config=st.session_state.get("run_config")
+                            )
                             if transcript_text:
                                 st.success("✅ **Video transcribed successfully!**")
+                                if transcribe_stats["cache_hit"]:
+                                    st.caption("♻️ Reused the cached transcription for this file")
+                                else:
+                                    st.caption(
+                                        f"Transcribed {format_file_size(transcribe_stats['upload_bytes'])} "
+                                        f"(saved {format_file_size(transcribe_stats['bytes_saved'])}, "
+                                        f"{transcribe_stats['removed_seconds']:.0f}s of silence trimmed) • "
+                                        f"real-time factor {transcribe_stats['real_time_factor']:.2f}"
+                                    )
 
                                 # Show preview
                                 with st.expander("👀 **Preview Transcript**"):
                                     st.text_area("Transcript Preview", transcript_text[:500] + "..." if len(transcript_text) > 500 else transcript_text, height=150, disabled=True)
 
                                 # Process the transcription
-                                process_content(transcript_text, f"video-{video_file.name}")
+                                process_content(transcript_text, f"video-{video_file.name}", intensity=transcribe_stats.get("intensity"))
                             else:
                                 st.error("❌ **Transcription failed - no text extracted**")
                         except Exception as e:
@@ -462,7 +541,8 @@ def render_settings_section():
             max_value=15000,
             value=config.CHARS_PER_CHUNK,
             step=1000,
-            help="Larger chunks = fewer API calls but may reduce accuracy"
+            help="Larger chunks = fewer API calls but may reduce accuracy",
+            key="setting_chunk_size"
         )
 
     with col2:
@@ -471,12 +551,48 @@ def render_settings_section():
             min_value=1,
             max_value=10,
             value=config.MAX_MOMENTS_PER_CHUNK,
-            help="Maximum viral moments to extract per chunk"
+            help="Maximum viral moments to extract per chunk",
+            key="setting_max_moments"
         )
 
+    fused_cut_sheets = st.checkbox(
+        "**Single-pass cut sheets**",
+        value=config.FUSED_CUT_SHEETS,
+        help="Ask for cut sheets during extraction instead of a second AI pass",
+        key="setting_fused_cut_sheets"
+    )
+
+    intensity_skip_below = st.slider(
+        "**Skip flat audio below intensity**",
+        min_value=0.0,
+        max_value=1.0,
+        value=float(config.INTENSITY_SKIP_BELOW),
+        step=0.05,
+        help="For uploaded videos above 0, the audio is scored, chunks are extracted loudest/most animated first and chunks scoring below this are skipped (0 = no audio scoring)",
+        key="setting_intensity_skip_below"
+    )
+
+    batch_mode = st.checkbox(
+        "**Batch mode (bulk jobs)**",
+        value=config.EXECUTION_MODE == "batch",
+        help="Submit all AI calls as one OpenAI batch: cheaper and off the interactive rate limit, but results can take hours",
+        key="setting_batch_mode"
+    )
+
     # Cache settings
     st.markdown("### 💾 **Cache**")
-    cache_enabled = st.checkbox("**Enable Caching**", value=config.CACHE_ENABLED, help="Cache results to speed up re-processing")
+    cache_enabled = st.checkbox("**Enable Caching**", value=config.CACHE_ENABLED, help="Cache results to speed up re-processing", key="setting_cache_enabled")
+
+    # Settings apply to this session only; module defaults stay untouched
+    st.session_state.run_config = replace(
+        config.default_run_config(),
+        chars_per_chunk=int(chunk_size),
+        max_moments_per_chunk=int(max_moments),
+        fused_cut_sheets=fused_cut_sheets,
+        intensity_skip_below=float(intensity_skip_below),
+        execution_mode="batch" if batch_mode else "sync",
+        cache_enabled=cache_enabled,
+    )
 
     if cache_enabled and st.button("🗑️ **Clear Cache**", key="clear_cache"):
         try:
@@ -491,16 +607,34 @@ def render_settings_section():
     st.info(f"**Primary Model:** {config.PRIMARY_MODEL}")
     st.info(f"**Fast Model:** {config.FAST_MODEL}")
 
+    # Adaptive concurrency metrics (shared by all sessions in this process)
+    st.markdown("### 📈 **Concurrency**")
+    metrics = concurrency_metrics()
+    st.caption(
+        f"Adaptive limit: **{metrics['limit']}** concurrent AI calls "
+        f"(range {metrics['min_limit']}–{metrics['max_limit']}, {metrics['in_flight']} in flight, "
+        f"last latency {metrics['last_latency_seconds']}s)"
+    )
+    latency = metrics["latency"]
+    if latency["p95_seconds"] is not None:
+        st.caption(
+            f"Call latency p50 {latency['p50_seconds']}s · p95 {latency['p95_seconds']}s · "
+            f"hedged requests {latency['hedges']} ({latency['hedge_wins']} won) · "
+            f"losing calls billed {latency['hedge_losers_billed']} ({latency['hedge_losers_running']} still running)"
+        )
+    if len(metrics["history"]) > 1:
+        st.line_chart([h["limit"] for h in metrics["history"]])
+
     st.markdown('</div>', unsafe_allow_html=True)
 
 
-def process_content(transcript_text: str, source_id: str, metadata: Dict = None):
+def process_content(transcript_text: str, source_id: str, metadata: Dict = None, intensity: Optional[Dict[str, Any]] = None):
     """Process content through the Catholic Cuts pipeline and store results."""
     # NOTE: We do NOT render inside this function anymore; main() will call
     # render_results_section() exactly once to avoid duplicate Streamlit elements.
     with st.spinner("⚡ **Processing through Catholic Cuts pipeline...**"):
         moments_with_cuts, processed_metadata = run_catholic_cuts(
-            transcript_text, source_id
+            transcript_text, source_id, st.session_state.get("run_config"), intensity
         )
 
         if moments_with_cuts:
@@ -641,10 +775,22 @@ def render_results_section():
         col1, col2, col3 = st.columns([1, 1, 1])
 
         try:
+            # reportlab is only loaded once there is something to export
+            from src.export_utils_pdf import PDF_LAYOUTS, clips_to_pdf
+
+            pdf_layout = st.radio(
+                "**PDF layout**",
+                PDF_LAYOUTS,
+                format_func=lambda layout: {"simple": "Compact list", "flow": "Wrapped tables"}.get(layout, layout),
+                horizontal=True,
+                key="export_pdf_layout",
+                help="Wrapped tables keep long quotes and captions readable"
+            )
+
             # Generate export data
             csv_data = to_csv(moments_with_cuts)
             md_data = to_markdown(moments_with_cuts)
-            pdf_data = clips_to_pdf(moments_with_cuts, metadata)
+            pdf_data = clips_to_pdf(moments_with_cuts, metadata, layout=pdf_layout)
 
             # Use clip count in keys so they are always unique even across reruns
             key_suffix = len(moments_with_cuts)
@@ -679,6 +825,90 @@ def render_results_section():
                     help="One cut-sheet PDF for editors"
                 )
 
+            # NLE timelines built from the cut sheet in/out points
+            st.markdown("#### 🎞️ **Editing Timelines**")
+            col4, col5, col6 = st.columns([1, 1, 1])
+
+            with col4:
+                st.download_button(
+                    label="🎬 **Download EDL**",
+                    data=to_edl(moments_with_cuts, metadata),
+                    file_name="catholic_cuts_clips.edl",
+                    mime="text/plain",
+                    key=f"export_edl_{key_suffix}",
+                    help="CMX3600 EDL for any NLE"
+                )
+
+            with col5:
+                st.download_button(
+                    label="🍎 **Download FCPXML**",
+                    data=to_fcpxml(moments_with_cuts, metadata),
+                    file_name="catholic_cuts_clips.fcpxml",
+                    mime="application/xml",
+                    key=f"export_fcpxml_{key_suffix}",
+                    help="Final Cut Pro timeline (relink the offline source to your copy of the video)"
+                )
+
+            with col6:
+                st.download_button(
+                    label="🟣 **Download Premiere XML**",
+                    data=to_premiere_xml(moments_with_cuts, metadata),
+                    file_name="catholic_cuts_clips.xml",
+                    mime="application/xml",
+                    key=f"export_xmeml_{key_suffix}",
+                    help="Premiere Pro / FCP7 XML sequence (relink the offline source to your copy of the video)"
+                )
+
+            # Everything above in one ZIP, built only when asked for
+            st.markdown("#### 📦 **Export Bundle**")
+            if st.button("📦 **Prepare ZIP bundle**", key=f"export_bundle_prepare_{key_suffix}",
+                         help="CSV, Markdown, PDF and JSON with a manifest, in one ZIP"):
+                from src.export_bundle import write_export_bundle
+
+                bundle_file = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+                write_export_bundle(
+                    [{"moments_with_cuts": moments_with_cuts, "metadata": metadata}],
+                    bundle_file,
+                    use_processes=False,
+                    pdf_layout=pdf_layout,
+                )
+                bundle_file.seek(0)
+                st.download_button(
+                    label="📦 **Download ZIP bundle**",
+                    data=bundle_file,
+                    file_name="catholic_cuts_bundle.zip",
+                    mime="application/zip",
+                    key=f"export_bundle_{key_suffix}",
+                )
+
+            # Per-clip subtitles need the timestamped transcript
+            transcript_text = st.session_state.get("transcript_text", "")
+            subtitle_index = get_subtitle_index(transcript_text) if transcript_text else None
+            srt_files = build_clip_subtitles(moments_with_cuts, subtitle_index, "srt") if subtitle_index else {}
+            if srt_files:
+                st.markdown("#### 💬 **Subtitles**")
+                col7, col8 = st.columns([1, 1])
+
+                with col7:
+                    st.download_button(
+                        label="💬 **Download SRT (ZIP)**",
+                        data=subtitles_to_zip(srt_files),
+                        file_name="catholic_cuts_subtitles_srt.zip",
+                        mime="application/zip",
+                        key=f"export_srt_{key_suffix}",
+                        help="One SRT per clip, re-timed to the clip with emphasis words in caps"
+                    )
+
+                with col8:
+                    st.download_button(
+                        label="🌐 **Download VTT (ZIP)**",
+                        data=subtitles_to_zip(build_clip_subtitles(moments_with_cuts, subtitle_index, "vtt")),
+                        file_name="catholic_cuts_subtitles_vtt.zip",
+                        mime="application/zip",
+                        key=f"export_vtt_{key_suffix}",
+                        help="One WebVTT per clip, re-timed to the clip with emphasis words in caps"
+                    )
+
         except Exception as e:
             st.error(f"❌ **Export error:** {str(e)}")
 
@@ -703,6 +933,9 @@ def main():
         st.info("Please set the required environment variables and restart the app.")
         st.stop()
 
+    # Reuse pooled OpenAI/Apify connections across sessions and reruns
+    http_clients.set_registry(get_client_registry())
+
     # Inject Catholic Gothic CSS
     inject_catholic_gothic_css()
 
@@ -0,0 +1,176 @@
+"""Audio intensity pre-scoring for uploaded media.
+
+Viral moments tend to coincide with vocal intensity: loudness spikes, pace
+changes, laughter or applause. This module computes three features per
+analysis window of the decoded audio:
+
+- RMS loudness (dB)
+- Speech rate (syllable-like energy peaks per second)
+- Spectral flux (how fast the spectrum is changing)
+
+It combines them into a 0-1 intensity score. Scores are kept as a
+timeline on the original media clock, so they can be attached to
+transcript segments and used to order (or skip) chunks before any LLM
+call. All features are vectorized over frames; the FFT runs over blocks
+of frames to bound memory on long recordings.
+"""
+
+import math
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from src import config
+from src.audio_preprocess import FFT_BLOCK_FRAMES, SAMPLE_RATE
+
+FRAME_SAMPLES = 512  # 32 ms analysis frames
+
+
+class IntensityTimeline(NamedTuple):
+    """Intensity scores for consecutive fixed-length windows of the media."""
+    window_seconds: float
+    scores: List[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"window_seconds": self.window_seconds, "scores": self.scores}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IntensityTimeline":
+        return cls(float(data["window_seconds"]), [float(s) for s in data["scores"]])
+
+
+def _frame_features(samples: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-frame energy (dB) and spectral flux."""
+    n_frames = len(samples) // FRAME_SAMPLES
+    frames = samples[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+
+    energy_db = 10.0 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+    window = np.hanning(FRAME_SAMPLES).astype(np.float32)
+    flux = np.zeros(n_frames, dtype=np.float32)
+    previous = None
+    for start in range(0, n_frames, FFT_BLOCK_FRAMES):
+        block = frames[start:start + FFT_BLOCK_FRAMES]
+        magnitude = np.abs(np.fft.rfft(block * window, axis=1)).astype(np.float32)
+        magnitude /= magnitude.sum(axis=1, keepdims=True) + 1e-10
+        first = magnitude[:1] if previous is None else previous[None, :]
+        magnitude_prev = np.vstack([first, magnitude[:-1]])
+        flux[start:start + len(block)] = np.maximum(magnitude - magnitude_prev, 0.0).sum(axis=1)
+        previous = magnitude[-1]
+
+    return {"energy_db": energy_db, "flux": flux}
+
+
+def _robust_z(values: np.ndarray) -> np.ndarray:
+    """Standardize with median/MAD so a few extreme windows don't flatten the rest."""
+    median = np.median(values)
+    mad = np.median(np.abs(values - median)) * 1.4826 + 1e-6
+    return (values - median) / mad
+
+
+def compute_window_features(samples: np.ndarray, window_seconds: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """Aggregate frame features into fixed windows.
+
+    Args:
+        samples: Mono PCM at SAMPLE_RATE
+        window_seconds: Window length (defaults to config.INTENSITY_WINDOW_SECONDS)
+
+    Returns:
+        Dict of per-window arrays: rms_db, speech_rate, spectral_flux and a
+        boolean voiced mask
+    """
+    window_seconds = window_seconds or config.INTENSITY_WINDOW_SECONDS
+    frames = _frame_features(samples)
+    energy_db, flux = frames["energy_db"], frames["flux"]
+    n_frames = len(energy_db)
+
+    frames_per_window = max(1, int(round(window_seconds * SAMPLE_RATE / FRAME_SAMPLES)))
+    n_windows = math.ceil(n_frames / frames_per_window) if n_frames else 0
+    window_index = np.arange(n_frames) // frames_per_window
+    counts = np.bincount(window_index, minlength=n_windows).astype(np.float32)
+
+    noise_floor = np.percentile(energy_db, 10) if n_frames else 0.0
+    voiced_frames = energy_db > noise_floor + config.VAD_THRESHOLD_DB
+
+    # Syllable-like nuclei: voiced local energy maxima, smoothed over ~3 frames
+    smooth = np.convolve(energy_db, np.ones(3) / 3.0, mode="same")
+    peaks = np.zeros(n_frames, dtype=bool)
+    if n_frames > 2:
+        peaks[1:-1] = (smooth[1:-1] > smooth[:-2]) & (smooth[1:-1] >= smooth[2:]) & voiced_frames[1:-1]
+
+    power = 10.0 ** (energy_db / 10.0)
+    rms_db = 10.0 * np.log10(np.bincount(window_index, weights=power, minlength=n_windows) / np.maximum(counts, 1) + 1e-10)
+    voiced_count = np.bincount(window_index, weights=voiced_frames.astype(np.float32), minlength=n_windows)
+    voiced_seconds = voiced_count * FRAME_SAMPLES / SAMPLE_RATE
+    speech_rate = np.bincount(window_index, weights=peaks.astype(np.float32), minlength=n_windows) / np.maximum(voiced_seconds, 1e-3)
+    spectral_flux = np.bincount(window_index, weights=flux, minlength=n_windows) / np.maximum(counts, 1)
+
+    return {
+        "rms_db": rms_db,
+        "speech_rate": speech_rate,
+        "spectral_flux": spectral_flux,
+        "voiced": voiced_count / np.maximum(counts, 1) > 0.2,
+    }
+
+
+def intensity_scores(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Combine window features into 0-1 intensity scores.
+
+    Loudness and flux count when above the recording's typical level; speech
+    rate counts in either direction, since both rushing and slowing down
+    for emphasis mark delivery changes. Windows without voice score 0.
+    """
+    if not len(features["rms_db"]):
+        return np.zeros(0)
+
+    voiced = features["voiced"]
+    combined = np.zeros(len(voiced))
+    if voiced.any():
+        combined[voiced] = (
+            config.INTENSITY_WEIGHT_LOUDNESS * _robust_z(features["rms_db"][voiced])
+            + config.INTENSITY_WEIGHT_FLUX * _robust_z(features["spectral_flux"][voiced])
+            + config.INTENSITY_WEIGHT_RATE * np.abs(_robust_z(features["speech_rate"][voiced]))
+        )
+    scores = 1.0 / (1.0 + np.exp(-combined))
+    scores[~voiced] = 0.0
+    return scores
+
+
+def compute_intensity_timeline(samples: np.ndarray, window_seconds: Optional[float] = None) -> IntensityTimeline:
+    """Score decoded audio and return its intensity timeline."""
+    window_seconds = window_seconds or config.INTENSITY_WINDOW_SECONDS
+    scores = intensity_scores(compute_window_features(samples, window_seconds))
+    return IntensityTimeline(float(window_seconds), [round(float(s), 4) for s in scores])
+
+
+def span_intensity(timeline: IntensityTimeline, start: float, end: float) -> float:
+    """Mean intensity of the windows overlapping [start, end]."""
+    if not timeline.scores:
+        return 0.0
+    first = max(int(start // timeline.window_seconds), 0)
+    last = min(int(end // timeline.window_seconds), len(timeline.scores) - 1)
+    if last < first:
+        return 0.0
+    window = timeline.scores[first:last + 1]
+    return sum(window) / len(window)
+
+
+def score_segments(segments: List[Dict[str, Any]], timeline: IntensityTimeline) -> List[Dict[str, Any]]:
+    """Return copies of {"start", "end", "text"} segments with an "intensity" score attached."""
+    return [
+        {**seg, "intensity": round(span_intensity(timeline, float(seg["start"]), float(seg["end"])), 4)}
+        for seg in segments
+    ]
+
+
+def chunk_intensity(segments: List[Dict[str, Any]], timeline: IntensityTimeline) -> float:
+    """Score a transcript chunk by its hottest stretch.
+
+    Uses the mean of the top quarter of its segment scores, so one loud
+    peak inside a long flat chunk still lifts it.
+    """
+    scores = sorted((s["intensity"] for s in score_segments(segments, timeline)), reverse=True)
+    if not scores:
+        return 0.0
+    top = scores[: max(1, len(scores) // 4)]
+    return sum(top) / len(top)
@@ -0,0 +1,356 @@
+"""Local audio preprocessing before transcription.
+
+Decodes uploads to 16 kHz mono PCM and runs a frame-level voice activity
+detector (energy above an adaptive noise floor, with spectral flatness to
+reject applause and broadband noise). Non-speech stretches longer than
+VAD_MIN_SILENCE_SECONDS are cut out before upload; an offset map records
+where each kept region came from so Whisper's timestamps can be remapped
+onto the original media timeline.
+
+Decoding uses ffmpeg when it is on PATH; without it only WAV files can be
+decoded and callers fall back to uploading the original file. ffmpeg's
+output is read in fixed-size blocks straight into one float32 array (sized
+from ffprobe's duration when available), so decoding a long talk peaks at
+about the size of the decoded samples rather than several copies of them.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from bisect import bisect_right
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src import config
+from src.audio_transcode import ffmpeg_available
+
+SAMPLE_RATE = 16000
+FFT_BLOCK_FRAMES = 8192  # Frames per FFT block (bounds memory on long files)
+PCM_READ_BLOCK_BYTES = 1 << 20  # ffmpeg stdout read size while decoding
+PCM_UNKNOWN_DURATION_SECONDS = 600  # Initial buffer when ffprobe can't report a duration
+
+
+class KeptRegion(NamedTuple):
+    """One kept stretch of audio: where it sits in the trimmed and original timelines."""
+    trimmed_start: float
+    original_start: float
+    duration: float
+
+
+def _read_wav(path: str) -> Optional[np.ndarray]:
+    """Read a PCM WAV file into float32 mono at SAMPLE_RATE without ffmpeg."""
+    try:
+        with wave.open(path, "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        print(f"[audio_preprocess] Cannot read WAV {path}: {e}")
+        return None
+
+    if width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        print(f"[audio_preprocess] Unsupported WAV sample width: {width}")
+        return None
+
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+
+    if rate != SAMPLE_RATE and len(samples):
+        # Linear resampling is plenty for VAD and speech recognition input
+        target_len = int(round(len(samples) * SAMPLE_RATE / rate))
+        positions = np.linspace(0, len(samples) - 1, target_len)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+    return samples
+
+
+def _probe_duration(path: str) -> Optional[float]:
+    """Media duration in seconds from ffprobe, or None if it can't be read."""
+    if shutil.which("ffprobe") is None:
+        return None
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        return float(result.stdout.decode().strip()) if result.returncode == 0 else None
+    except ValueError:
+        return None
+
+
+def _decode_with_ffmpeg(path: str) -> Optional[np.ndarray]:
+    """Stream ffmpeg's s16le output into a preallocated float32 array."""
+    duration = _probe_duration(path)
+    capacity = int((duration + 1) * SAMPLE_RATE) if duration else PCM_UNKNOWN_DURATION_SECONDS * SAMPLE_RATE
+    samples = np.empty(capacity, dtype=np.float32)
+    block = np.empty(PCM_READ_BLOCK_BYTES // 2, dtype="<i2")
+    raw = memoryview(block).cast("B")
+    filled = carry = 0
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-",
+    ]
+    # stderr goes to a file so a chatty ffmpeg can't block on a full pipe
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            while True:
+                read = proc.stdout.readinto(raw[carry:])
+                if not read:
+                    break
+                count, carry = divmod(carry + read, 2)
+                if filled + count > len(samples):
+                    # Only without a usable duration; resizing may briefly hold two buffers
+                    samples.resize(max(2 * len(samples), filled + count), refcheck=False)
+                out = samples[filled:filled + count]
+                out[:] = block[:count]
+                out *= 1.0 / 32768.0
+                filled += count
+                if carry:
+                    raw[0] = raw[2 * count]  # Odd read: keep the half sample for the next one
+        finally:
+            proc.stdout.close()
+            proc.wait()
+
+        if proc.returncode != 0:
+            stderr.seek(0)
+            print(f"[audio_preprocess] ffmpeg decode failed: {stderr.read().decode(errors='replace').strip()}")
+            return None
+
+    samples.resize(filled, refcheck=False)
+    return samples
+
+
+def decode_to_pcm(path: str) -> Optional[np.ndarray]:
+    """Decode any media file to float32 mono PCM at 16 kHz.
+
+    Args:
+        path: Audio or video file on disk
+
+    Returns:
+        1-D float32 array in [-1, 1], or None if the file cannot be decoded
+        here (no ffmpeg and not a WAV file)
+    """
+    if ffmpeg_available():
+        return _decode_with_ffmpeg(path)
+
+    if path.lower().endswith(".wav"):
+        return _read_wav(path)
+
+    return None
+
+
+def detect_speech_frames(samples: np.ndarray, frame_ms: int = None, threshold_db: float = None) -> np.ndarray:
+    """Classify fixed-size frames as speech or non-speech.
+
+    A frame is speech when its energy is threshold_db above the estimated
+    noise floor (10th percentile of frame energy) and it is not noise-like
+    (spectral flatness below VAD_MAX_FLATNESS). Frames are processed in blocks
+    of FFT_BLOCK_FRAMES so peak memory stays bounded on multi-hour files.
+
+    Args:
+        samples: Mono PCM at SAMPLE_RATE
+        frame_ms: Frame length (defaults to config.VAD_FRAME_MS)
+        threshold_db: Margin above the noise floor (defaults to config.VAD_THRESHOLD_DB)
+
+    Returns:
+        Boolean array, one entry per frame
+    """
+    frame_ms = frame_ms or config.VAD_FRAME_MS
+    threshold_db = config.VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+    frame_len = SAMPLE_RATE * frame_ms // 1000
+
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+
+    window = np.hanning(frame_len).astype(np.float32)
+    energy_db = np.empty(n_frames, dtype=np.float32)
+    flatness = np.empty(n_frames, dtype=np.float32)
+    for start in range(0, n_frames, FFT_BLOCK_FRAMES):
+        block = frames[start:start + FFT_BLOCK_FRAMES].astype(np.float32, copy=False)
+        end = start + len(block)
+        energy_db[start:end] = 10.0 * np.log10(np.mean(block ** 2, axis=1) + 1e-10)
+        spectrum = np.abs(np.fft.rfft(block * window, axis=1)).astype(np.float32) + 1e-10
+        flatness[start:end] = np.exp(np.mean(np.log(spectrum), axis=1)) / np.mean(spectrum, axis=1)
+
+    noise_floor = np.percentile(energy_db, 10)
+    loud = (energy_db > noise_floor + threshold_db) & (energy_db > config.VAD_MIN_ENERGY_DB)
+
+    return loud & (flatness < config.VAD_MAX_FLATNESS)
+
+
+def speech_regions(speech: np.ndarray, frame_ms: int = None, min_silence: float = None,
+                   padding: float = None) -> List[Tuple[float, float]]:
+    """Turn per-frame speech flags into padded (start, end) regions in seconds.
+
+    Gaps shorter than min_silence are kept so natural pauses survive; only
+    long stretches of dead air, music or applause are removed.
+    """
+    frame_ms = frame_ms or config.VAD_FRAME_MS
+    min_silence = config.VAD_MIN_SILENCE_SECONDS if min_silence is None else min_silence
+    padding = config.VAD_PADDING_SECONDS if padding is None else padding
+    frame_s = frame_ms / 1000.0
+
+    if not speech.any():
+        return []
+
+    # Rising/falling edges of the speech mask
+    padded = np.concatenate(([False], speech, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1) * frame_s
+    ends = np.flatnonzero(edges == -1) * frame_s
+
+    total = len(speech) * frame_s
+    starts = np.maximum(starts - padding, 0.0)
+    ends = np.minimum(ends + padding, total)
+
+    regions = [(float(starts[0]), float(ends[0]))]
+    for start, end in zip(starts[1:], ends[1:]):
+        if start - regions[-1][1] < min_silence:
+            regions[-1] = (regions[-1][0], float(end))
+        else:
+            regions.append((float(start), float(end)))
+    return regions
+
+
+def split_at_pauses(samples: np.ndarray, n_parts: int, search_seconds: float = 5.0) -> List[Tuple[int, int]]:
+    """Split audio into n_parts roughly equal pieces, cutting at the quietest frame near each boundary.
+
+    Cutting in pauses keeps words whole when the pieces are transcribed
+    independently.
+
+    Returns:
+        List of (start_sample, end_sample) pairs covering the whole signal
+    """
+    total = len(samples)
+    if n_parts <= 1 or total == 0:
+        return [(0, total)]
+
+    frame_len = SAMPLE_RATE * config.VAD_FRAME_MS // 1000
+    n_frames = total // frame_len
+    energy = np.mean(samples[: n_frames * frame_len].reshape(n_frames, frame_len) ** 2, axis=1)
+    window = int(search_seconds * 1000 / config.VAD_FRAME_MS)
+
+    cuts = [0]
+    for k in range(1, n_parts):
+        target = n_frames * k // n_parts
+        lo, hi = max(target - window, 0), min(target + window, n_frames)
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame_len if hi > lo else target * frame_len
+        if cut > cuts[-1]:
+            cuts.append(cut)
+    cuts.append(total)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def trim_silence(samples: np.ndarray) -> Tuple[np.ndarray, List[KeptRegion]]:
+    """Remove long non-speech stretches from PCM audio.
+
+    Returns:
+        Tuple of (trimmed_samples, offset_map). The offset map lists every
+        kept region in order; pass it to remap_time/remap_segments.
+    """
+    regions = speech_regions(detect_speech_frames(samples))
+    if not regions:
+        return samples[:0], []
+
+    pieces = []
+    offset_map = []
+    trimmed_pos = 0.0
+    for start, end in regions:
+        a, b = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        pieces.append(samples[a:b])
+        duration = (b - a) / SAMPLE_RATE
+        offset_map.append(KeptRegion(trimmed_pos, a / SAMPLE_RATE, duration))
+        trimmed_pos += duration
+
+    return np.concatenate(pieces), offset_map
+
+
+def remap_time(t: float, offset_map: List[KeptRegion], starts: Optional[List[float]] = None) -> float:
+    """Map a time on the trimmed timeline back onto the original media.
+
+    Args:
+        t: Seconds on the trimmed timeline
+        offset_map: Kept regions from trim_silence
+        starts: Precomputed trimmed_start list (saves rebuilding it per call)
+    """
+    if not offset_map:
+        return t
+    starts = starts if starts is not None else [r.trimmed_start for r in offset_map]
+    region = offset_map[max(bisect_right(starts, t) - 1, 0)]
+    return region.original_start + min(max(t - region.trimmed_start, 0.0), region.duration)
+
+
+def remap_segments(segments: List[Dict[str, Any]], offset_map: List[KeptRegion]) -> List[Dict[str, Any]]:
+    """Remap {"start", "end", "text"} segments from the trimmed timeline to the original."""
+    if not offset_map:
+        return segments
+    starts = [r.trimmed_start for r in offset_map]
+    return [
+        {**seg,
+         "start": remap_time(float(seg["start"]), offset_map, starts),
+         "end": remap_time(float(seg["end"]), offset_map, starts)}
+        for seg in segments
+    ]
+
+
+def write_wav(samples: np.ndarray, path: str) -> None:
+    """Write float32 mono PCM as a 16-bit WAV at SAMPLE_RATE."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+
+
+def prepare_speech_audio(path: str, out_dir: str,
+                         samples: Optional[np.ndarray] = None
+                         ) -> Optional[Tuple[str, List[KeptRegion], Dict[str, float], np.ndarray]]:
+    """Decode, VAD-trim and write speech-only audio for upload.
+
+    Args:
+        path: Original media file
+        out_dir: Directory for the trimmed file
+        samples: Already-decoded PCM for path (skips decoding again)
+
+    Returns:
+        (trimmed_path, offset_map, stats, trimmed_samples) or None if the
+        media could not be decoded here or contains no detectable speech
+    """
+    samples = decode_to_pcm(path) if samples is None else samples
+    if samples is None or not len(samples):
+        return None
+
+    trimmed, offset_map = trim_silence(samples)
+    if not offset_map:
+        print("[audio_preprocess] No speech detected – uploading original media")
+        return None
+
+    original_seconds = len(samples) / SAMPLE_RATE
+    kept_seconds = len(trimmed) / SAMPLE_RATE
+    trimmed_path = os.path.join(out_dir, "speech.wav")
+    write_wav(trimmed, trimmed_path)
+
+    stats = {
+        "original_seconds": original_seconds,
+        "kept_seconds": kept_seconds,
+        "removed_seconds": original_seconds - kept_seconds,
+    }
+    print(
+        f"[audio_preprocess] Kept {kept_seconds:.1f}s of {original_seconds:.1f}s "
+        f"({len(offset_map)} speech regions, {stats['removed_seconds']:.1f}s removed)"
+    )
+    return trimmed_path, offset_map, stats, trimmed
@@ -0,0 +1,79 @@
+"""Optional ffmpeg transcoding of uploads to a compact speech codec.
+
+Whisper only needs the audio track, and 16 kHz mono speech survives
+low-bitrate Opus or MP3 with no loss in accuracy. Re-encoding a full
+resolution mp4 this way typically shrinks it 10-50x, so much longer talks
+fit under the 25 MB upload limit and uploads finish sooner. When ffmpeg is
+not installed callers keep using the original file.
+"""
+
+import os
+import shutil
+import subprocess
+from typing import Dict, Optional, Tuple
+
+from src import config
+
+# codec name -> (file extension Whisper accepts, ffmpeg encoder arguments)
+TRANSCODE_CODECS = {
+    "opus": (".ogg", ["-c:a", "libopus", "-application", "voip"]),
+    "mp3": (".mp3", ["-c:a", "libmp3lame"]),
+}
+
+
+def ffmpeg_available() -> bool:
+    """True if an ffmpeg binary is on PATH."""
+    return shutil.which("ffmpeg") is not None
+
+
+def transcode_for_upload(path: str, out_dir: str, codec: Optional[str] = None,
+                         bitrate_kbps: Optional[int] = None) -> Optional[Tuple[str, Dict[str, int]]]:
+    """Extract the audio track as low-bitrate 16 kHz mono speech.
+
+    Args:
+        path: Source media file
+        out_dir: Directory for the encoded file
+        codec: "opus" or "mp3" (defaults to config.TRANSCODE_CODEC)
+        bitrate_kbps: Target bitrate (defaults to config.TRANSCODE_BITRATE_KBPS)
+
+    Returns:
+        (encoded_path, stats) where stats has original_bytes, encoded_bytes
+        and bytes_saved, or None if ffmpeg is missing, fails, or the result
+        is not smaller than the source
+    """
+    if not ffmpeg_available():
+        return None
+
+    codec = codec or config.TRANSCODE_CODEC
+    if codec not in TRANSCODE_CODECS:
+        raise ValueError(f"Unknown transcode codec: {codec!r}. Allowed: {', '.join(TRANSCODE_CODECS)}")
+    bitrate_kbps = bitrate_kbps or config.TRANSCODE_BITRATE_KBPS
+
+    extension, encoder_args = TRANSCODE_CODECS[codec]
+    out_path = os.path.join(out_dir, f"speech_{codec}{extension}")
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", path, "-vn", "-ac", "1", "-ar", "16000",
+        *encoder_args, "-b:a", f"{bitrate_kbps}k", out_path,
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0 or not os.path.exists(out_path):
+        print(f"[audio_transcode] ffmpeg {codec} encode failed: {result.stderr.decode(errors='replace').strip()}")
+        return None
+
+    original_bytes = os.path.getsize(path)
+    encoded_bytes = os.path.getsize(out_path)
+    if encoded_bytes >= original_bytes:
+        print(f"[audio_transcode] {codec} encode not smaller than source – keeping original")
+        return None
+
+    stats = {
+        "original_bytes": original_bytes,
+        "encoded_bytes": encoded_bytes,
+        "bytes_saved": original_bytes - encoded_bytes,
+    }
+    print(
+        f"[audio_transcode] {codec} @ {bitrate_kbps}kbps: {original_bytes:,} -> {encoded_bytes:,} bytes "
+        f"({stats['bytes_saved']:,} saved)"
+    )
+    return out_path, stats
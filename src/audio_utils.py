@@ -1,39 +1,311 @@
 """Audio transcription utilities for Catholic Cuts.
 
 Cloud-safe version for Streamlit Community Cloud deployment.
-Handles video file transcription using OpenAI's Whisper API without ffmpeg.
+Handles video file transcription through a pluggable backend: hosted
+OpenAI Whisper (default) or local faster-whisper on CPU. Silence trimming
+(src/audio_preprocess.py) and speech transcoding (src/audio_transcode.py)
+run first when available; ffmpeg is optional.
 """
 
+import importlib.util
+from abc import ABC, abstractmethod
 import tempfile
 import os
-from typing import Optional
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple, Union
 from src import config
+from src.audio_transcode import ffmpeg_available, transcode_for_upload
+from src.cache_utils import get_cached_transcription, save_transcription_to_cache
+from src.http_clients import get_openai_client
+from src.upload_utils import save_upload
+from src.transcript_utils import flatten_transcript
 
 # Streamlit Cloud supported formats (Whisper-native only)
 SUPPORTED_STREAMLIT_FORMATS = ["mp4", "mp3", "wav", "webm"]
 
 
-def transcribe_video_to_text(uploaded_file):
+def _segment_field(segment: Any, name: str) -> Any:
+    """Read a field from a Whisper segment (SDK object or plain dict)."""
+    return segment.get(name) if isinstance(segment, dict) else getattr(segment, name, None)
+
+
+def _whisper_segments(client: Any, path: str) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+    """Upload one file to Whisper and return its timestamped segments and audio duration."""
+    with open(path, "rb") as f:
+        response = client.audio.transcriptions.create(
+            model=config.WHISPER_MODEL,
+            file=f,
+            response_format="verbose_json",
+        )
+
+    segments = []
+    for seg in _segment_field(response, "segments") or []:
+        text = (_segment_field(seg, "text") or "").strip()
+        if text:
+            segments.append({
+                "start": float(_segment_field(seg, "start") or 0.0),
+                "end": float(_segment_field(seg, "end") or 0.0),
+                "text": text,
+            })
+    duration = _segment_field(response, "duration")
+    return segments, float(duration) if duration else None
+
+
+class TranscriptionBackend(ABC):
+    """Interface for the speech-to-text engines used by transcribe_media.
+
+    Subclasses turn a media file on disk into {"start", "end", "text"}
+    segments (seconds, relative to that file) plus the file's audio
+    duration when the engine reports it.
     """
-    Cloud-safe transcription for Streamlit Community Cloud.
-    Only accepts Whisper-native formats: mp4/mp3/wav/webm.
-    No ffmpeg, no format conversion.
+
+    name = ""
+    # Re-encode to compact speech audio first (only worth it when uploading)
+    wants_transcode = False
+    # Engine consumes decoded PCM, so transcribe_media hands over the samples it already decoded
+    wants_pcm = False
+
+    @property
+    def max_upload_bytes(self) -> Optional[int]:
+        """Largest file the engine accepts, or None for no limit."""
+        return None
+
+    @abstractmethod
+    def cache_model_id(self) -> str:
+        """Identifies the model/settings in transcription cache keys."""
+
+    @abstractmethod
+    def transcribe(self, path: str, samples: Optional[Any] = None) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Transcribe one file.
+
+        Args:
+            path: Media file on disk
+            samples: Already-decoded PCM of path at SAMPLE_RATE, when available
+
+        Returns:
+            Tuple of (segments, audio duration in seconds or None)
+        """
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Hosted OpenAI Whisper (whisper-1) over the shared pooled client."""
+
+    name = "openai"
+    wants_transcode = True
+
+    @property
+    def max_upload_bytes(self) -> Optional[int]:
+        return config.WHISPER_MAX_UPLOAD_MB * 1024 * 1024
+
+    def cache_model_id(self) -> str:
+        return config.WHISPER_MODEL
+
+    def transcribe(self, path: str, samples: Optional[Any] = None) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        print(f"[audio_utils] Uploading {os.path.getsize(path):,} bytes to OpenAI Whisper")
+        # Shared pooled client; uploads get the longer transcription timeout
+        client = get_openai_client().with_options(timeout=config.OPENAI_TRANSCRIBE_TIMEOUT_SECONDS)
+        return _whisper_segments(client, path)
+
+
+# Loaded faster-whisper models, keyed by (model_size, compute_type, workers, cpu_threads)
+_local_models: Dict[Tuple[str, str, int, int], Any] = {}
+_local_models_lock = threading.Lock()
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """Offline CPU transcription with faster-whisper (CTranslate2, int8 by default).
+
+    The audio is split at pauses into one piece per worker and the pieces
+    are decoded in parallel by a single model instance with num_workers
+    set, so every core is used. Requires the optional faster-whisper
+    package (requirements-local.txt), plus ffmpeg for anything other than
+    WAV. PCM already decoded by transcribe_media is reused as is.
     """
-    from openai import OpenAI
-    import tempfile
 
-    if not uploaded_file:
-        raise RuntimeError("No file provided for transcription")
+    name = "local"
+    wants_pcm = True
+
+    def __init__(self, model_size: Optional[str] = None, compute_type: Optional[str] = None,
+                 workers: Optional[int] = None):
+        self.model_size = model_size or config.LOCAL_WHISPER_MODEL
+        self.compute_type = compute_type or config.LOCAL_WHISPER_COMPUTE_TYPE
+        cpus = os.cpu_count() or 1
+        self.workers = max(1, workers or config.LOCAL_WHISPER_WORKERS or min(4, cpus))
+        self.cpu_threads = max(1, cpus // self.workers)
+
+    def cache_model_id(self) -> str:
+        return f"faster-whisper:{self.model_size}:{self.compute_type}"
+
+    def _model(self) -> Any:
+        key = (self.model_size, self.compute_type, self.workers, self.cpu_threads)
+        with _local_models_lock:
+            if key not in _local_models:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise RuntimeError(
+                        "Local transcription requires the faster-whisper package (pip install -r requirements-local.txt)"
+                    )
+                print(f"[audio_utils] Loading faster-whisper {self.model_size} ({self.compute_type}, {self.workers} workers)")
+                _local_models[key] = WhisperModel(
+                    self.model_size,
+                    device="cpu",
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                    num_workers=self.workers,
+                )
+            return _local_models[key]
+
+    def transcribe(self, path: str, samples: Optional[Any] = None) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        from src.audio_preprocess import SAMPLE_RATE, decode_to_pcm, split_at_pauses
+
+        if samples is None:
+            samples = decode_to_pcm(path)
+        if samples is None:
+            raise RuntimeError("Local transcription needs ffmpeg installed (or a WAV file) to decode this media")
+
+        model = self._model()
+        duration = len(samples) / SAMPLE_RATE
+        n_parts = max(1, min(self.workers, int(duration // config.LOCAL_WHISPER_MIN_PART_SECONDS)))
+        parts = split_at_pauses(samples, n_parts)
+
+        def _transcribe_part(bounds: Tuple[int, int]) -> List[Dict[str, Any]]:
+            a, b = bounds
+            offset = a / SAMPLE_RATE
+            part_segments, _ = model.transcribe(samples[a:b], beam_size=config.LOCAL_WHISPER_BEAM_SIZE)
+            return [
+                {"start": offset + seg.start, "end": offset + seg.end, "text": seg.text.strip()}
+                for seg in part_segments if seg.text.strip()
+            ]
+
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            results = list(executor.map(_transcribe_part, parts))
+
+        return [seg for part in results for seg in part], duration
+
+
+TRANSCRIPTION_BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+}
+
+
+def get_transcription_backend(backend: Union[str, TranscriptionBackend, None] = None) -> TranscriptionBackend:
+    """Resolve a backend name (defaults to config.TRANSCRIPTION_BACKEND) to an instance.
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if isinstance(backend, TranscriptionBackend):
+        return backend
+    name = backend or config.TRANSCRIPTION_BACKEND
+    if name not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"Unknown transcription backend: {name!r}. Allowed: {', '.join(TRANSCRIPTION_BACKENDS)}")
+    return TRANSCRIPTION_BACKENDS[name]()
 
-    # Check file size (OpenAI Whisper has 25MB limit)
-    max_size_mb = 25
-    file_size_mb = uploaded_file.size / (1024 * 1024)
 
-    if file_size_mb > max_size_mb:
-        raise RuntimeError(f"Video file too large: {file_size_mb:.1f}MB. Maximum allowed: {max_size_mb}MB")
+def local_transcription_available() -> bool:
+    """True if the optional faster-whisper package is installed."""
+    return importlib.util.find_spec("faster_whisper") is not None
 
-    client = OpenAI()
+
+def max_media_upload_bytes(backend: Union[str, TranscriptionBackend, None] = None) -> int:
+    """Largest upload accepted for transcription.
+
+    Local engines have no size limit, and with ffmpeg installed the audio
+    is re-encoded well below the Whisper limit, so much larger videos can
+    be accepted in both cases.
+    """
+    limit = get_transcription_backend(backend).max_upload_bytes
+    if limit is None or (config.TRANSCODE_ENABLED and ffmpeg_available()):
+        return config.MAX_MEDIA_UPLOAD_MB * 1024 * 1024
+    return limit
+
+
+def _transcription_options(trim_silence: bool, transcode: bool) -> Dict[str, Any]:
+    """Settings that change transcription output, for the cache key."""
+    options: Dict[str, Any] = {"trim_silence": trim_silence, "transcode": transcode}
+    if trim_silence:
+        options["vad"] = [
+            config.VAD_FRAME_MS, config.VAD_THRESHOLD_DB, config.VAD_MIN_ENERGY_DB,
+            config.VAD_MAX_FLATNESS, config.VAD_MIN_SILENCE_SECONDS, config.VAD_PADDING_SECONDS,
+        ]
+    if transcode:
+        options["codec"] = [config.TRANSCODE_CODEC, config.TRANSCODE_BITRATE_KBPS]
+    return options
+
+
+def _media_intensity(path: str) -> Optional[Dict[str, Any]]:
+    """Decode a media file and return its intensity timeline dict, or None if it can't be analysed here."""
+    try:
+        from src.audio_features import compute_intensity_timeline
+        from src.audio_preprocess import decode_to_pcm
+    except ImportError as e:
+        print(f"[audio_utils] Local audio analysis unavailable ({e}) – no intensity timeline")
+        return None
+    samples = decode_to_pcm(path)
+    return compute_intensity_timeline(samples).to_dict() if samples is not None else None
+
+
+def transcribe_media(uploaded_file, trim_silence: Optional[bool] = None,
+                     transcode: Optional[bool] = None, use_cache: Optional[bool] = None,
+                     backend: Union[str, TranscriptionBackend, None] = None,
+                     run_config: Optional[config.RunConfig] = None) -> Tuple[str, Dict[str, Any]]:
+    """Transcribe an uploaded video/audio file.
+
+    Preprocessing runs in order, each step optional and skipped cleanly when
+    unavailable:
+    1. VAD trimming: long silences, music and applause are cut out and
+       the engine's timestamps are remapped onto the original timeline.
+    2. Transcoding (upload backends only): ffmpeg re-encodes the audio as
+       low-bitrate mono speech.
+    The smallest prepared file that fits the backend's limit is transcribed;
+    otherwise the original file is used unchanged.
+
+    Results are cached by the SHA-256 of the media (computed while the
+    upload is copied) plus model and options, so re-uploading the same file
+    skips preprocessing, upload and transcription. Intensity is not part of
+    the key: a hit cached without a timeline is decoded and scored when this
+    run needs one, and the entry is updated with it.
+
+    Args:
+        uploaded_file: Streamlit UploadedFile (or any object with name/read())
+        trim_silence: Override config.VAD_ENABLED
+        transcode: Override config.TRANSCODE_ENABLED
+        use_cache: Override run_config.cache_enabled
+        backend: Backend name or instance (defaults to config.TRANSCRIPTION_BACKEND)
+        run_config: Per-run settings; its cache_enabled/cache_dir control the
+            transcription cache (defaults to the module defaults)
+
+    Returns:
+        Tuple of (timestamped transcript text, stats dict with backend,
+        original_bytes, media_sha256, upload_bytes, bytes_saved,
+        removed_seconds, cache_hit, audio_seconds, transcribe_seconds,
+        real_time_factor and, when intensity scoring is on (config flag, or
+        run_config.intensity_skip_below > 0) and the audio could be
+        analysed, an intensity timeline dict for extract_moments)
+
+    Raises:
+        RuntimeError: If no file is given, nothing fits the upload limit, or
+            no speech is returned
+        ValueError: If the format or backend isn't supported
+    """
+    if not uploaded_file:
+        raise RuntimeError("No file provided for transcription")
+
+    backend = get_transcription_backend(backend)
+    trim_silence = config.VAD_ENABLED if trim_silence is None else trim_silence
+    transcode = (config.TRANSCODE_ENABLED if transcode is None else transcode) and backend.wants_transcode
+    run_config = run_config or config.default_run_config()
+    use_cache = run_config.cache_enabled if use_cache is None else use_cache
+    run_config = replace(run_config, cache_enabled=use_cache)
+    # Intensity only pays off when it can skip chunks (or is switched on explicitly)
+    score_intensity = config.INTENSITY_SCORING_ENABLED or run_config.intensity_skip_below > 0
+    options = _transcription_options(trim_silence, transcode)
+    model_id = backend.cache_model_id()
 
     # Extract file extension and validate
     suffix = "." + uploaded_file.name.split(".")[-1].lower()
@@ -43,26 +315,133 @@ def transcribe_video_to_text(uploaded_file):
             f"Allowed: {', '.join(SUPPORTED_STREAMLIT_FORMATS)}"
         )
 
-    # Create temporary file with correct extension
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-        tmp.write(uploaded_file.read())
-        tmp_path = tmp.name
+    max_bytes = backend.max_upload_bytes
 
-    try:
-        # Transcribe using Whisper
-        with open(tmp_path, "rb") as f:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-                response_format="text",
+    with tempfile.TemporaryDirectory(prefix="catholic_cuts_") as tmp_dir:
+        tmp_path = os.path.join(tmp_dir, f"upload{suffix}")
+        original_bytes, media_sha256 = save_upload(uploaded_file, tmp_path)
+
+        stats: Dict[str, Any] = {
+            "backend": backend.name,
+            "original_bytes": original_bytes,
+            "media_sha256": media_sha256,
+            "removed_seconds": 0.0,
+            "cache_hit": False,
+        }
+
+        cached = get_cached_transcription(media_sha256, model_id, options, run_config)
+        if cached is not None:
+            cached_stats = cached.get("stats", {})
+            intensity = cached_stats.get("intensity")
+            if intensity is None and score_intensity:
+                # Cached by a run that didn't score intensity: score it now and keep it with the entry
+                intensity = _media_intensity(tmp_path)
+                if intensity is not None:
+                    save_transcription_to_cache(cached["transcript_text"], media_sha256, model_id, options,
+                                                {**cached_stats, "intensity": intensity}, run_config)
+            stats.update(
+                upload_bytes=0,
+                bytes_saved=original_bytes,
+                removed_seconds=cached_stats.get("removed_seconds", 0.0),
+                audio_seconds=cached_stats.get("audio_seconds", 0.0),
+                intensity=intensity,
+                cache_hit=True,
+            )
+            return cached["transcript_text"], stats
+
+        # Candidates in order of preference: (path, offset_map)
+        candidates = [(tmp_path, None)]
+        audio_seconds = None
+
+        # Decode once for VAD trimming, intensity scoring and PCM-based engines
+        samples = None
+        if trim_silence or score_intensity or backend.wants_pcm:
+            try:
+                from src.audio_preprocess import decode_to_pcm
+                samples = decode_to_pcm(tmp_path)
+            except ImportError as e:
+                print(f"[audio_utils] Local audio analysis unavailable ({e}) – using original media")
+
+        if samples is not None and score_intensity:
+            from src.audio_features import compute_intensity_timeline
+            stats["intensity"] = compute_intensity_timeline(samples).to_dict()
+
+        # PCM of candidates[0], kept only for engines that consume it
+        engine_samples = samples if backend.wants_pcm else None
+
+        if trim_silence and samples is not None:
+            from src.audio_preprocess import prepare_speech_audio
+            prepared = prepare_speech_audio(tmp_path, tmp_dir, samples)
+            if prepared is not None:
+                speech_path, offset_map, vad_stats, speech_samples = prepared
+                candidates.insert(0, (speech_path, offset_map))
+                engine_samples = speech_samples if backend.wants_pcm else None
+                stats["removed_seconds"] = vad_stats["removed_seconds"]
+                audio_seconds = vad_stats["original_seconds"]
+
+        # Free the decoded PCM before transcription (engine_samples keeps what the engine reuses)
+        samples = prepared = speech_samples = None
+
+        if transcode:
+            encoded = transcode_for_upload(candidates[0][0], tmp_dir)
+            if encoded is not None:
+                candidates.insert(0, (encoded[0], candidates[0][1]))
+                engine_samples = None
+
+        fitting = [
+            (path, offsets) for path, offsets in candidates
+            if max_bytes is None or os.path.getsize(path) <= max_bytes
+        ]
+        if not fitting:
+            size_mb = stats["original_bytes"] / (1024 * 1024)
+            raise RuntimeError(
+                f"Video file too large: {size_mb:.1f}MB. Maximum allowed: {max_bytes // (1024 * 1024)}MB"
+                + ("" if ffmpeg_available() else " (install ffmpeg to compress larger videos)")
             )
 
-        return transcript.strip()
+        upload_path, offset_map = fitting[0]
+        if upload_path != candidates[0][0]:
+            engine_samples = None
+        stats["upload_bytes"] = os.path.getsize(upload_path)
+        stats["bytes_saved"] = stats["original_bytes"] - stats["upload_bytes"]
+
+        started = time.perf_counter()
+        segments, engine_seconds = backend.transcribe(upload_path, engine_samples)
+        engine_samples = None
+        transcribe_seconds = time.perf_counter() - started
+
+        if offset_map:
+            from src.audio_preprocess import remap_segments
+            segments = remap_segments(segments, offset_map)
+
+    if not segments:
+        raise RuntimeError("No speech was transcribed from this file")
 
-    finally:
-        # Clean up temporary file
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+    # Real-time factor: processing time per second of source audio (lower is faster)
+    audio_seconds = audio_seconds or engine_seconds or max(seg["end"] for seg in segments)
+    stats.update(
+        audio_seconds=audio_seconds,
+        transcribe_seconds=transcribe_seconds,
+        real_time_factor=transcribe_seconds / audio_seconds if audio_seconds else 0.0,
+    )
+    print(
+        f"[audio_utils] {backend.name} transcribed {audio_seconds:.0f}s of audio in "
+        f"{transcribe_seconds:.1f}s (RTF {stats['real_time_factor']:.3f})"
+    )
+
+    transcript_text = flatten_transcript({"transcript": segments})
+    save_transcription_to_cache(transcript_text, media_sha256, model_id, options, stats, run_config)
+    return transcript_text, stats
+
+
+def transcribe_video_to_text(uploaded_file, trim_silence: Optional[bool] = None,
+                             backend: Union[str, TranscriptionBackend, None] = None) -> str:
+    """Transcribe an uploaded video/audio file and return timestamped text.
+
+    See transcribe_media for the preprocessing steps.
+    """
+    transcript_text, _ = transcribe_media(uploaded_file, trim_silence=trim_silence, backend=backend)
+    return transcript_text
 
 
 def get_supported_video_formats() -> list:
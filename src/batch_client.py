@@ -0,0 +1,279 @@
+"""Offline execution of chat requests through the OpenAI Batch API.
+
+Bulk jobs (overnight series processing) don't need interactive latency.
+Instead of one synchronous chat completion per chunk, all requests of a
+run are written to a JSONL batch file, uploaded and submitted as one batch;
+the batch is polled with exponential backoff and its output file is mapped
+back to the requests by custom_id. Batches are billed at a discount and
+draw from a separate rate limit, so bulk jobs stop competing with editors.
+
+Endpoints used (through the shared OpenAI client):
+    POST /v1/files              upload the JSONL input (purpose "batch")
+    POST /v1/batches            create the batch
+    GET  /v1/batches/{id}       batch status
+    GET  /v1/files/{id}/content output / error files
+
+Submitted batches are recorded under CACHE_DIR/batches/, keyed by a hash
+of the request lines, until their results are collected. Rerunning the same
+job (same prompts, models and settings) after a timeout or a restart
+resumes polling that batch instead of paying for a second one.
+
+The OpenAI client honours OPENAI_BASE_URL, so a local stand-in server can
+serve these endpoints for testing.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from src import config
+from src.http_clients import get_openai_client
+
+CHAT_ENDPOINT = "/v1/chat/completions"
+PENDING_BATCH_DIR = "batches"
+
+# Terminal batch states; expired/cancelled batches may still carry partial output
+BATCH_COMPLETED = "completed"
+BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchRequest(NamedTuple):
+    """One chat completion to run inside a batch."""
+    custom_id: str
+    system_prompt: str
+    user_prompt: str
+    model: str
+    temperature: float = 0.3
+
+
+def batch_request_line(request: BatchRequest) -> Dict[str, Any]:
+    """Batch input line for a chat completion request."""
+    return {
+        "custom_id": request.custom_id,
+        "method": "POST",
+        "url": CHAT_ENDPOINT,
+        "body": {
+            "model": request.model,
+            "messages": [
+                {"role": "system", "content": request.system_prompt},
+                {"role": "user", "content": request.user_prompt},
+            ],
+            "temperature": request.temperature,
+        },
+    }
+
+
+def write_batch_file(requests: List[BatchRequest], path: str) -> None:
+    """Write batch requests as JSONL, one request per line.
+
+    Raises:
+        ValueError: If custom_ids are not unique
+    """
+    ids = [r.custom_id for r in requests]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Batch custom_ids must be unique")
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(batch_request_line(request), ensure_ascii=False) + "\n")
+
+
+def batch_fingerprint(requests: List[BatchRequest]) -> str:
+    """Stable hash of a batch's request lines (identifies reruns of the same job)."""
+    digest = hashlib.sha256()
+    for request in requests:
+        digest.update(json.dumps(batch_request_line(request), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()[:32]
+
+
+def _pending_batch_path(fingerprint: str) -> str:
+    return os.path.join(config.CACHE_DIR, PENDING_BATCH_DIR, f"{fingerprint}.json")
+
+
+def load_pending_batch(fingerprint: str) -> Optional[str]:
+    """Batch id recorded for this job, or None if nothing is pending."""
+    try:
+        with open(_pending_batch_path(fingerprint), "r", encoding="utf-8") as f:
+            return json.load(f).get("batch_id") or None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def save_pending_batch(fingerprint: str, batch_id: str) -> None:
+    """Record a submitted batch so a rerun of the job can resume polling it."""
+    path = _pending_batch_path(fingerprint)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch_id, "submitted_at": time.time()}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[batch_client] Could not record pending batch {batch_id}: {e}")
+
+
+def clear_pending_batch(fingerprint: str) -> None:
+    """Forget the pending batch of a job (after its results were collected)."""
+    try:
+        os.remove(_pending_batch_path(fingerprint))
+    except OSError:
+        pass
+
+
+def _resumable_batch(fingerprint: str, client: Any) -> Optional[str]:
+    """Id of this job's pending batch if it can still deliver results."""
+    batch_id = load_pending_batch(fingerprint)
+    if not batch_id:
+        return None
+    try:
+        batch = client.batches.retrieve(batch_id)
+    except Exception as e:
+        print(f"[batch_client] Pending batch {batch_id} is not retrievable ({e}) – submitting a new one")
+        clear_pending_batch(fingerprint)
+        return None
+    if batch.status in BATCH_TERMINAL_STATES and batch.status != BATCH_COMPLETED \
+            and not getattr(batch, "output_file_id", None):
+        print(f"[batch_client] Pending batch {batch_id} ended with status {batch.status} – submitting a new one")
+        clear_pending_batch(fingerprint)
+        return None
+    print(f"[batch_client] Resuming batch {batch_id} ({batch.status})")
+    return batch_id
+
+
+def parse_batch_output(text: str) -> Dict[str, Dict[str, Any]]:
+    """Parse a batch output or error file into {custom_id: {"content" or "error"}}."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if record.get("error") or response.get("status_code", 200) >= 400:
+            error = record.get("error") or body.get("error") or f"HTTP {response.get('status_code')}"
+            results[custom_id] = {"error": error}
+            continue
+        try:
+            content = body["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            results[custom_id] = {"error": f"Unexpected response body: {str(body)[:200]}"}
+            continue
+        results[custom_id] = {"content": content.strip()}
+    return results
+
+
+def submit_batch(requests: List[BatchRequest], client: Any = None) -> str:
+    """Write, upload and submit a batch.
+
+    Returns:
+        The batch id
+    """
+    client = client or get_openai_client()
+    fd, path = tempfile.mkstemp(prefix="catholic_cuts_batch_", suffix=".jsonl")
+    os.close(fd)
+    try:
+        write_batch_file(requests, path)
+        with open(path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+    finally:
+        os.remove(path)
+
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=CHAT_ENDPOINT,
+        completion_window=config.BATCH_COMPLETION_WINDOW,
+    )
+    print(f"[batch_client] Submitted batch {batch.id} with {len(requests)} requests")
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, client: Any = None, timeout: Optional[float] = None) -> Any:
+    """Poll a batch with exponential backoff until it reaches a terminal state.
+
+    Raises:
+        RuntimeError: If the batch does not finish within the timeout
+    """
+    client = client or get_openai_client()
+    timeout = timeout or config.BATCH_TIMEOUT_SECONDS
+    deadline = time.monotonic() + timeout
+    delay = config.BATCH_POLL_INITIAL_SECONDS
+
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in BATCH_TERMINAL_STATES:
+            return batch
+        if time.monotonic() + delay > deadline:
+            raise RuntimeError(
+                f"Batch {batch_id} did not finish within {timeout:.0f}s (last status: {batch.status}); "
+                "rerun the same job to resume polling it"
+            )
+        time.sleep(delay)
+        delay = min(delay * 2, config.BATCH_POLL_MAX_SECONDS)
+
+
+def collect_batch_results(batch: Any, client: Any = None) -> Dict[str, Dict[str, Any]]:
+    """Download and parse a finished batch's output and error files."""
+    client = client or get_openai_client()
+    results: Dict[str, Dict[str, Any]] = {}
+    for file_id in (getattr(batch, "error_file_id", None), getattr(batch, "output_file_id", None)):
+        if file_id:
+            results.update(parse_batch_output(client.files.content(file_id).text))
+    return results
+
+
+def run_chat_batch(requests: List[BatchRequest], timeout: Optional[float] = None) -> Dict[str, str]:
+    """Run chat requests as one batch and map the replies back by custom_id.
+
+    A batch already submitted for the same requests (recorded in
+    CACHE_DIR/batches/) is resumed instead of submitting a new one, so a
+    rerun after a timeout or restart picks up where polling stopped.
+
+    Args:
+        requests: Requests with unique custom_ids
+        timeout: Give up polling after this many seconds (defaults to config.BATCH_TIMEOUT_SECONDS)
+
+    Returns:
+        {custom_id: response_text} for every request that succeeded; failed
+        requests are logged and left out
+
+    Raises:
+        RuntimeError: If the batch fails as a whole or times out (the batch
+            stays recorded, so rerunning the job resumes it)
+    """
+    if not requests:
+        return {}
+
+    client = get_openai_client()
+    started = time.monotonic()
+    fingerprint = batch_fingerprint(requests)
+    batch_id = _resumable_batch(fingerprint, client)
+    if batch_id is None:
+        batch_id = submit_batch(requests, client)
+        save_pending_batch(fingerprint, batch_id)
+
+    batch = wait_for_batch(batch_id, client, timeout)
+    if batch.status != BATCH_COMPLETED and not getattr(batch, "output_file_id", None):
+        clear_pending_batch(fingerprint)
+        raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+
+    results = collect_batch_results(batch, client)
+    clear_pending_batch(fingerprint)
+    replies = {}
+    for request in requests:
+        result = results.get(request.custom_id)
+        if result is None:
+            print(f"[batch_client] No result for {request.custom_id} in batch {batch_id}")
+        elif "error" in result:
+            print(f"[batch_client] Request {request.custom_id} failed: {result['error']}")
+        else:
+            replies[request.custom_id] = result["content"]
+
+    print(
+        f"[batch_client] Batch {batch_id} {batch.status}: {len(replies)}/{len(requests)} replies "
+        f"in {time.monotonic() - started:.0f}s"
+    )
+    return replies
@@ -1,23 +1,73 @@
 """Simple caching utilities for parsed moments.
 
 Provides file-based caching to avoid re-processing identical transcripts.
+Entries live in versioned namespaces (CACHE_DIR/ns_<fingerprint>/) derived
+from the prompt text, model and extraction settings, so changing any of them
+starts a fresh namespace instead of serving stale moments. Namespaces that
+haven't been used for a while are garbage-collected in the background.
+Directories are only created when something is saved; lookups never write.
+
+Whisper transcriptions are cached separately under CACHE_DIR/transcriptions/,
+keyed by the SHA-256 of the uploaded media plus model and options. The same
+sweep drops transcriptions unused for CACHE_TRANSCRIPTION_TTL_SECONDS and,
+oldest first, any beyond CACHE_TRANSCRIPTION_MAX_BYTES.
 """
 
 import os
+import re
 import json
+import time
+import shutil
 import hashlib
+import threading
 from typing import List, Dict, Any, Optional
 from src import config
 
+NAMESPACE_PREFIX = "ns_"
+NAMESPACE_MARKER = "_namespace.json"
+TRANSCRIPTION_DIR = "transcriptions"
 
-def _get_cache_dir() -> str:
+# Flat entries of the pre-namespace layout, removed once by the first GC sweep
+LEGACY_ENTRY_RE = re.compile(r"^(video_.+|transcript_[0-9a-f]{32})\.json$")
+LAYOUT_MARKER = "_layout.json"
+CACHE_LAYOUT_VERSION = 2
+
+# Suffix of namespaces being deleted (renamed first, so writers never see a half-deleted one)
+GC_TOMBSTONE = ".gc-"
+WRITE_ATTEMPTS = 3
+
+# Background GC bookkeeping (one sweep per CACHE_GC_INTERVAL_SECONDS per process)
+_gc_lock = threading.Lock()
+_gc_last_run = 0.0
+
+
+def _get_cache_dir(cache_dir: Optional[str] = None) -> str:
     """Get the cache directory, creating it if needed."""
-    cache_dir = config.CACHE_DIR
+    cache_dir = cache_dir or config.CACHE_DIR
     if not os.path.exists(cache_dir):
         os.makedirs(cache_dir, exist_ok=True)
     return cache_dir
 
 
+def cache_namespace(prompt_text: str, run_config: Optional[config.RunConfig] = None) -> str:
+    """Fingerprint the inputs that determine extraction output.
+
+    Args:
+        prompt_text: Full prompt text used for extraction (system + template)
+        run_config: Per-run settings; model and extraction settings are included
+
+    Returns:
+        Namespace name, e.g. "ns_3f2a9c81d0e4"
+    """
+    run_config = run_config or config.default_run_config()
+    payload = json.dumps({
+        "schema": config.CACHE_SCHEMA_VERSION,
+        "prompt": hashlib.sha256(prompt_text.encode('utf-8')).hexdigest(),
+        "settings": run_config.extraction_settings(),
+    }, sort_keys=True)
+    return NAMESPACE_PREFIX + hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
 def _build_cache_key(transcript_text: str, video_metadata: Optional[Dict] = None) -> str:
     """Build a stable cache key from transcript or video metadata.
 
@@ -25,6 +75,8 @@ def _build_cache_key(transcript_text: str, video_metadata: Optional[Dict] = None
     1. If video_metadata has video_id and language, use those
     2. Otherwise, use hash of transcript text
 
+    Prompt, model and settings are handled by the namespace, not the key.
+
     Args:
         transcript_text: The transcript content
         video_metadata: Optional metadata from YouTube extraction
@@ -44,34 +96,78 @@ def _build_cache_key(transcript_text: str, video_metadata: Optional[Dict] = None
     return f"transcript_{transcript_hash}"
 
 
-def _get_cache_path(cache_key: str) -> str:
-    """Get the full file path for a cache key."""
-    cache_dir = _get_cache_dir()
-    return os.path.join(cache_dir, f"{cache_key}.json")
+def _get_namespace_dir(namespace: str, cache_dir: Optional[str] = None) -> str:
+    """Get the directory for a namespace (it may not exist yet)."""
+    return os.path.join(cache_dir or config.CACHE_DIR, namespace)
+
 
+def _touch_namespace(namespace: str, cache_dir: Optional[str] = None, create: bool = False) -> None:
+    """Refresh a namespace's last-used time; with create, make its directory and marker first."""
+    ns_dir = _get_namespace_dir(namespace, cache_dir)
+    marker = os.path.join(ns_dir, NAMESPACE_MARKER)
+    if os.path.exists(marker):
+        os.utime(marker, None)
+    elif create:
+        os.makedirs(ns_dir, exist_ok=True)
+        with open(marker, 'w', encoding='utf-8') as f:
+            json.dump({"namespace": namespace, "created_at": time.time()}, f)
 
-def get_cached_moments(transcript_text: str, video_metadata: Optional[Dict] = None) -> Optional[List[Dict[str, Any]]]:
+
+def _get_cache_path(cache_key: str, namespace: str, cache_dir: Optional[str] = None) -> str:
+    """Get the full file path for a cache key inside a namespace."""
+    return os.path.join(_get_namespace_dir(namespace, cache_dir), f"{cache_key}.json")
+
+
+def _write_json_atomic(data: Dict[str, Any], path: str, ensure_dir: Any = None, **dump_kwargs: Any) -> None:
+    """Write JSON to a temp file and rename it into place.
+
+    Concurrent readers never see a partial file. If the directory vanishes
+    under the write (a GC sweep removed it), ensure_dir() recreates it and
+    the write is retried, up to WRITE_ATTEMPTS times in all.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    for attempt in range(WRITE_ATTEMPTS):
+        try:
+            if ensure_dir is not None:
+                ensure_dir()
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+            os.replace(tmp_path, path)
+            return
+        except FileNotFoundError:
+            if attempt == WRITE_ATTEMPTS - 1 or ensure_dir is None:
+                raise
+
+
+def get_cached_moments(transcript_text: str, video_metadata: Optional[Dict] = None, run_config: Optional[config.RunConfig] = None,
+                       namespace: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
     """Retrieve cached moments if available.
 
     Args:
         transcript_text: The transcript content
         video_metadata: Optional video metadata
+        run_config: Per-run settings (defaults to the module defaults)
+        namespace: Cache namespace from cache_namespace() (defaults to one
+            derived from run_config alone)
 
     Returns:
         Cached moments list or None if not found/disabled
     """
-    if not config.CACHE_ENABLED:
+    run_config = run_config or config.default_run_config()
+    if not run_config.cache_enabled:
         return None
 
     try:
+        namespace = namespace or cache_namespace("", run_config)
         cache_key = _build_cache_key(transcript_text, video_metadata)
-        cache_path = _get_cache_path(cache_key)
+        cache_path = _get_cache_path(cache_key, namespace, run_config.cache_dir)
 
         if not os.path.exists(cache_path):
             return None
 
         with open(cache_path, 'r', encoding='utf-8') as f:
             cached_data = json.load(f)
+        _touch_namespace(namespace, run_config.cache_dir)
 
         # Validate cache structure
         if not isinstance(cached_data, dict) or 'moments' not in cached_data:
@@ -83,7 +179,7 @@ def get_cached_moments(transcript_text: str, video_metadata: Optional[Dict] = No
             print(f"[cache] Invalid moments structure for key {cache_key}")
             return None
 
-        print(f"[cache] Cache hit for key {cache_key} – returning {len(moments)} cached moments")
+        print(f"[cache] Cache hit for key {namespace}/{cache_key} – returning {len(moments)} cached moments")
         return moments
 
     except Exception as e:
@@ -91,47 +187,360 @@ def get_cached_moments(transcript_text: str, video_metadata: Optional[Dict] = No
         return None
 
 
-def save_moments_to_cache(moments: List[Dict[str, Any]], transcript_text: str, video_metadata: Optional[Dict] = None) -> None:
+def save_moments_to_cache(moments: List[Dict[str, Any]], transcript_text: str, video_metadata: Optional[Dict] = None,
+                          run_config: Optional[config.RunConfig] = None, namespace: Optional[str] = None) -> None:
     """Save moments to cache.
 
+    Also schedules a background sweep of stale namespaces.
+
     Args:
         moments: The parsed moments to cache
         transcript_text: The transcript content
         video_metadata: Optional video metadata
+        run_config: Per-run settings (defaults to the module defaults)
+        namespace: Cache namespace from cache_namespace()
     """
-    if not config.CACHE_ENABLED:
+    run_config = run_config or config.default_run_config()
+    if not run_config.cache_enabled:
         return
 
     try:
+        namespace = namespace or cache_namespace("", run_config)
         cache_key = _build_cache_key(transcript_text, video_metadata)
-        cache_path = _get_cache_path(cache_key)
+        cache_path = _get_cache_path(cache_key, namespace, run_config.cache_dir)
 
         cache_data = {
             'cache_key': cache_key,
+            'namespace': namespace,
             'moments_count': len(moments),
             'moments': moments
         }
 
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=2, ensure_ascii=False)
+        _write_json_atomic(
+            cache_data, cache_path, indent=2,
+            ensure_dir=lambda: _touch_namespace(namespace, run_config.cache_dir, create=True),
+        )
 
-        print(f"[cache] Saved {len(moments)} moments to cache with key {cache_key}")
+        print(f"[cache] Saved {len(moments)} moments to cache with key {namespace}/{cache_key}")
+
+        schedule_cache_gc(namespace, run_config.cache_dir)
 
     except Exception as e:
         print(f"[cache] Error saving to cache: {e}")
 
 
-def clear_cache() -> None:
-    """Clear all cached files."""
+def transcription_cache_key(media_sha256: str, model: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Build the cache key for one transcription.
+
+    Args:
+        media_sha256: SHA-256 of the uploaded media bytes
+        model: Transcription model/backend name
+        options: Settings that change the output (trimming, codec, ...)
+
+    Returns:
+        Stable cache key string
+    """
+    payload = json.dumps({
+        "schema": config.CACHE_SCHEMA_VERSION,
+        "model": model,
+        "options": options or {},
+    }, sort_keys=True)
+    options_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+    return f"media_{media_sha256}_{options_hash}"
+
+
+def _get_transcription_dir(cache_dir: Optional[str] = None) -> str:
+    return os.path.join(cache_dir or config.CACHE_DIR, TRANSCRIPTION_DIR)
+
+
+def _get_transcription_path(cache_key: str, cache_dir: Optional[str] = None) -> str:
+    return os.path.join(_get_transcription_dir(cache_dir), f"{cache_key}.json")
+
+
+def get_cached_transcription(media_sha256: str, model: str, options: Optional[Dict[str, Any]] = None,
+                             run_config: Optional[config.RunConfig] = None) -> Optional[Dict[str, Any]]:
+    """Retrieve a cached transcription if available.
+
+    Args:
+        media_sha256: SHA-256 of the uploaded media bytes
+        model: Transcription model/backend name
+        options: Settings that change the output
+        run_config: Per-run settings (defaults to the module defaults)
+
+    Returns:
+        Dict with transcript_text and stats, or None if not found/disabled
+    """
+    run_config = run_config or config.default_run_config()
+    if not run_config.cache_enabled:
+        return None
+
+    try:
+        cache_key = transcription_cache_key(media_sha256, model, options)
+        cache_path = _get_transcription_path(cache_key, run_config.cache_dir)
+
+        if not os.path.exists(cache_path):
+            return None
+
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached_data = json.load(f)
+
+        if not isinstance(cached_data, dict) or not isinstance(cached_data.get('transcript_text'), str):
+            print(f"[cache] Invalid transcription cache structure for key {cache_key}")
+            return None
+
+        os.utime(cache_path, None)
+        print(f"[cache] Transcription cache hit for key {cache_key}")
+        return cached_data
+
+    except Exception as e:
+        print(f"[cache] Error reading transcription cache: {e}")
+        return None
+
+
+def save_transcription_to_cache(transcript_text: str, media_sha256: str, model: str,
+                                options: Optional[Dict[str, Any]] = None, stats: Optional[Dict[str, Any]] = None,
+                                run_config: Optional[config.RunConfig] = None) -> None:
+    """Save a transcription to cache.
+
+    Also schedules a background sweep, which collects old transcriptions.
+
+    Args:
+        transcript_text: Timestamped transcript text
+        media_sha256: SHA-256 of the uploaded media bytes
+        model: Transcription model/backend name
+        options: Settings that change the output
+        stats: Transcription stats to return on a cache hit
+        run_config: Per-run settings (defaults to the module defaults)
+    """
+    run_config = run_config or config.default_run_config()
+    if not run_config.cache_enabled:
+        return
+
+    try:
+        cache_key = transcription_cache_key(media_sha256, model, options)
+        cache_path = _get_transcription_path(cache_key, run_config.cache_dir)
+
+        cache_data = {
+            'cache_key': cache_key,
+            'model': model,
+            'options': options or {},
+            'stats': stats or {},
+            'transcript_text': transcript_text,
+        }
+
+        _write_json_atomic(
+            cache_data, cache_path,
+            ensure_dir=lambda: os.makedirs(_get_transcription_dir(run_config.cache_dir), exist_ok=True),
+        )
+
+        print(f"[cache] Saved transcription to cache with key {cache_key}")
+
+        schedule_cache_gc(cache_dir=run_config.cache_dir)
+
+    except Exception as e:
+        print(f"[cache] Error saving transcription to cache: {e}")
+
+
+def gc_transcriptions(cache_dir: Optional[str] = None, max_age_seconds: Optional[float] = None,
+                      max_bytes: Optional[int] = None) -> int:
+    """Delete cached transcriptions that are stale or over the size cap.
+
+    A cache hit refreshes the file's mtime, so mtime is the last use.
+    Transcriptions idle for longer than max_age_seconds are removed, then
+    the least recently used ones until the rest fit in max_bytes. Files are
+    written atomically, so a concurrent reader either sees a whole entry or
+    a miss.
+
+    Args:
+        cache_dir: Cache root (defaults to config.CACHE_DIR)
+        max_age_seconds: Idle time before a transcription is collected
+            (defaults to config.CACHE_TRANSCRIPTION_TTL_SECONDS)
+        max_bytes: Total size to keep (defaults to config.CACHE_TRANSCRIPTION_MAX_BYTES)
+
+    Returns:
+        Number of transcriptions removed
+    """
+    transcription_dir = _get_transcription_dir(cache_dir)
+    if not os.path.isdir(transcription_dir):
+        return 0
+    if max_age_seconds is None:
+        max_age_seconds = config.CACHE_TRANSCRIPTION_TTL_SECONDS
+    if max_bytes is None:
+        max_bytes = config.CACHE_TRANSCRIPTION_MAX_BYTES
+    cutoff = time.time() - max_age_seconds
+
+    entries = []
+    for entry in os.listdir(transcription_dir):
+        path = os.path.join(transcription_dir, entry)
+        try:
+            if entry.endswith('.json') and os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            continue
+
+    # Newest first: keep entries until they're stale or the budget runs out
+    entries.sort(reverse=True)
+    removed = 0
+    kept_bytes = 0
+    for mtime, size, path in entries:
+        if mtime >= cutoff and kept_bytes + size <= max_bytes:
+            kept_bytes += size
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            print(f"[cache] Error collecting transcription {os.path.basename(path)}: {e}")
+
+    return removed
+
+
+def _is_legacy_entry(path: str) -> bool:
+    """True for a moments file written by the pre-namespace flat layout."""
+    if not LEGACY_ENTRY_RE.match(os.path.basename(path)) or not os.path.isfile(path):
+        return False
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (isinstance(data, dict) and "moments" in data and "namespace" not in data
+            and data.get("cache_key") == os.path.basename(path)[:-len(".json")])
+
+
+def migrate_legacy_cache(cache_dir: Optional[str] = None) -> int:
+    """Remove the flat moments files of the pre-namespace layout, once per cache dir.
+
+    Only files matching the legacy key pattern and content are removed; a
+    layout marker records that the migration ran, so later sweeps skip it.
+
+    Returns:
+        Number of legacy files removed
+    """
+    cache_dir = cache_dir or config.CACHE_DIR
+    marker = os.path.join(cache_dir, LAYOUT_MARKER)
+    if not os.path.isdir(cache_dir) or os.path.exists(marker):
+        return 0
+
+    removed = 0
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        if _is_legacy_entry(path):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                print(f"[cache] Error removing legacy cache file {entry}: {e}")
+
+    _write_json_atomic({"layout": CACHE_LAYOUT_VERSION, "migrated_at": time.time()}, marker)
+    if removed:
+        print(f"[cache] Removed {removed} cache files of the old flat layout")
+    return removed
+
+
+def _namespace_last_used(path: str) -> float:
+    marker = os.path.join(path, NAMESPACE_MARKER)
+    return os.path.getmtime(marker if os.path.exists(marker) else path)
+
+
+def gc_cache_namespaces(active_namespace: Optional[str] = None, cache_dir: Optional[str] = None,
+                        max_age_seconds: Optional[float] = None) -> int:
+    """Delete namespaces unused for longer than max_age_seconds.
+
+    The active namespace is always kept. A stale namespace is first renamed
+    to a tombstone and only then deleted, so a concurrent save either lands
+    in the old directory before the rename (and is dropped with it) or
+    recreates the namespace afterwards; it never writes into a directory that
+    is half gone. The one-time legacy migration (migrate_legacy_cache) runs
+    first and cached transcriptions are collected last (gc_transcriptions).
+
+    Args:
+        active_namespace: Namespace currently in use
+        cache_dir: Cache root (defaults to config.CACHE_DIR)
+        max_age_seconds: Idle time before a namespace is collected
+            (defaults to config.CACHE_NAMESPACE_TTL_SECONDS)
+
+    Returns:
+        Number of namespaces/files removed
+    """
+    cache_dir = cache_dir or config.CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+    if max_age_seconds is None:
+        max_age_seconds = config.CACHE_NAMESPACE_TTL_SECONDS
+    cutoff = time.time() - max_age_seconds
+    removed = migrate_legacy_cache(cache_dir)
+
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        try:
+            if not entry.startswith(NAMESPACE_PREFIX) or not os.path.isdir(path):
+                continue
+            if GC_TOMBSTONE in entry:
+                # Left over from an interrupted sweep
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            if entry == active_namespace or _namespace_last_used(path) >= cutoff:
+                continue
+            tombstone = f"{path}{GC_TOMBSTONE}{os.getpid()}.{threading.get_ident()}"
+            os.rename(path, tombstone)
+            # Used again between the check and the rename: put it back
+            if _namespace_last_used(tombstone) >= cutoff and not os.path.exists(path):
+                os.rename(tombstone, path)
+                continue
+            shutil.rmtree(tombstone, ignore_errors=True)
+            removed += 1
+        except OSError as e:
+            print(f"[cache] Error collecting {entry}: {e}")
+
+    removed += gc_transcriptions(cache_dir)
+
+    if removed:
+        print(f"[cache] Garbage-collected {removed} stale cache namespaces/files")
+    return removed
+
+
+def schedule_cache_gc(active_namespace: Optional[str] = None, cache_dir: Optional[str] = None) -> bool:
+    """Run gc_cache_namespaces on a daemon thread, at most once per interval.
+
+    Returns:
+        True if a sweep was started
+    """
+    global _gc_last_run
+
+    with _gc_lock:
+        now = time.time()
+        if now - _gc_last_run < config.CACHE_GC_INTERVAL_SECONDS:
+            return False
+        _gc_last_run = now
+
+    def _run():
+        try:
+            gc_cache_namespaces(active_namespace, cache_dir)
+        except Exception as e:
+            print(f"[cache] Background GC failed: {e}")
+
+    threading.Thread(target=_run, name="cache-gc", daemon=True).start()
+    return True
+
+
+def clear_cache(cache_dir: Optional[str] = None) -> None:
+    """Clear all cached files in every namespace, plus cached transcriptions."""
     try:
-        cache_dir = _get_cache_dir()
-        cache_files = [f for f in os.listdir(cache_dir) if f.endswith('.json')]
+        cache_dir = _get_cache_dir(cache_dir)
+        removed = 0
 
-        for cache_file in cache_files:
-            cache_path = os.path.join(cache_dir, cache_file)
-            os.remove(cache_path)
+        for entry in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, entry)
+            if entry.endswith('.json') and os.path.isfile(path):
+                os.remove(path)
+                removed += 1
+            elif (entry.startswith(NAMESPACE_PREFIX) or entry == TRANSCRIPTION_DIR) and os.path.isdir(path):
+                removed += sum(1 for f in os.listdir(path) if f.endswith('.json') and f != NAMESPACE_MARKER)
+                shutil.rmtree(path, ignore_errors=True)
 
-        print(f"[cache] Cleared {len(cache_files)} cache files")
+        print(f"[cache] Cleared {removed} cache files")
 
     except Exception as e:
-        print(f"[cache] Error clearing cache: {e}")
\ No newline at end of file
+        print(f"[cache] Error clearing cache: {e}")
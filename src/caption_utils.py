@@ -0,0 +1,245 @@
+"""Caption file ingestion (SRT, WebVTT, YouTube JSON3).
+
+Turns caption files producers already have into the same timestamped
+transcript lines as flatten_transcript, so they can skip Apify and Whisper
+entirely. SRT and VTT are parsed line by line from a text stream in a single
+pass; JSON3 is a single JSON document and is loaded once.
+"""
+
+import io
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from src import config
+from src.segment_merge import rolling_overlap_words, rolling_repeat_ratio
+from src.transcript_utils import flatten_transcript
+
+CAPTION_FORMATS = ("srt", "vtt", "json3")
+CAPTION_EXTENSIONS = {"srt": "srt", "vtt": "vtt", "json": "json3", "json3": "json3"}
+
+# 00:01:02,345 / 00:01:02.345 / 01:02.345 (hours optional)
+_TIME = r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})"
+_CUE_TIMING_RE = re.compile(rf"^\s*{_TIME}\s*-->\s*{_TIME}")
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _to_seconds(hours: Optional[str], minutes: str, seconds: str, millis: str) -> float:
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis.ljust(3, "0")) / 1000.0
+
+
+def _clean_text(lines: List[str]) -> str:
+    """Join cue text lines, dropping markup such as <i>, <c.colorE5E5E5> or inline <00:00:01.000> times."""
+    text = " ".join(lines)
+    text = _TAG_RE.sub("", text)
+    text = text.replace("&amp;", "&").replace("&lt;", "<").replace("&gt;", ">").replace("&nbsp;", " ")
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _iter_timed_cues(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Shared SRT/VTT cue scanner: a timing line followed by text until a blank line.
+
+    Cue numbers (SRT), cue identifiers (VTT) and any line before a timing
+    line are ignored, so NOTE/STYLE/REGION blocks and headers fall through.
+    """
+    start = end = None
+    text_lines: List[str] = []
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        match = _CUE_TIMING_RE.match(line)
+
+        if match:
+            if start is not None and text_lines:
+                yield {"start": start, "end": end, "text": _clean_text(text_lines)}
+            groups = match.groups()
+            start = _to_seconds(*groups[:4])
+            end = _to_seconds(*groups[4:])
+            text_lines = []
+        elif not line.strip():
+            if start is not None and text_lines:
+                yield {"start": start, "end": end, "text": _clean_text(text_lines)}
+            start = end = None
+            text_lines = []
+        elif start is not None:
+            text_lines.append(line.strip())
+
+    if start is not None and text_lines:
+        yield {"start": start, "end": end, "text": _clean_text(text_lines)}
+
+
+def iter_srt_segments(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Stream {"start", "end", "text"} segments from SRT lines."""
+    for segment in _iter_timed_cues(lines):
+        if segment["text"]:
+            yield segment
+
+
+def iter_vtt_segments(lines: Iterable[str], stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream segments from WebVTT lines.
+
+    Rolling auto-captions repeat the previous cue's text, fully or in part
+    ("we are going" then "we are going to the store"). A cue that only
+    repeats the previous one extends its end time; a cue that opens with the
+    previous cue's last words (at least two, or all of them) keeps only its
+    new words.
+
+    Args:
+        lines: VTT lines after the header
+        stats: Optional dict that receives "cues" and "rolling_repeats" counts
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("cues", 0)
+    stats.setdefault("rolling_repeats", 0)
+    previous: Optional[Dict[str, Any]] = None
+    for segment in _iter_timed_cues(lines):
+        if not segment["text"]:
+            continue
+        stats["cues"] += 1
+        if previous is not None:
+            words = segment["text"].split()
+            overlap = rolling_overlap_words(previous["text"], segment["text"])
+            if overlap == len(words):
+                previous["end"] = max(previous["end"], segment["end"])
+                stats["rolling_repeats"] += 1
+                continue
+            if overlap >= 2 or (overlap and overlap == len(previous["text"].split())):
+                segment["text"] = " ".join(words[overlap:])
+                stats["rolling_repeats"] += 1
+            yield previous
+        previous = segment
+    if previous is not None:
+        yield previous
+
+
+def iter_json3_segments(data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Stream segments from a YouTube JSON3 caption document ({"events": [...]})."""
+    for event in data.get("events", []) or []:
+        segs = event.get("segs")
+        if not segs:
+            continue
+        text = _clean_text([s.get("utf8", "") for s in segs]).replace("\n", " ")
+        if not text:
+            continue
+        start = event.get("tStartMs", 0) / 1000.0
+        end = start + event.get("dDurationMs", 0) / 1000.0
+        yield {"start": start, "end": end, "text": text}
+
+
+def json3_is_auto_generated(data: Dict[str, Any]) -> bool:
+    """YouTube ASR tracks append words to a rolling window (aAppend) and carry per-word confidence (acAsrConf)."""
+    for event in data.get("events", []) or []:
+        if event.get("aAppend"):
+            return True
+        if any("acAsrConf" in seg for seg in event.get("segs") or []):
+            return True
+    return False
+
+
+def detect_caption_format(filename: Optional[str] = None, first_line: str = "") -> Optional[str]:
+    """Guess the caption format from the file extension, then the first line."""
+    if filename:
+        ext = os.path.splitext(filename)[1].lstrip(".").lower()
+        if ext in CAPTION_EXTENSIONS:
+            return CAPTION_EXTENSIONS[ext]
+
+    head = first_line.lstrip("﻿").strip()
+    if head.startswith("WEBVTT"):
+        return "vtt"
+    if head.startswith("{"):
+        return "json3"
+    if head.isdigit() or _CUE_TIMING_RE.match(head):
+        return "srt"
+    return None
+
+
+def _read_vtt_language(header_lines: List[str]) -> str:
+    for line in header_lines:
+        if line.lower().startswith("language:"):
+            return line.split(":", 1)[1].strip()
+    return ""
+
+
+def parse_caption_file(
+    source: Union[str, bytes, TextIO],
+    filename: Optional[str] = None,
+    caption_format: Optional[str] = None,
+    auto_generated: Optional[bool] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Parse a caption file into flatten_transcript-style text plus metadata.
+
+    Auto-generated captions are detected from the JSON3 ASR markers or, for
+    SRT/VTT, from how often cues repeat the previous cue's tail (see
+    config.AUTO_CAPTION_REPEAT_RATIO). They are then merged into sentences
+    like auto-captions fetched from YouTube.
+
+    Args:
+        source: Caption text, raw bytes, or a text stream (read line by line)
+        filename: Optional file name, used for format detection and title
+        caption_format: Force "srt", "vtt" or "json3" instead of detecting it
+        auto_generated: Whether the captions are auto-generated; None detects it
+
+    Returns:
+        Tuple of (formatted_transcript_text, metadata_dict)
+
+    Raises:
+        RuntimeError: If the format is unknown or no captions were found
+    """
+    if isinstance(source, bytes):
+        source = source.decode("utf-8-sig", errors="replace")
+    stream = io.StringIO(source) if isinstance(source, str) else source
+
+    first_line = stream.readline()
+    fmt = caption_format or detect_caption_format(filename, first_line)
+    if fmt not in CAPTION_FORMATS:
+        raise RuntimeError(
+            f"Unrecognized caption format for {filename or 'upload'}. "
+            f"Supported: {', '.join(CAPTION_FORMATS)}"
+        )
+
+    language = ""
+    if fmt == "json3":
+        try:
+            data = json.loads(first_line + stream.read())
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Invalid JSON3 caption file: {e}")
+        segments = list(iter_json3_segments(data))
+        detected_auto = json3_is_auto_generated(data)
+    else:
+        def lines() -> Iterator[str]:
+            yield first_line.lstrip("﻿")
+            yield from stream
+
+        if fmt == "vtt":
+            # Header runs until the first blank line; pick up "Language:" if present
+            header: List[str] = []
+            line_iter = lines()
+            for line in line_iter:
+                if not line.strip():
+                    break
+                header.append(line.strip())
+            language = _read_vtt_language(header)
+            stats: Dict[str, int] = {}
+            segments = list(iter_vtt_segments(line_iter, stats))
+            detected_auto = stats["rolling_repeats"] >= config.AUTO_CAPTION_REPEAT_RATIO * max(stats["cues"] - 1, 1)
+        else:
+            segments = list(iter_srt_segments(lines()))
+            detected_auto = rolling_repeat_ratio(segments) >= config.AUTO_CAPTION_REPEAT_RATIO
+
+    if not segments:
+        raise RuntimeError(f"No captions found in {filename or 'upload'}")
+
+    is_auto = detected_auto if auto_generated is None else auto_generated
+    transcript_text = flatten_transcript({"transcript": segments, "is_auto_generated": is_auto})
+    metadata = {
+        "title": os.path.splitext(filename)[0] if filename else "",
+        "source_type": "captions",
+        "caption_format": fmt,
+        "segment_count": len(segments),
+        "duration_seconds": int(max(s["end"] for s in segments)),
+        "language": language or "en",
+        "is_auto_generated": is_auto,
+    }
+    return transcript_text, metadata
@@ -0,0 +1,277 @@
+"""Adaptive (AIMD) concurrency control for LLM calls.
+
+A fixed parallelism is too low when the API is quiet and too high when we
+are being throttled. AdaptiveLimiter behaves like TCP congestion control:
+
+- additive increase: each healthy reply (latency under the target) grows
+  the limit by 1/limit, i.e. by about one slot per round of requests;
+- multiplicative decrease: a 429 or a timeout multiplies the limit by
+  CONCURRENCY_DECREASE_FACTOR, at most once per observed latency so one
+  burst of throttled replies counts as a single congestion signal.
+
+One limiter is shared per process, since the provider's rate limit is per
+API key rather than per run. Its current limit, counters and a short history
+of limit changes are exposed through metrics().
+
+Limiter-gated calls run with the SDK's own retries off (max_retries=0), so
+every 429 reaches the limiter instead of being retried invisibly inside
+the slot; call_with_retries retries them after the limit has been cut.
+
+LatencyTracker keeps a rolling window of call latencies; its p95 is the
+point past which a chunk call gets a hedged duplicate request. A losing
+call that is already on the wire can't be interrupted: it keeps a pool
+thread and its limiter slot until it returns, and is billed like any
+other call. The tracker counts those losers (hedge_losers_running now,
+hedge_losers_billed in total), so the cost of hedging stays visible.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from src import config
+
+T = TypeVar("T")
+
+
+def classify_error(error: BaseException) -> str:
+    """Classify an API failure as "throttle", "timeout" or "error".
+
+    Works on OpenAI, httpx and builtin exceptions without importing them.
+    """
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    name = type(error).__name__
+    if status == 429 or "RateLimit" in name:
+        return "throttle"
+    if isinstance(error, TimeoutError) or "Timeout" in name or status in (408, 504):
+        return "timeout"
+    return "error"
+
+
+def call_with_retries(fn: Callable[[], T], retries: Optional[int] = None, label: str = "LLM call") -> T:
+    """Run fn, retrying throttles and timeouts with exponential backoff.
+
+    Each attempt takes its own limiter slot inside fn, so a retry waits for
+    room under the reduced limit. Other errors are raised immediately.
+
+    Args:
+        fn: The gated call (acquires and releases its own slot)
+        retries: Extra attempts after the first (defaults to config.OPENAI_MAX_RETRIES)
+        label: Name used in log lines
+
+    Returns:
+        fn's result
+    """
+    retries = config.OPENAI_MAX_RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            kind = classify_error(e)
+            if kind == "error" or attempt == retries:
+                raise
+            delay = config.THROTTLE_RETRY_BASE_SECONDS * 2 ** attempt
+            print(f"[concurrency] {label} hit a {kind}; retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            time.sleep(delay)
+    raise RuntimeError(f"{label} made no attempts")
+
+
+class AdaptiveLimiter:
+    """Thread-safe AIMD concurrency limiter with metrics."""
+
+    def __init__(self, initial: Optional[int] = None, min_limit: Optional[int] = None,
+                 max_limit: Optional[int] = None, latency_target: Optional[float] = None,
+                 decrease_factor: Optional[float] = None):
+        self.min_limit = min_limit or config.CONCURRENCY_MIN
+        self.max_limit = max_limit or config.CONCURRENCY_MAX
+        if not 1 <= self.min_limit <= self.max_limit:
+            raise ValueError("Concurrency limits must satisfy 1 <= min <= max")
+        self.latency_target = latency_target or config.CONCURRENCY_LATENCY_TARGET_SECONDS
+        self.decrease_factor = decrease_factor or config.CONCURRENCY_DECREASE_FACTOR
+
+        self._limit = float(min(max(initial or config.MAX_PARALLEL_CHUNKS, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._last_decrease = 0.0
+        self._last_latency = 0.0
+        self._counts = {"success": 0, "slow": 0, "throttle": 0, "timeout": 0, "error": 0}
+        self._history: deque = deque(maxlen=config.CONCURRENCY_HISTORY_SIZE)
+        self._record_history("start")
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return int(self._limit)
+
+    def _record_history(self, reason: str) -> None:
+        self._history.append({"time": time.time(), "limit": self.limit, "reason": reason})
+
+    def acquire(self) -> None:
+        """Block until a slot is free under the current limit."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now (used for optional hedged calls)."""
+        with self._cond:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, latency: Optional[float] = None, error: Optional[BaseException] = None) -> None:
+        """Free a slot and feed the outcome of the call into the limit."""
+        with self._cond:
+            self._in_flight -= 1
+            if error is not None:
+                self._on_failure(classify_error(error))
+            elif latency is not None:
+                self._on_success(latency)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot around one API call, timing it and recording failures."""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.release(error=e)
+            raise
+        self.release(latency=time.monotonic() - started)
+
+    def _on_success(self, latency: float) -> None:
+        self._last_latency = latency
+        if latency > self.latency_target:
+            self._counts["slow"] += 1
+            return
+        self._counts["success"] += 1
+        previous = self.limit
+        self._limit = min(self._limit + 1.0 / self._limit, float(self.max_limit))
+        if self.limit != previous:
+            self._record_history("increase")
+
+    def _on_failure(self, kind: str) -> None:
+        self._counts[kind] += 1
+        if kind == "error":
+            return
+        now = time.monotonic()
+        # Replies to requests sent before the last decrease don't count again
+        if now - self._last_decrease < self._last_latency:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(self._limit * self.decrease_factor, float(self.min_limit))
+        if self.limit != previous:
+            self._record_history(kind)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current limit, in-flight calls, outcome counters and limit history."""
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "last_latency_seconds": round(self._last_latency, 2),
+                "counts": dict(self._counts),
+                "history": list(self._history),
+            }
+
+
+class LatencyTracker:
+    """Rolling window of call latencies plus hedged request counters."""
+
+    def __init__(self, window: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=window or config.LATENCY_WINDOW_SIZE)
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._losers_running = 0
+        self._losers_billed = 0
+        self._losers_cancelled = 0
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def record_hedge(self, won: Optional[bool] = None) -> None:
+        """Count a hedged request being sent (won=None) or winning the race (won=True)."""
+        with self._lock:
+            if won:
+                self._hedge_wins += 1
+            else:
+                self._hedges += 1
+
+    def record_hedge_loser(self, running: bool) -> None:
+        """Count the losing call of a hedged race: cancelled before it started, or still running."""
+        with self._lock:
+            if running:
+                self._losers_running += 1
+                self._losers_billed += 1
+            else:
+                self._losers_cancelled += 1
+
+    def hedge_loser_finished(self) -> None:
+        """A running loser returned, freeing its thread and limiter slot."""
+        with self._lock:
+            self._losers_running -= 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency quantile of the window, or None with fewer than HEDGE_MIN_SAMPLES samples."""
+        with self._lock:
+            if len(self._latencies) < config.HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def metrics(self) -> Dict[str, Any]:
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        with self._lock:
+            return {
+                "samples": len(self._latencies),
+                "p50_seconds": None if p50 is None else round(p50, 2),
+                "p95_seconds": None if p95 is None else round(p95, 2),
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "hedge_losers_running": self._losers_running,
+                "hedge_losers_billed": self._losers_billed,
+                "hedge_losers_cancelled": self._losers_cancelled,
+            }
+
+
+_limiter: Optional[AdaptiveLimiter] = None
+_latency_tracker: Optional[LatencyTracker] = None
+_limiter_lock = threading.Lock()
+
+
+def get_llm_limiter() -> AdaptiveLimiter:
+    """Return the process-wide limiter for LLM calls, creating it on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AdaptiveLimiter()
+    return _limiter
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Return the process-wide LLM latency tracker, creating it on first use."""
+    global _latency_tracker
+    if _latency_tracker is None:
+        with _limiter_lock:
+            if _latency_tracker is None:
+                _latency_tracker = LatencyTracker()
+    return _latency_tracker
+
+
+def concurrency_metrics() -> Dict[str, Any]:
+    """Metrics of the process-wide LLM limiter, with latency and hedging stats under "latency"."""
+    metrics = get_llm_limiter().metrics()
+    metrics["latency"] = get_latency_tracker().metrics()
+    return metrics
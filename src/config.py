@@ -4,11 +4,28 @@ Handles environment variable loading and validation for API keys and settings.
 """
 
 import os
-from typing import Optional
-from dotenv import load_dotenv
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
 
-# Load environment variables from .env file, overriding existing ones
-load_dotenv(override=True)
+_env_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_environment() -> None:
+    """Load the .env file (overriding existing variables) once, on first use.
+
+    Deferred so importing config stays cheap; python-dotenv is only imported here.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if _env_loaded:
+            return
+        from dotenv import load_dotenv
+        load_dotenv(override=True)
+        _env_loaded = True
 
 
 def get_required_env(name: str) -> str:
@@ -23,6 +40,7 @@ def get_required_env(name: str) -> str:
     Raises:
         RuntimeError: If environment variable is missing or empty
     """
+    load_environment()
     value = os.getenv(name)
     if not value:
         raise RuntimeError(
@@ -42,6 +60,7 @@ def get_optional_env(name: str, default: str = "") -> str:
     Returns:
         Environment variable value or default
     """
+    load_environment()
     return os.getenv(name, default)
 
 
@@ -58,12 +77,183 @@ FAST_MODEL = "gpt-4.1-mini"
 # Extraction Performance Settings
 CHARS_PER_CHUNK = 9000  # Increased from ~5000 for fewer API calls
 MAX_MOMENTS_PER_CHUNK = 3  # Limit moments per chunk for speed
-MAX_PARALLEL_CHUNKS = 3  # Parallel processing limit
+MAX_PARALLEL_CHUNKS = 3  # Parallel processing limit (starting point when adaptive)
 MOMENT_SAFETY_LIMIT = 5  # Hard limit to protect downstream processing
+FUSED_CUT_SHEETS = False  # Ask for cut sheet fields during extraction (skips the second LLM stage)
+CHUNK_OVERLAP_CHARS = 0  # Trailing context repeated at the start of the next chunk
+PREFILTER_ENABLED = False  # Drop/collapse low-value transcript spans before chunking (opt-in)
+COMPACT_PROMPTS = True  # Send timestamped chunks as "L<n> text" lines; timestamps restored locally
+PROMPT_TIME_ANCHOR_SECONDS = 60  # Spacing of "@MM:SS" anchors in compact prompts
+
+# Auto-caption consolidation (see src/segment_merge.py)
+MERGE_AUTO_CAPTIONS = True  # Merge auto-generated caption fragments into sentences
+CAPTION_MERGE_PAUSE_SECONDS = 0.8  # Gap that ends a sentence
+CAPTION_MERGE_MAX_CHARS = 240  # Longest merged segment text
+CAPTION_MERGE_MAX_SECONDS = 20.0  # Longest merged segment duration
+AUTO_CAPTION_REPEAT_RATIO = 0.3  # Share of cues repeating the previous cue's tail that marks captions as auto-generated
+
+# Adaptive Concurrency (see src/concurrency.py)
+ADAPTIVE_CONCURRENCY = True  # AIMD limit on concurrent LLM calls instead of a fixed pool
+CONCURRENCY_MIN = 1
+CONCURRENCY_MAX = 16
+CONCURRENCY_LATENCY_TARGET_SECONDS = 60.0  # Slower replies don't grow the limit
+CONCURRENCY_DECREASE_FACTOR = 0.5  # Multiplier applied on 429s and timeouts
+CONCURRENCY_HISTORY_SIZE = 200  # Limit changes kept for metrics
+THROTTLE_RETRY_BASE_SECONDS = 1.0  # First backoff before retrying a throttled limiter-gated call (doubles per attempt)
+
+# Tail-latency Scheduling
+HEDGED_REQUESTS = True  # Duplicate a chunk call that runs past the observed p95 latency
+HEDGE_LATENCY_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20  # Latencies observed before hedging starts
+HEDGE_MIN_DELAY_SECONDS = 10.0  # Never hedge a call younger than this
+LATENCY_WINDOW_SIZE = 200  # Recent call latencies kept for quantiles
+
+# HTTP Client Settings (shared pools, see src/http_clients.py)
+HTTP_MAX_CONNECTIONS = 20  # Per-process connection pool size
+HTTP_MAX_KEEPALIVE = 10  # Idle connections kept open for reuse
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+OPENAI_TIMEOUT_SECONDS = 120.0  # Chat completions
+OPENAI_TRANSCRIBE_TIMEOUT_SECONDS = 600.0  # Whisper uploads + transcription
+OPENAI_MAX_RETRIES = 2
+APIFY_TIMEOUT_SECONDS = 300.0  # Synchronous actor run
+
+# Apify Settings
+APIFY_BASE_URL = "https://api.apify.com"  # Overridable for local fakes
+APIFY_POLL_INITIAL_SECONDS = 1.0  # First delay between run status polls
+APIFY_POLL_MAX_SECONDS = 15.0  # Backoff ceiling between polls
+APIFY_RUN_TIMEOUT_SECONDS = 1800.0  # Give up on an async run after this long
+APIFY_DATASET_PAGE_SIZE = 100  # Items fetched per dataset page
+APIFY_MAX_CONCURRENT_RUNS = 5  # Videos fetched at once in async mode
+APIFY_ASYNC_RUNS = True  # Start a run and poll it (src.apify_async) instead of the 300 s run-sync endpoint
+
+# Execution Mode
+EXECUTION_MODES = ("sync", "batch")
+EXECUTION_MODE = "sync"  # "batch" runs chunk and cut sheet calls through the OpenAI Batch API
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INITIAL_SECONDS = 5.0  # First delay between batch status polls
+BATCH_POLL_MAX_SECONDS = 300.0  # Backoff ceiling between polls
+BATCH_TIMEOUT_SECONDS = 26 * 3600  # Give up on a batch after this long
+
+# Upload Handling (see src/upload_utils.py)
+UPLOAD_BLOCK_BYTES = 1024 * 1024  # Copy/decode uploads in blocks of this size
+
+# Audio Preprocessing (see src/audio_preprocess.py)
+VAD_ENABLED = True  # Trim long silences/applause before Whisper upload
+VAD_FRAME_MS = 30  # Analysis frame length
+VAD_THRESHOLD_DB = 12.0  # Frame energy above the noise floor that counts as speech
+VAD_MIN_ENERGY_DB = -55.0  # Absolute floor so near-silent recordings aren't all "speech"
+VAD_MAX_FLATNESS = 0.5  # Spectral flatness above this is treated as noise/applause
+VAD_MIN_SILENCE_SECONDS = 1.0  # Only gaps at least this long are removed
+VAD_PADDING_SECONDS = 0.2  # Audio kept either side of each speech region
+TRANSCRIPTION_BACKEND = "openai"  # "openai" (hosted whisper-1) or "local" (faster-whisper on CPU)
+WHISPER_MODEL = "whisper-1"
+LOCAL_WHISPER_MODEL = "small"  # faster-whisper model size/name
+LOCAL_WHISPER_COMPUTE_TYPE = "int8"  # CTranslate2 quantization
+LOCAL_WHISPER_WORKERS = 0  # Parallel decoders (0 = min(4, CPU count))
+LOCAL_WHISPER_MIN_PART_SECONDS = 60  # Don't split audio into parallel parts shorter than this
+LOCAL_WHISPER_BEAM_SIZE = 5
+WHISPER_MAX_UPLOAD_MB = 25  # OpenAI Whisper upload limit
+TRANSCODE_ENABLED = True  # Re-encode audio with ffmpeg (when installed) before upload
+TRANSCODE_CODEC = "opus"  # "opus" (.ogg) or "mp3"
+TRANSCODE_BITRATE_KBPS = 24  # Mono 16 kHz speech bitrate
+MAX_MEDIA_UPLOAD_MB = 200  # Accepted upload size when ffmpeg can shrink it below the Whisper limit
+
+# Lexical Pre-filter Settings (see src/prefilter.py)
+PREFILTER_DROP_QUANTILE = 0.3  # Lowest-scoring fraction of lines eligible for removal
+PREFILTER_MIN_SPAN_LINES = 3  # Only runs of at least this many low lines are removed
+PREFILTER_CONTEXT_LINES = 2  # Neighbouring lines each side used to smooth scores
+PREFILTER_COLLAPSE = True  # Replace removed spans with one timestamped placeholder line
+PREFILTER_WEIGHT_LEXICON = 1.0
+PREFILTER_WEIGHT_NOVELTY = 0.5
+PREFILTER_WEIGHT_LENGTH = 0.3
+PREFILTER_WEIGHT_QUESTION = 0.5
+
+# Audio Intensity Scoring (see src/audio_features.py)
+INTENSITY_SCORING_ENABLED = False  # Always score uploads (hot chunks first); on anyway when INTENSITY_SKIP_BELOW > 0
+INTENSITY_WINDOW_SECONDS = 5.0  # Analysis window length
+INTENSITY_WEIGHT_LOUDNESS = 0.4
+INTENSITY_WEIGHT_FLUX = 0.3
+INTENSITY_WEIGHT_RATE = 0.3
+INTENSITY_SKIP_BELOW = 0.0  # Skip chunks scoring below this (0 = never skip)
 
 # Cache Settings
 CACHE_ENABLED = True
 CACHE_DIR = ".catholic_cache"
+CACHE_SCHEMA_VERSION = 1  # Bump to invalidate every namespace after a format change
+CACHE_NAMESPACE_TTL_SECONDS = 14 * 24 * 3600  # Unused namespaces are collected after this
+CACHE_GC_INTERVAL_SECONDS = 3600  # Minimum time between background GC sweeps
+CACHE_TRANSCRIPTION_TTL_SECONDS = 30 * 24 * 3600  # Unused transcriptions are collected after this
+CACHE_TRANSCRIPTION_MAX_BYTES = 200 * 1024 * 1024  # Oldest transcriptions are dropped above this
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """Immutable per-run pipeline settings.
+
+    Passed explicitly through extraction, cut sheet generation and caching so
+    concurrent sessions can use different settings without touching the
+    module-level defaults above. Use dataclasses.replace() to derive a
+    variant, and default_run_config() to snapshot the current defaults.
+    """
+    chars_per_chunk: int = CHARS_PER_CHUNK
+    chunk_overlap_chars: int = CHUNK_OVERLAP_CHARS
+    max_parallel_chunks: int = MAX_PARALLEL_CHUNKS
+    adaptive_concurrency: bool = ADAPTIVE_CONCURRENCY
+    hedged_requests: bool = HEDGED_REQUESTS
+    primary_model: str = PRIMARY_MODEL
+    fast_model: str = FAST_MODEL
+    max_moments_per_chunk: int = MAX_MOMENTS_PER_CHUNK
+    moment_safety_limit: int = MOMENT_SAFETY_LIMIT
+    fused_cut_sheets: bool = FUSED_CUT_SHEETS
+    prefilter_enabled: bool = PREFILTER_ENABLED
+    compact_prompts: bool = COMPACT_PROMPTS
+    intensity_skip_below: float = INTENSITY_SKIP_BELOW
+    execution_mode: str = EXECUTION_MODE
+    cache_enabled: bool = CACHE_ENABLED
+    cache_dir: str = CACHE_DIR
+
+    def __post_init__(self):
+        if self.chars_per_chunk <= 0:
+            raise ValueError("chars_per_chunk must be positive")
+        if not 0 <= self.chunk_overlap_chars < self.chars_per_chunk:
+            raise ValueError("chunk_overlap_chars must be between 0 and chars_per_chunk")
+        if self.max_parallel_chunks < 1:
+            raise ValueError("max_parallel_chunks must be at least 1")
+        if not 0.0 <= self.intensity_skip_below <= 1.0:
+            raise ValueError("intensity_skip_below must be between 0 and 1")
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"execution_mode must be one of: {', '.join(EXECUTION_MODES)}")
+
+    def extraction_settings(self) -> Dict[str, Any]:
+        """Settings that change extraction output (used for cache keys)."""
+        settings = asdict(self)
+        for key in ("max_parallel_chunks", "adaptive_concurrency", "hedged_requests",
+                    "execution_mode", "cache_enabled", "cache_dir"):
+            settings.pop(key)
+        return settings
+
+
+def default_run_config() -> RunConfig:
+    """Snapshot the current module-level defaults as a RunConfig."""
+    return RunConfig(
+        chars_per_chunk=CHARS_PER_CHUNK,
+        chunk_overlap_chars=CHUNK_OVERLAP_CHARS,
+        max_parallel_chunks=MAX_PARALLEL_CHUNKS,
+        adaptive_concurrency=ADAPTIVE_CONCURRENCY,
+        hedged_requests=HEDGED_REQUESTS,
+        primary_model=PRIMARY_MODEL,
+        fast_model=FAST_MODEL,
+        max_moments_per_chunk=MAX_MOMENTS_PER_CHUNK,
+        moment_safety_limit=MOMENT_SAFETY_LIMIT,
+        fused_cut_sheets=FUSED_CUT_SHEETS,
+        prefilter_enabled=PREFILTER_ENABLED,
+        compact_prompts=COMPACT_PROMPTS,
+        intensity_skip_below=INTENSITY_SKIP_BELOW,
+        execution_mode=EXECUTION_MODE,
+        cache_enabled=CACHE_ENABLED,
+        cache_dir=CACHE_DIR,
+    )
 
 
 def initialize_config() -> None:
@@ -84,19 +274,10 @@ def initialize_config() -> None:
 def validate_config() -> None:
     """Validate that all required configuration is loaded.
 
+    Loads it on first call (configuration is no longer read at import time).
+
     Raises:
-        RuntimeError: If configuration is not properly initialized
+        RuntimeError: If any required environment variables are missing
     """
     if not all([OPENAI_API_KEY, APIFY_TOKEN, APIFY_ACTOR_ID]):
-        raise RuntimeError(
-            "Configuration not initialized. Call initialize_config() first."
-        )
-
-
-# Initialize on import (can be overridden by calling initialize_config() explicitly)
-try:
-    initialize_config()
-except RuntimeError:
-    # Allow module to be imported even if env vars aren't set yet
-    # They'll be checked when actually needed
-    pass
\ No newline at end of file
+        initialize_config()
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""Cut sheet fields shared by the cut sheet and fused extraction parsers.
+
+Kept free of project imports so extraction can use it without importing the
+LLM client, and cutsheets can build on it.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# Cut sheet fields, in output order
+CUT_SHEET_FIELDS = [
+    "clip_label",
+    "in_point",
+    "out_point",
+    "aspect_ratio",
+    "crop_note",
+    "opening_hook_subtitle",
+    "emphasis_words_caps",
+    "pacing_note",
+    "b_roll_ideas",
+    "text_on_screen_idea",
+    "silence_handling",
+    "thumbnail_text",
+    "thumbnail_face_cue",
+    "platform_priority",
+    "use_persona_caption",
+]
+
+# Persona keys as used in moment["persona_captions"]
+PERSONA_KEYS = ["historian", "thomist", "ex_protestant", "meme_catholic", "old_world_catholic", "catholic"]
+
+
+def default_cut_sheet() -> Dict[str, Any]:
+    """Empty cut sheet with the defaults every parser starts from."""
+    return {
+        "clip_label": "",
+        "in_point": "",
+        "out_point": "",
+        "aspect_ratio": "9:16",
+        "crop_note": "",
+        "opening_hook_subtitle": "",
+        "emphasis_words_caps": [],
+        "pacing_note": "",
+        "b_roll_ideas": "",
+        "text_on_screen_idea": "",
+        "silence_handling": "none",
+        "thumbnail_text": "",
+        "thumbnail_face_cue": "",
+        "platform_priority": "All",
+        "use_persona_caption": ""
+    }
+
+
+def normalize_cut_sheet_fields(fields: Dict[str, Any], moment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Merge model-returned cut sheet fields with local moment data.
+
+    Fills in/out points from the moment timestamps when omitted, and resolves
+    a persona key in use_persona_caption to the caption text.
+
+    Args:
+        fields: Cut sheet fields returned by the model for one moment
+        moment: The original moment
+
+    Returns:
+        Complete cut sheet, or None if fields is not a usable mapping
+    """
+    if not isinstance(fields, dict) or not any(fields.get(f) for f in CUT_SHEET_FIELDS):
+        return None
+
+    cut_sheet = default_cut_sheet()
+    for field in CUT_SHEET_FIELDS:
+        value = fields.get(field)
+        if value in (None, "", []):
+            continue
+        if field == "emphasis_words_caps":
+            cut_sheet[field] = parse_caps_list(value) if isinstance(value, str) else [str(v).strip() for v in value if str(v).strip()]
+        else:
+            cut_sheet[field] = str(value).strip()
+
+    # Timing and captions come from data we already have
+    fallback = create_fallback_cut_sheet(moment)
+    for field in ("in_point", "out_point", "clip_label"):
+        if not cut_sheet[field]:
+            cut_sheet[field] = fallback[field]
+
+    if cut_sheet["silence_handling"] == "none" and "SILENCE FIX REQUIRED" in (moment.get("flags", []) or []):
+        cut_sheet["silence_handling"] = fallback["silence_handling"]
+
+    captions = moment.get("persona_captions", {}) or {}
+    persona_key = cut_sheet["use_persona_caption"].strip().lower().replace("-", "_").replace(" ", "_")
+    if persona_key in captions:
+        cut_sheet["use_persona_caption"] = captions[persona_key]
+    elif not cut_sheet["use_persona_caption"]:
+        cut_sheet["use_persona_caption"] = fallback["use_persona_caption"]
+
+    return cut_sheet
+
+
+def parse_caps_list(caps_text: str) -> List[str]:
+    """Parse emphasis words caps field into list.
+
+    Args:
+        caps_text: Text like "WORD1, PHRASE TWO, WORD3" or "[word1, word2, word3]"
+
+    Returns:
+        List of words/phrases to capitalize
+    """
+    if not caps_text:
+        return []
+
+    # Remove brackets and split on commas
+    caps_text = re.sub(r'[\[\]]', '', caps_text)
+
+    # Split on commas and clean up
+    words = []
+    for word in caps_text.split(','):
+        word = word.strip().strip('"\'')
+        if word:
+            words.append(word)
+
+    return words
+
+
+def create_fallback_cut_sheet(moment: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a minimal fallback cut sheet when parsing fails.
+
+    Args:
+        moment: Original moment dictionary
+
+    Returns:
+        Basic cut sheet dictionary
+    """
+    # Extract timestamps
+    timestamps = moment.get('timestamps', '')
+    start_ts, end_ts = '', ''
+    if '–' in timestamps or '—' in timestamps or '-' in timestamps:
+        parts = re.split(r'[–—-]', timestamps)
+        if len(parts) >= 2:
+            start_ts = parts[0].strip()
+            end_ts = parts[1].strip()
+
+    # Create basic label from energy tag or trigger
+    label_base = moment.get('energy_tag', '') or moment.get('viral_trigger', '') or 'MOMENT'
+    clip_label = re.sub(r'[^A-Z0-9]+', '_', label_base.upper()).strip('_')
+
+    return {
+        "clip_label": clip_label,
+        "in_point": start_ts,
+        "out_point": end_ts,
+        "aspect_ratio": "9:16",
+        "crop_note": "medium shot, standard framing",
+        "opening_hook_subtitle": moment.get('quote', '')[:50] + "...",
+        "emphasis_words_caps": [],
+        "pacing_note": "standard pacing",
+        "b_roll_ideas": "none",
+        "text_on_screen_idea": "none",
+        "silence_handling": "hard cut silence" if "SILENCE FIX REQUIRED" in moment.get('flags', []) else "none",
+        "thumbnail_text": clip_label,
+        "thumbnail_face_cue": "use strongest expression",
+        "platform_priority": "All",
+        "use_persona_caption": moment.get('persona_captions', {}).get('catholic', '')
+    }
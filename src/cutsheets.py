@@ -1,83 +1,85 @@
 """Cut sheet generation using GPT-5.1 with the specified prompt.
 
-Takes extracted moments and generates detailed editor cut sheets.
+Takes extracted moments and generates detailed editor cut sheets. Moments are
+sent with short ids and the model returns only the cut sheet fields, which
+are merged back into the moments locally.
 """
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src import config
 from src.llm_client import call_llm
-
-
-# The exact CUT_SHEET_PROMPT as specified in requirements
+from src.concurrency import call_with_retries, get_llm_limiter
+from src.extraction import load_json_response
+from src.cutsheet_fields import (
+    PERSONA_KEYS,
+    create_fallback_cut_sheet,
+    default_cut_sheet,
+    normalize_cut_sheet_fields,
+    parse_caps_list,
+)
+
+
+# Compact cut sheet protocol: moments go in with short ids and the model
+# answers with only the cut sheet fields keyed by id. Quotes and persona
+# captions are never echoed back; they are merged locally.
 CUT_SHEET_PROMPT = r"""
 You are optimizing already-extracted viral moments for a short-form video editor.
 
 INPUT:
-I will give you one or more "Moment" blocks in the following format:
-
-MOMENT HEADER
-- timestamps: 00:00–00:00
-- quote: "EXACT RAW QUOTE"
-- clip duration: X seconds
-- viral trigger: TRIGGER_TAG
-- why it hits: one blunt sentence
-- energy tag: 3–5 words
-- flags: (may be empty, or contain BROKEN RULE MAJOR REEL, REWATCH, SILENCE FIX
-REQUIRED)
-
-PERSONA CAPTION LINES
-- Historian: ...
-- Thomist: ...
-- Ex-Protestant: ...
-- Meme Catholic: ...
-- Old World Catholic: ...
-- Catholic: ...
+I will give you one or more moments, each introduced by a short id in brackets:
+
+[M1] timestamps: 00:00.00-00:00.00 | duration: X s | trigger: TRIGGER_TAG | energy: 3-5 words | flags: (may be empty, or contain BROKEN RULE MAJOR REEL, REWATCH, SILENCE FIX REQUIRED)
+quote: "EXACT RAW QUOTE"
+why: one blunt sentence
+personas: historian: ... | thomist: ... | ex_protestant: ... | meme_catholic: ... | old_world_catholic: ... | catholic: ...
 
 TASK:
-For EACH moment you receive, keep the original content untouched, and ADD an "EDITOR
-CUT SHEET" section directly under it.
-
-Do NOT change any quotes or captions.
-
-For every moment, output exactly this structure:
-
-MOMENT HEADER
-[unchanged, copy from input]
-
-PERSONA CAPTION LINES
-[unchanged, copy from input]
-
-EDITOR CUT SHEET
-- clip_label: [UPPER_SNAKE_CASE name for the moment]
-- in_point: [copy start timestamp from moment header]
-- out_point: [copy end timestamp from moment header]
-- aspect_ratio: 9:16
-- crop_note: [1 short line: e.g. "tight on face, slow push in", "medium shot, quick punch-in on last
-line"]
-- opening_hook_subtitle: [1–2 lines under 3 seconds, strongest idea in the quote]
-- emphasis_words_caps: [3–8 words or phrases from the quote to be in ALL CAPS in subtitles]
-- pacing_note: [e.g. "fast, no pauses", "let last line breathe", "trim any filler before the hook"]
-- b_roll_ideas: [optional; only if naturally obvious, 1 short line or "none"]
-- text_on_screen_idea: [optional big text word/phrase or "none"]
-- silence_handling: ["none", "hard cut silence", or "cover with b-roll"] — if the moment was
-flagged SILENCE FIX REQUIRED, you MUST choose one.
-- thumbnail_text: [2–5 word all-caps phrase that matches the punch of the quote]
-- thumbnail_face_cue: [1 short line: e.g., "use frame where he leans in", "use frame where he
-looks deadly serious"]
-- platform_priority: [TikTok / Reels / YouTube Shorts / All]
-- use_persona_caption: [choose the single strongest persona caption line to use as default;
-copy it exactly]
+Write an EDITOR CUT SHEET for EACH moment. Do NOT repeat the quote, the
+persona captions or any other input text - return ONLY the cut sheet fields.
+
+OUTPUT FORMAT (STRICT):
+Return ONLY this JSON, keyed by moment id. NEVER wrap in code fences or add commentary.
+
+{
+  "cut_sheets": {
+    "M1": {
+      "clip_label": "UPPER_SNAKE_CASE name for the moment",
+      "in_point": "start timestamp (copy from the moment, or tighten it)",
+      "out_point": "end timestamp (copy from the moment, or tighten it)",
+      "aspect_ratio": "9:16",
+      "crop_note": "1 short line, e.g. tight on face, slow push in",
+      "opening_hook_subtitle": "1-2 lines under 3 seconds, strongest idea in the quote",
+      "emphasis_words_caps": ["3-8 words or phrases from the quote to be in ALL CAPS in subtitles"],
+      "pacing_note": "e.g. fast, no pauses / let last line breathe / trim any filler before the hook",
+      "b_roll_ideas": "only if naturally obvious, 1 short line, or none",
+      "text_on_screen_idea": "optional big text word/phrase, or none",
+      "silence_handling": "none | hard cut silence | cover with b-roll",
+      "thumbnail_text": "2-5 word ALL-CAPS phrase that matches the punch of the quote",
+      "thumbnail_face_cue": "1 short line, e.g. use frame where he leans in",
+      "platform_priority": "TikTok | Reels | YouTube Shorts | All",
+      "use_persona_caption": "historian | thomist | ex_protestant | meme_catholic | old_world_catholic | catholic"
+    }
+  }
+}
 
 RULES:
-- Never paraphrase the quote or the persona captions.
+- Every input id must appear exactly once in "cut_sheets".
+- use_persona_caption is the KEY of the single strongest persona caption, not its text.
+- If a moment is flagged SILENCE FIX REQUIRED, silence_handling MUST NOT be "none".
 - Keep all notes short, sharp, and literal so the editor can execute without thinking.
 - Always make the opening_hook_subtitle the hardest-hitting idea from the quote.
 - Thumbnail_text must be brutal and simple, not pious or wordy.
-"""
+""".strip()
+
+
+def moment_prompt_id(index: int) -> str:
+    """Short id used for a moment in the cut sheet prompt (0-based index)."""
+    return f"M{index + 1}"
 
 
 def format_moments_for_cutsheet_prompt(moments: List[Dict[str, Any]]) -> str:
-    """Format extracted moments into the text format expected by the cut sheet prompt.
+    """Format extracted moments into the compact text format expected by the cut sheet prompt.
 
     Args:
         moments: List of moment dictionaries from extraction
@@ -87,40 +89,34 @@ def format_moments_for_cutsheet_prompt(moments: List[Dict[str, Any]]) -> str:
     """
     formatted_blocks = []
 
-    for moment in moments:
-        # Build moment header
-        header_lines = [
-            "MOMENT HEADER",
-            f"- timestamps: {moment.get('timestamps', '')}",
-            f"- quote: \"{moment.get('quote', '')}\"",
-            f"- clip duration: {moment.get('clip_duration_seconds', 'unknown')} seconds" if moment.get('clip_duration_seconds') else "- clip duration: unknown",
-            f"- viral trigger: {moment.get('viral_trigger', '')}",
-            f"- why it hits: {moment.get('why_it_hits', '')}",
-            f"- energy tag: {moment.get('energy_tag', '')}",
-            f"- flags: {', '.join(moment.get('flags', []))}" if moment.get('flags') else "- flags: "
-        ]
-
-        # Build persona caption lines
-        persona_lines = ["", "PERSONA CAPTION LINES"]
-        captions = moment.get('persona_captions', {})
-
-        persona_lines.append(f"- Historian: {captions.get('historian', '')}")
-        persona_lines.append(f"- Thomist: {captions.get('thomist', '')}")
-        persona_lines.append(f"- Ex-Protestant: {captions.get('ex_protestant', '')}")
-        persona_lines.append(f"- Meme Catholic: {captions.get('meme_catholic', '')}")
-        persona_lines.append(f"- Old World Catholic: {captions.get('old_world_catholic', '')}")
-        persona_lines.append(f"- Catholic: {captions.get('catholic', '')}")
-
-        # Combine into single block
-        block = "\n".join(header_lines + persona_lines)
+    for i, moment in enumerate(moments):
+        duration = moment.get('clip_duration_seconds')
+        flags = ', '.join(moment.get('flags', []) or [])
+        captions = moment.get('persona_captions', {}) or {}
+        personas = " | ".join(f"{key}: {captions.get(key, '')}" for key in PERSONA_KEYS)
+
+        block = "\n".join([
+            f"[{moment_prompt_id(i)}] timestamps: {moment.get('timestamps', '')}"
+            f" | duration: {f'{duration} s' if duration else 'unknown'}"
+            f" | trigger: {moment.get('viral_trigger', '')}"
+            f" | energy: {moment.get('energy_tag', '')}"
+            f" | flags: {flags}",
+            f"quote: \"{moment.get('quote', '')}\"",
+            f"why: {moment.get('why_it_hits', '')}",
+            f"personas: {personas}",
+        ])
         formatted_blocks.append(block)
 
-    return "\n\n" + "="*60 + "\n\n".join([""] + formatted_blocks)
+    return "\n\n".join(formatted_blocks)
 
 
 def parse_cut_sheet_response(response_text: str, original_moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Parse GPT's cut sheet response and merge with original moments.
 
+    Expects the compact {"cut_sheets": {id: fields}} JSON; responses in the
+    older echoed "MOMENT HEADER ... EDITOR CUT SHEET" text format are still
+    understood.
+
     Args:
         response_text: Raw response from GPT with cut sheets
         original_moments: Original moment dictionaries
@@ -128,6 +124,27 @@ def parse_cut_sheet_response(response_text: str, original_moments: List[Dict[str
     Returns:
         Updated moments with editor_cut_sheet data added
     """
+    data = load_json_response(response_text)
+    if isinstance(data, dict) and isinstance(data.get("cut_sheets", data), dict):
+        sheets_by_id = data.get("cut_sheets", data)
+        updated_moments = []
+
+        for i, moment in enumerate(original_moments):
+            updated_moment = moment.copy()
+            cut_sheet = normalize_cut_sheet_fields(sheets_by_id.get(moment_prompt_id(i)), moment)
+            if cut_sheet is None:
+                print(f"[cutsheets] No cut sheet returned for {moment_prompt_id(i)}; using fallback")
+                cut_sheet = create_fallback_cut_sheet(moment)
+            updated_moment["editor_cut_sheet"] = cut_sheet
+            updated_moments.append(updated_moment)
+
+        return updated_moments
+
+    return _parse_legacy_cut_sheet_response(response_text, original_moments)
+
+
+def _parse_legacy_cut_sheet_response(response_text: str, original_moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parse the older text format that echoed each moment before its cut sheet."""
     updated_moments = []
 
     # Split response into moment blocks (heuristic approach)
@@ -161,23 +178,7 @@ def parse_single_cut_sheet_block(block_text: str) -> Dict[str, Any]:
     Returns:
         Cut sheet dictionary
     """
-    cut_sheet = {
-        "clip_label": "",
-        "in_point": "",
-        "out_point": "",
-        "aspect_ratio": "9:16",
-        "crop_note": "",
-        "opening_hook_subtitle": "",
-        "emphasis_words_caps": [],
-        "pacing_note": "",
-        "b_roll_ideas": "",
-        "text_on_screen_idea": "",
-        "silence_handling": "none",
-        "thumbnail_text": "",
-        "thumbnail_face_cue": "",
-        "platform_priority": "All",
-        "use_persona_caption": ""
-    }
+    cut_sheet = default_cut_sheet()
 
     lines = block_text.split('\n')
     in_cut_sheet_section = False
@@ -260,79 +261,26 @@ def extract_field_value(line: str) -> tuple[str, str]:
     return "", ""
 
 
-def parse_caps_list(caps_text: str) -> List[str]:
-    """Parse emphasis words caps field into list.
+def _call_cut_sheet_batch(full_prompt: str, run_config: config.RunConfig) -> str:
+    """Run the cut sheet prompt through the Batch API (same prompt as call_llm)."""
+    from src.batch_client import BatchRequest, run_chat_batch
 
-    Args:
-        caps_text: Text like "WORD1, PHRASE TWO, WORD3" or "[word1, word2, word3]"
+    replies = run_chat_batch([
+        BatchRequest("cut-sheets", "You are a helpful assistant.", full_prompt, run_config.primary_model)
+    ])
+    if "cut-sheets" not in replies:
+        raise RuntimeError("cut sheet batch request returned no result")
+    return replies["cut-sheets"]
 
-    Returns:
-        List of words/phrases to capitalize
-    """
-    if not caps_text:
-        return []
-
-    # Remove brackets and split on commas
-    caps_text = re.sub(r'[\[\]]', '', caps_text)
-
-    # Split on commas and clean up
-    words = []
-    for word in caps_text.split(','):
-        word = word.strip().strip('"\'')
-        if word:
-            words.append(word)
 
-    return words
-
-
-def create_fallback_cut_sheet(moment: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a minimal fallback cut sheet when parsing fails.
-
-    Args:
-        moment: Original moment dictionary
-
-    Returns:
-        Basic cut sheet dictionary
-    """
-    # Extract timestamps
-    timestamps = moment.get('timestamps', '')
-    start_ts, end_ts = '', ''
-    if '–' in timestamps or '—' in timestamps or '-' in timestamps:
-        parts = re.split(r'[–—-]', timestamps)
-        if len(parts) >= 2:
-            start_ts = parts[0].strip()
-            end_ts = parts[1].strip()
-
-    # Create basic label from energy tag or trigger
-    label_base = moment.get('energy_tag', '') or moment.get('viral_trigger', '') or 'MOMENT'
-    clip_label = re.sub(r'[^A-Z0-9]+', '_', label_base.upper()).strip('_')
-
-    return {
-        "clip_label": clip_label,
-        "in_point": start_ts,
-        "out_point": end_ts,
-        "aspect_ratio": "9:16",
-        "crop_note": "medium shot, standard framing",
-        "opening_hook_subtitle": moment.get('quote', '')[:50] + "...",
-        "emphasis_words_caps": [],
-        "pacing_note": "standard pacing",
-        "b_roll_ideas": "none",
-        "text_on_screen_idea": "none",
-        "silence_handling": "hard cut silence" if "SILENCE FIX REQUIRED" in moment.get('flags', []) else "none",
-        "thumbnail_text": clip_label,
-        "thumbnail_face_cue": "use strongest expression",
-        "platform_priority": "All",
-        "use_persona_caption": moment.get('persona_captions', {}).get('catholic', '')
-    }
-
-
-def generate_cut_sheets(moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def generate_cut_sheets(moments: List[Dict[str, Any]], run_config: Optional[config.RunConfig] = None) -> List[Dict[str, Any]]:
     """Generate cut sheets for extracted moments using GPT-5.1.
 
     Main function that orchestrates the cut sheet generation process.
 
     Args:
         moments: List of moment dictionaries from extraction
+        run_config: Per-run settings (defaults to the module defaults)
 
     Returns:
         Updated moments with editor_cut_sheet data
@@ -343,6 +291,27 @@ def generate_cut_sheets(moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not moments:
         return []
 
+    # Moments from fused extraction already carry a cut sheet; only the rest need a call
+    pending = [m for m in moments if not m.get("editor_cut_sheet")]
+    if not pending:
+        return [m.copy() for m in moments]
+    if len(pending) < len(moments):
+        # Merge results back by moment id (by position when ids are missing or repeated)
+        keys = [m.get("id") or f"#{i}" for i, m in enumerate(moments)]
+        if len(set(keys)) < len(keys):
+            keys = [f"#{i}" for i in range(len(moments))]
+        pending_keys = [key for key, m in zip(keys, moments) if not m.get("editor_cut_sheet")]
+        generated = dict(zip(pending_keys, generate_cut_sheets(pending, run_config)))
+        merged = []
+        for key, moment in zip(keys, moments):
+            if key in generated:
+                merged.append(generated[key])
+            elif moment.get("editor_cut_sheet"):
+                merged.append(moment.copy())
+            else:
+                merged.append({**moment, "editor_cut_sheet": create_fallback_cut_sheet(moment)})
+        return merged
+
     try:
         # Format moments for the prompt
         formatted_input = format_moments_for_cutsheet_prompt(moments)
@@ -351,7 +320,18 @@ def generate_cut_sheets(moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         full_prompt = f"{CUT_SHEET_PROMPT}\n\n{formatted_input}"
 
         # Call GPT-5.1
-        response = call_llm(full_prompt)
+        run_config = run_config or config.default_run_config()
+        if run_config.execution_mode == "batch":
+            response = _call_cut_sheet_batch(full_prompt, run_config)
+        elif run_config.adaptive_concurrency:
+            def _gated_call() -> str:
+                # SDK retries off so a 429 reaches the limiter; call_with_retries retries it
+                with get_llm_limiter().slot():
+                    return call_llm(full_prompt, model=run_config.primary_model, max_retries=0)
+
+            response = call_with_retries(_gated_call, label="Cut sheet call")
+        else:
+            response = call_llm(full_prompt, model=run_config.primary_model)
 
         # Parse response and merge with original data
         updated_moments = parse_cut_sheet_response(response, moments)
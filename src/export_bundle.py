@@ -0,0 +1,293 @@
+"""Multi-video export bundles for series work.
+
+Renders CSV, Markdown, PDF and JSON for many result sets and streams them
+into a single ZIP archive with a manifest. The text formats are written
+into their ZIP entries piece by piece as they are generated; PDF rendering
+is CPU-bound, so it runs in a process pool that renders each PDF into a
+temporary file, which is then copied into the archive in blocks. No full
+render is ever held in memory.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.export_utils import iter_csv, iter_markdown
+from src.export_utils_pdf import write_pdf
+
+# Formats rendered for each result set, and the file written for each
+BUNDLE_FORMATS = ("csv", "markdown", "pdf", "json")
+BUNDLE_FILENAMES = {
+    "csv": "catholic_cuts_clips.csv",
+    "markdown": "catholic_cuts_clips.md",
+    "pdf": "catholic_cuts_clips.pdf",
+    "json": "catholic_cuts_clips.json",
+}
+MANIFEST_NAME = "manifest.json"
+
+# Thread pool size for PDF rendering when processes are not used
+BUNDLE_THREAD_WORKERS = 4
+
+# Size of the pieces written into ZIP entries
+BUNDLE_WRITE_BYTES = 64 * 1024
+
+
+def _iter_json(moments_with_cuts: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> Iterator[str]:
+    """Serialize one result set to JSON (same shape as session state), in pieces."""
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    return encoder.iterencode({"metadata": metadata or {}, "moments_with_cuts": moments_with_cuts})
+
+
+def _iter_text(fmt: str, moments_with_cuts: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> Iterator[str]:
+    """Text pieces of one result set in a text format."""
+    if fmt == "csv":
+        return iter_csv(moments_with_cuts)
+    if fmt == "markdown":
+        return iter_markdown(moments_with_cuts, total=len(moments_with_cuts))
+    if fmt == "json":
+        return _iter_json(moments_with_cuts, metadata)
+    raise ValueError(f"Unknown bundle format: {fmt!r}. Allowed: {', '.join(BUNDLE_FORMATS)}")
+
+
+def _iter_encoded(pieces: Iterable[str]) -> Iterator[bytes]:
+    """UTF-8 encode text pieces, batched into blocks of about BUNDLE_WRITE_BYTES."""
+    buffer: List[str] = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= BUNDLE_WRITE_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _iter_file(path: str) -> Iterator[bytes]:
+    """Read a file in BUNDLE_WRITE_BYTES blocks."""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(BUNDLE_WRITE_BYTES)
+            if not block:
+                return
+            yield block
+
+
+def _render_pdf_file(moments_with_cuts: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]], layout: str) -> str:
+    """Render a PDF into a temporary file and return its path (runs in a worker)."""
+    fd, path = tempfile.mkstemp(prefix="catholic_cuts_bundle_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_pdf(moments_with_cuts, f, metadata, layout=layout)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def _slugify(text: str, max_len: int = 48) -> str:
+    """Make a filesystem/ZIP-safe folder name fragment."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", text or "").strip("_").lower()
+    return slug[:max_len] or "video"
+
+
+def _folder_name(index: int, result_set: Dict[str, Any]) -> str:
+    """Folder for one result set inside the bundle, e.g. '01_my_talk'."""
+    metadata = result_set.get("metadata") or {}
+    label = (
+        result_set.get("name")
+        or metadata.get("title")
+        or metadata.get("video_id")
+        or metadata.get("source_id")
+        or ""
+    )
+    return f"{index:02d}_{_slugify(label)}"
+
+
+class _ChunkSink:
+    """Write-only, non-seekable stream that collects bytes for a generator to drain.
+
+    zipfile detects the missing tell()/seek() and switches to streaming mode
+    (data descriptors after each entry), so nothing has to be rewound.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        yield from chunks
+
+
+def _write_entry(zf: zipfile.ZipFile, sink: "_ChunkSink", path: str, blocks: Iterable[bytes]):
+    """Stream blocks into one ZIP entry, yielding archive bytes as they are produced.
+
+    Returns (via StopIteration) the entry's manifest record.
+    """
+    digest = hashlib.sha256()
+    written = 0
+    with zf.open(path, mode="w", force_zip64=True) as entry:
+        for block in blocks:
+            entry.write(block)
+            digest.update(block)
+            written += len(block)
+            yield from sink.drain()
+    yield from sink.drain()
+    return {"path": path, "bytes": written, "sha256": digest.hexdigest()}
+
+
+def iter_export_bundle(
+    result_sets: Sequence[Dict[str, Any]],
+    formats: Sequence[str] = BUNDLE_FORMATS,
+    use_processes: bool = True,
+    max_pdf_workers: Optional[int] = None,
+    pdf_layout: str = "simple",
+) -> Iterator[bytes]:
+    """Render all result sets and stream them as a ZIP archive.
+
+    Each result set is a dict with "moments_with_cuts" and "metadata" (the
+    same keys the app keeps in session state) and an optional "name" used
+    for its folder. PDFs start rendering in the background first; the text
+    formats are streamed meanwhile, each PDF is added once it is ready, and
+    the manifest is written last.
+
+    Args:
+        result_sets: Result sets to bundle
+        formats: Subset of BUNDLE_FORMATS to render for each result set
+        use_processes: Render PDFs in a process pool (falls back to threads if False)
+        max_pdf_workers: Process pool size (defaults to the CPU count)
+        pdf_layout: Layout passed to write_pdf
+
+    Yields:
+        ZIP archive bytes, in order
+
+    Raises:
+        ValueError: If a format is not in BUNDLE_FORMATS
+    """
+    unknown = [fmt for fmt in formats if fmt not in BUNDLE_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown bundle format: {unknown[0]!r}. Allowed: {', '.join(BUNDLE_FORMATS)}")
+
+    started = time.time()
+    folders = [_folder_name(i, rs) for i, rs in enumerate(result_sets, start=1)]
+
+    manifest: Dict[str, Any] = {
+        "generator": "catholic-cuts",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started)),
+        "formats": list(formats),
+        "videos": [],
+        "errors": [],
+    }
+    for folder, result_set in zip(folders, result_sets):
+        metadata = result_set.get("metadata") or {}
+        manifest["videos"].append({
+            "folder": folder,
+            "title": metadata.get("title", ""),
+            "source": metadata.get("url") or metadata.get("source_id", ""),
+            "clip_count": len(result_set.get("moments_with_cuts") or []),
+            "files": {},
+        })
+
+    def record_error(index: int, fmt: str, error: Exception) -> None:
+        print(f"[export_bundle] Failed to render {fmt} for {folders[index]}: {error}")
+        manifest["errors"].append({"folder": folders[index], "format": fmt, "error": str(error)})
+
+    sink = _ChunkSink()
+    pdf_pool: Optional[Any] = None
+    pdf_futures: Dict[Future, int] = {}
+    if "pdf" in formats and result_sets:
+        if use_processes:
+            pdf_pool = ProcessPoolExecutor(max_workers=max_pdf_workers or os.cpu_count() or 1)
+        else:
+            pdf_pool = ThreadPoolExecutor(max_workers=BUNDLE_THREAD_WORKERS)
+
+    try:
+        if pdf_pool is not None:
+            for index, result_set in enumerate(result_sets):
+                future = pdf_pool.submit(
+                    _render_pdf_file, result_set.get("moments_with_cuts") or [], result_set.get("metadata") or {}, pdf_layout
+                )
+                pdf_futures[future] = index
+
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for index, result_set in enumerate(result_sets):
+                moments = result_set.get("moments_with_cuts") or []
+                metadata = result_set.get("metadata") or {}
+                for fmt in formats:
+                    if fmt == "pdf":
+                        continue
+                    path = f"{folders[index]}/{BUNDLE_FILENAMES[fmt]}"
+                    try:
+                        record = yield from _write_entry(zf, sink, path, _iter_encoded(_iter_text(fmt, moments, metadata)))
+                    except Exception as e:
+                        # The entry is closed truncated; the manifest says so
+                        record_error(index, fmt, e)
+                        continue
+                    manifest["videos"][index]["files"][fmt] = record
+
+            for future in as_completed(pdf_futures):
+                index = pdf_futures[future]
+                try:
+                    pdf_path = future.result()
+                except Exception as e:
+                    record_error(index, "pdf", e)
+                    continue
+                try:
+                    path = f"{folders[index]}/{BUNDLE_FILENAMES['pdf']}"
+                    manifest["videos"][index]["files"]["pdf"] = yield from _write_entry(zf, sink, path, _iter_file(pdf_path))
+                finally:
+                    os.remove(pdf_path)
+
+            manifest["render_seconds"] = round(time.time() - started, 3)
+            zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2, ensure_ascii=False))
+
+        # Central directory is written when the archive closes
+        yield from sink.drain()
+
+    finally:
+        if pdf_pool is not None:
+            pdf_pool.shutdown(wait=True, cancel_futures=True)
+            # PDFs finished but never added (e.g. the consumer stopped early)
+            for future in pdf_futures:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    if os.path.exists(future.result()):
+                        os.remove(future.result())
+
+    print(f"[export_bundle] Bundled {len(result_sets)} result sets in {time.time() - started:.2f}s")
+
+
+def write_export_bundle(result_sets: Sequence[Dict[str, Any]], fileobj: BinaryIO, **kwargs) -> int:
+    """Stream a bundle ZIP into a writable binary file or response.
+
+    Args:
+        result_sets: Result sets to bundle (see iter_export_bundle)
+        fileobj: Writable binary stream
+        **kwargs: Passed through to iter_export_bundle
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    for chunk in iter_export_bundle(result_sets, **kwargs):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def build_export_bundle(result_sets: Sequence[Dict[str, Any]], **kwargs) -> bytes:
+    """Build a bundle ZIP in memory, e.g. for a Streamlit download_button."""
+    return b"".join(iter_export_bundle(result_sets, **kwargs))
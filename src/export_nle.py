@@ -0,0 +1,361 @@
+"""Edit decision list exports for NLEs.
+
+Turns the in/out points of cut sheets into timelines editors can import
+directly: CMX3600 EDL, FCPXML (Final Cut Pro) and xmeml (Premiere Pro /
+FCP7 XML). Clips are laid end to end on a single track in cut sheet order.
+
+The timelines reference the source as a file URL. When the metadata carries
+a local "media_path" that file is used; otherwise (a YouTube URL, an upload
+that only lived in memory) the source is named after the video under
+OFFLINE_MEDIA_DIR, imports as offline media, and is relinked by the editor
+to their downloaded copy.
+"""
+
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Timeline defaults (non-drop-frame, integer timebase)
+DEFAULT_FPS = 30
+EDL_RECORD_START_SECONDS = 3600  # EDL record timecode starts at 01:00:00:00
+FCPXML_VERSION = "1.9"
+XMEML_VERSION = "4"
+
+# Placeholder folder for sources that are not local files (see module docstring)
+OFFLINE_MEDIA_DIR = "/CatholicCutsMedia"
+MEDIA_EXTENSIONS = (".mp4", ".mov", ".m4v", ".mkv", ".webm", ".mp3", ".m4a", ".wav")
+
+# Frame sizes for cut sheet aspect ratios
+ASPECT_RATIO_SIZES = {
+    "9:16": (1080, 1920),
+    "16:9": (1920, 1080),
+    "1:1": (1080, 1080),
+    "4:5": (1080, 1350),
+}
+
+
+class ClipRange(NamedTuple):
+    """One clip on the timeline, in source frames."""
+    label: str
+    src_in: int
+    src_out: int
+    aspect_ratio: str
+
+
+def parse_timestamp(timestamp: str) -> Optional[float]:
+    """Parse a cut sheet timestamp into seconds.
+
+    Accepts MM:SS.xx (the transcript format), HH:MM:SS.xx and plain seconds.
+    Every component must be a finite, non-negative number.
+
+    Args:
+        timestamp: Timestamp string
+
+    Returns:
+        Seconds as float, or None if the string can't be parsed
+    """
+    if not timestamp:
+        return None
+
+    parts = timestamp.strip().split(":")
+    try:
+        values = [float(p) for p in parts]
+    except ValueError:
+        return None
+    if any(not math.isfinite(v) or math.copysign(1.0, v) < 0 for v in values):
+        return None
+
+    if len(values) == 1:
+        return values[0]
+    if len(values) == 2:
+        return values[0] * 60 + values[1]
+    if len(values) == 3:
+        return values[0] * 3600 + values[1] * 60 + values[2]
+    return None
+
+
+def seconds_to_frames(seconds: float, fps: int = DEFAULT_FPS) -> int:
+    """Convert seconds to the nearest whole frame."""
+    return int(round(seconds * fps))
+
+
+def frames_to_timecode(frames: int, fps: int = DEFAULT_FPS) -> str:
+    """Format a frame count as non-drop-frame SMPTE timecode HH:MM:SS:FF."""
+    total_seconds, ff = divmod(frames, fps)
+    hh, rem = divmod(total_seconds, 3600)
+    mm, ss = divmod(rem, 60)
+    return f"{hh:02d}:{mm:02d}:{ss:02d}:{ff:02d}"
+
+
+def _split_range(timestamps: str) -> Tuple[str, str]:
+    """Split a moment 'start–end' range into its two timestamps."""
+    parts = re.split(r"\s*[–—]\s*|\s+-\s+|(?<=\d)-(?=\d)", timestamps or "")
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[1].strip()
+    return "", ""
+
+
+def moment_time_range(moment: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Resolve a moment's (start, end) in seconds.
+
+    Uses the cut sheet in_point/out_point, falling back to the moment's
+    timestamps range.
+
+    Args:
+        moment: Moment dictionary, optionally with editor_cut_sheet data
+
+    Returns:
+        (start, end) seconds, or None if no valid range can be found
+    """
+    cut = moment.get("editor_cut_sheet", {}) or {}
+    start = parse_timestamp(cut.get("in_point", ""))
+    end = parse_timestamp(cut.get("out_point", ""))
+
+    if start is None or end is None:
+        start_ts, end_ts = _split_range(moment.get("timestamps", ""))
+        start, end = parse_timestamp(start_ts), parse_timestamp(end_ts)
+
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+def clip_ranges(moments_with_cuts: List[Dict[str, Any]], fps: int = DEFAULT_FPS) -> List[ClipRange]:
+    """Resolve the source in/out frames of every moment.
+
+    Moments without a usable range (see moment_time_range) are skipped.
+
+    Args:
+        moments_with_cuts: Moments with editor_cut_sheet data
+        fps: Timeline frame rate
+
+    Returns:
+        List of ClipRange in input order
+    """
+    ranges = []
+
+    for i, moment in enumerate(moments_with_cuts, 1):
+        time_range = moment_time_range(moment)
+        if time_range is None:
+            print(f"[export_nle] Skipping clip {i}: no usable in/out points")
+            continue
+
+        start, end = time_range
+        cut = moment.get("editor_cut_sheet", {}) or {}
+        label = cut.get("clip_label") or f"CLIP_{i}"
+        ranges.append(ClipRange(
+            label=label,
+            src_in=seconds_to_frames(start, fps),
+            src_out=seconds_to_frames(end, fps),
+            aspect_ratio=cut.get("aspect_ratio") or "9:16",
+        ))
+
+    return ranges
+
+
+def source_media_url(metadata: Optional[Dict[str, Any]]) -> str:
+    """File URL of the source media for NLE timelines.
+
+    Args:
+        metadata: Source metadata; "media_path" is used when it names a local file
+
+    Returns:
+        file:// URL of the local file, or of a placeholder under OFFLINE_MEDIA_DIR
+    """
+    metadata = metadata or {}
+    media_path = metadata.get("media_path")
+    if media_path:
+        return Path(media_path).resolve().as_uri()
+
+    source = str(metadata.get("source_id") or metadata.get("url") or "")
+    youtube_id = re.search(r"(?:[?&]v=|youtu\.be/|/shorts/)([\w-]+)", source)
+    if metadata.get("video_id"):
+        stem = str(metadata["video_id"])
+    elif youtube_id:
+        stem = youtube_id.group(1)
+    else:
+        stem = re.sub(r"^video-", "", source.rstrip("/").rsplit("/", 1)[-1]) or str(metadata.get("title") or "source")
+    filename = re.sub(r"[^A-Za-z0-9._-]+", "_", stem).strip("_") or "source"
+    base, extension = os.path.splitext(filename)
+    if extension.lower() not in MEDIA_EXTENSIONS:
+        # Transcript files (.srt, .txt) name the video but aren't media
+        filename = (base if extension else filename) + ".mp4"
+    return PurePosixPath(OFFLINE_MEDIA_DIR, filename).as_uri()
+
+
+def _source_info(metadata: Optional[Dict[str, Any]], ranges: List[ClipRange], fps: int) -> Tuple[str, str, int]:
+    """Source media name, file URL and duration (frames) for the timeline."""
+    metadata = metadata or {}
+    name = metadata.get("title") or metadata.get("source_id") or "source"
+    url = source_media_url(metadata)
+    duration = seconds_to_frames(float(metadata.get("duration_seconds") or 0), fps)
+    if ranges:
+        duration = max(duration, max(r.src_out for r in ranges))
+    return name, url, duration
+
+
+def to_edl(moments_with_cuts: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+           fps: int = DEFAULT_FPS, title: str = "CATHOLIC CUTS") -> str:
+    """Build a CMX3600 EDL with one cut event per clip.
+
+    Args:
+        moments_with_cuts: Moments with editor_cut_sheet data
+        metadata: Optional source metadata (title/url used in comments)
+        fps: Timeline frame rate
+        title: EDL title line
+
+    Returns:
+        EDL text
+    """
+    ranges = clip_ranges(moments_with_cuts, fps)
+    source_name, _, _ = _source_info(metadata, ranges, fps)
+
+    lines = [f"TITLE: {title.upper()[:70]}", "FCM: NON-DROP FRAME", ""]
+    record = EDL_RECORD_START_SECONDS * fps
+
+    for event, clip in enumerate(ranges, 1):
+        length = clip.src_out - clip.src_in
+        lines.append(
+            f"{event:03d}  AX       AA/V  C        "
+            f"{frames_to_timecode(clip.src_in, fps)} {frames_to_timecode(clip.src_out, fps)} "
+            f"{frames_to_timecode(record, fps)} {frames_to_timecode(record + length, fps)}"
+        )
+        lines.append(f"* FROM CLIP NAME: {source_name}")
+        lines.append(f"* COMMENT: {clip.label}")
+        lines.append("")
+        record += length
+
+    return "\n".join(lines)
+
+
+def _rational(frames: int, fps: int) -> str:
+    """FCPXML rational time, e.g. '450/30s'."""
+    return f"{frames}/{fps}s" if frames else "0s"
+
+
+def _frame_size(ranges: List[ClipRange]) -> Tuple[int, int]:
+    """Timeline frame size from the first clip's aspect ratio."""
+    aspect = ranges[0].aspect_ratio if ranges else "9:16"
+    return ASPECT_RATIO_SIZES.get(aspect.strip(), ASPECT_RATIO_SIZES["9:16"])
+
+
+def _to_xml_string(root: ET.Element, doctype: str) -> str:
+    ET.indent(root)
+    body = ET.tostring(root, encoding="unicode")
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE {doctype}>\n{body}\n'
+
+
+def to_fcpxml(moments_with_cuts: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+              fps: int = DEFAULT_FPS, project_name: str = "Catholic Cuts") -> str:
+    """Build an FCPXML project with one asset-clip per cut sheet on the spine.
+
+    Args:
+        moments_with_cuts: Moments with editor_cut_sheet data
+        metadata: Optional source metadata (title/url/duration_seconds)
+        fps: Timeline frame rate
+        project_name: Project name in the event
+
+    Returns:
+        FCPXML document text
+    """
+    ranges = clip_ranges(moments_with_cuts, fps)
+    source_name, source_url, source_duration = _source_info(metadata, ranges, fps)
+    width, height = _frame_size(ranges)
+
+    root = ET.Element("fcpxml", version=FCPXML_VERSION)
+    resources = ET.SubElement(root, "resources")
+    # Unnamed format: FCP derives it from the frame size and rate
+    ET.SubElement(resources, "format", id="r1", frameDuration=f"1/{fps}s", width=str(width), height=str(height))
+    asset = ET.SubElement(resources, "asset", id="r2", name=source_name, start="0s",
+                          duration=_rational(source_duration, fps), hasVideo="1", hasAudio="1", format="r1")
+    ET.SubElement(asset, "media-rep", kind="original-media", src=source_url)
+
+    library = ET.SubElement(root, "library")
+    event = ET.SubElement(library, "event", name=project_name)
+    project = ET.SubElement(event, "project", name=project_name)
+    total = sum(r.src_out - r.src_in for r in ranges)
+    sequence = ET.SubElement(project, "sequence", format="r1", duration=_rational(total, fps),
+                             tcStart="0s", tcFormat="NDF")
+    spine = ET.SubElement(sequence, "spine")
+
+    offset = 0
+    for clip in ranges:
+        length = clip.src_out - clip.src_in
+        ET.SubElement(spine, "asset-clip", ref="r2", name=clip.label, offset=_rational(offset, fps),
+                      start=_rational(clip.src_in, fps), duration=_rational(length, fps), format="r1")
+        offset += length
+
+    return _to_xml_string(root, "fcpxml")
+
+
+def _xmeml_rate(parent: ET.Element, fps: int) -> None:
+    rate = ET.SubElement(parent, "rate")
+    ET.SubElement(rate, "timebase").text = str(fps)
+    ET.SubElement(rate, "ntsc").text = "FALSE"
+
+
+def to_premiere_xml(moments_with_cuts: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                    fps: int = DEFAULT_FPS, sequence_name: str = "Catholic Cuts") -> str:
+    """Build a Premiere Pro (xmeml v4) sequence with linked video and audio clipitems.
+
+    Args:
+        moments_with_cuts: Moments with editor_cut_sheet data
+        metadata: Optional source metadata (title/url/duration_seconds)
+        fps: Timeline frame rate
+        sequence_name: Sequence name
+
+    Returns:
+        xmeml document text
+    """
+    ranges = clip_ranges(moments_with_cuts, fps)
+    source_name, source_url, source_duration = _source_info(metadata, ranges, fps)
+    width, height = _frame_size(ranges)
+    total = sum(r.src_out - r.src_in for r in ranges)
+
+    root = ET.Element("xmeml", version=XMEML_VERSION)
+    sequence = ET.SubElement(root, "sequence", id="sequence-1")
+    ET.SubElement(sequence, "name").text = sequence_name
+    ET.SubElement(sequence, "duration").text = str(total)
+    _xmeml_rate(sequence, fps)
+
+    media = ET.SubElement(sequence, "media")
+    video = ET.SubElement(media, "video")
+    video_format = ET.SubElement(video, "format")
+    characteristics = ET.SubElement(video_format, "samplecharacteristics")
+    ET.SubElement(characteristics, "width").text = str(width)
+    ET.SubElement(characteristics, "height").text = str(height)
+    video_track = ET.SubElement(video, "track")
+    audio = ET.SubElement(media, "audio")
+    audio_track = ET.SubElement(audio, "track")
+
+    def add_clipitem(track: ET.Element, item_id: str, clip: ClipRange, start: int, full_file: bool) -> None:
+        item = ET.SubElement(track, "clipitem", id=item_id)
+        ET.SubElement(item, "name").text = clip.label
+        ET.SubElement(item, "duration").text = str(source_duration)
+        _xmeml_rate(item, fps)
+        ET.SubElement(item, "start").text = str(start)
+        ET.SubElement(item, "end").text = str(start + clip.src_out - clip.src_in)
+        ET.SubElement(item, "in").text = str(clip.src_in)
+        ET.SubElement(item, "out").text = str(clip.src_out)
+
+        # The source file is described once and referenced by id afterwards
+        file_el = ET.SubElement(item, "file", id="file-1")
+        if full_file:
+            ET.SubElement(file_el, "name").text = source_name
+            ET.SubElement(file_el, "pathurl").text = source_url
+            _xmeml_rate(file_el, fps)
+            ET.SubElement(file_el, "duration").text = str(source_duration)
+            file_media = ET.SubElement(file_el, "media")
+            ET.SubElement(file_media, "video")
+            ET.SubElement(file_media, "audio")
+
+    start = 0
+    for n, clip in enumerate(ranges, 1):
+        add_clipitem(video_track, f"clipitem-v{n}", clip, start, full_file=(n == 1))
+        add_clipitem(audio_track, f"clipitem-a{n}", clip, start, full_file=False)
+        start += clip.src_out - clip.src_in
+
+    return _to_xml_string(root, "xmeml")
@@ -0,0 +1,213 @@
+"""Per-clip subtitle export (SRT / WebVTT).
+
+Slices the timestamped transcript segments that fall inside each moment's
+in/out range, re-times them relative to the clip start and applies the cut
+sheet's emphasis_words_caps. The transcript is indexed once and every clip
+is cut from that index with a binary search, so the transcript is never
+rescanned per clip.
+"""
+
+import io
+import re
+import zipfile
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from src.export_nle import moment_time_range
+from src.transcript_utils import parse_timestamped_transcript
+
+SUBTITLE_FORMATS = ("srt", "vtt")
+
+# The opening hook is shown as an extra top-of-frame cue for this long
+HOOK_CUE_SECONDS = 3.0
+
+
+class SegmentIndex(NamedTuple):
+    """Transcript segments sorted by start time, plus lookup arrays."""
+    segments: List[Dict[str, Any]]
+    starts: List[float]
+    max_duration: float
+
+
+class Cue(NamedTuple):
+    """One subtitle cue, relative to the clip start."""
+    start: float
+    end: float
+    text: str
+    is_hook: bool = False
+
+
+def build_segment_index(segments: List[Dict[str, Any]]) -> SegmentIndex:
+    """Sort transcript segments once so clips can be sliced by binary search.
+
+    Args:
+        segments: {"start", "end", "text"} dicts (seconds)
+
+    Returns:
+        SegmentIndex over the segments
+    """
+    ordered = sorted(
+        (s for s in segments if s.get("text")),
+        key=lambda s: float(s.get("start", 0)),
+    )
+    starts = [float(s.get("start", 0)) for s in ordered]
+    max_duration = max((float(s.get("end", 0)) - float(s.get("start", 0)) for s in ordered), default=0.0)
+    return SegmentIndex(ordered, starts, max(max_duration, 0.0))
+
+
+def build_transcript_index(transcript: Union[str, List[Dict[str, Any]]]) -> SegmentIndex:
+    """Parse (if needed) and index a transcript once, for reuse across subtitle formats.
+
+    Args:
+        transcript: Timestamped transcript text (flatten_transcript format)
+            or a list of {"start", "end", "text"} segments
+
+    Returns:
+        SegmentIndex over the transcript segments
+    """
+    segments = parse_timestamped_transcript(transcript) if isinstance(transcript, str) else transcript
+    return build_segment_index(segments)
+
+
+def slice_segments(index: SegmentIndex, start: float, end: float) -> List[Dict[str, Any]]:
+    """Return the segments that overlap [start, end).
+
+    A segment can begin before the clip and still overlap it, so the search
+    starts one maximum segment duration earlier.
+    """
+    lo = bisect_left(index.starts, start - index.max_duration)
+    hi = bisect_right(index.starts, end)
+    return [
+        seg for seg in index.segments[lo:hi]
+        if float(seg.get("end", 0)) > start and float(seg.get("start", 0)) < end
+    ]
+
+
+def _emphasis_pattern(emphasis_words: List[str]) -> Optional["re.Pattern[str]"]:
+    """Compile one case-insensitive pattern for all emphasis words/phrases.
+
+    Longer phrases come first so they win over single words they contain.
+    """
+    phrases = sorted({w.strip() for w in emphasis_words if w and w.strip()}, key=len, reverse=True)
+    if not phrases:
+        return None
+    alternation = "|".join(re.escape(p) for p in phrases)
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+
+def apply_emphasis(text: str, pattern: Optional["re.Pattern[str]"]) -> str:
+    """Upper-case every emphasis match in text."""
+    if pattern is None:
+        return text
+    return pattern.sub(lambda m: m.group(0).upper(), text)
+
+
+def build_clip_cues(index: SegmentIndex, moment: Dict[str, Any], include_hook: bool = True) -> List[Cue]:
+    """Build the re-timed, emphasised cues for one moment.
+
+    Args:
+        index: Prebuilt transcript segment index
+        moment: Moment with editor_cut_sheet data
+        include_hook: Add opening_hook_subtitle as an extra cue at the start
+
+    Returns:
+        Cues relative to the clip start (empty if the moment has no range)
+    """
+    time_range = moment_time_range(moment)
+    if time_range is None:
+        return []
+
+    clip_start, clip_end = time_range
+    cut = moment.get("editor_cut_sheet", {}) or {}
+    pattern = _emphasis_pattern(cut.get("emphasis_words_caps", []) or [])
+
+    cues = []
+    hook = (cut.get("opening_hook_subtitle") or "").strip()
+    if include_hook and hook:
+        cues.append(Cue(0.0, min(HOOK_CUE_SECONDS, clip_end - clip_start), apply_emphasis(hook, pattern), True))
+
+    for seg in slice_segments(index, clip_start, clip_end):
+        start = max(float(seg["start"]), clip_start) - clip_start
+        end = min(float(seg["end"]), clip_end) - clip_start
+        if end <= start:
+            continue
+        cues.append(Cue(start, end, apply_emphasis(seg["text"], pattern)))
+
+    return cues
+
+
+def _format_time(seconds: float, separator: str) -> str:
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def cues_to_srt(cues: List[Cue]) -> str:
+    """Render cues as SRT."""
+    blocks = []
+    for n, cue in enumerate(cues, 1):
+        blocks.append(
+            f"{n}\n{_format_time(cue.start, ',')} --> {_format_time(cue.end, ',')}\n{cue.text}\n"
+        )
+    return "\n".join(blocks)
+
+
+def cues_to_vtt(cues: List[Cue]) -> str:
+    """Render cues as WebVTT (the hook cue is placed at the top of the frame)."""
+    blocks = ["WEBVTT\n"]
+    for cue in cues:
+        settings = " line:10%" if cue.is_hook else ""
+        blocks.append(
+            f"{_format_time(cue.start, '.')} --> {_format_time(cue.end, '.')}{settings}\n{cue.text}\n"
+        )
+    return "\n".join(blocks)
+
+
+def build_clip_subtitles(
+    moments_with_cuts: List[Dict[str, Any]],
+    transcript: Union[str, List[Dict[str, Any]], SegmentIndex],
+    fmt: str = "srt",
+    include_hook: bool = True,
+) -> Dict[str, str]:
+    """Build one subtitle file per clip in a single batched pass.
+
+    Args:
+        moments_with_cuts: Moments with editor_cut_sheet data
+        transcript: Timestamped transcript text (flatten_transcript format),
+            a list of {"start", "end", "text"} segments, or a SegmentIndex
+            from build_transcript_index (pass that when rendering several formats)
+        fmt: "srt" or "vtt"
+        include_hook: Add the opening hook subtitle as a cue
+
+    Returns:
+        Dict of file name -> subtitle text, in clip order. Clips without a
+        usable range or without transcript coverage are omitted.
+    """
+    if fmt not in SUBTITLE_FORMATS:
+        raise ValueError(f"Unknown subtitle format: {fmt!r}. Allowed: {', '.join(SUBTITLE_FORMATS)}")
+
+    index = transcript if isinstance(transcript, SegmentIndex) else build_transcript_index(transcript)
+    render = cues_to_srt if fmt == "srt" else cues_to_vtt
+
+    files = {}
+    for i, moment in enumerate(moments_with_cuts, 1):
+        cues = build_clip_cues(index, moment, include_hook=include_hook)
+        if not cues:
+            print(f"[export_subtitles] No subtitle cues for clip {i}")
+            continue
+        label = (moment.get("editor_cut_sheet", {}) or {}).get("clip_label") or f"CLIP_{i}"
+        safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_") or f"CLIP_{i}"
+        files[f"{i:02d}_{safe_label}.{fmt}"] = render(cues)
+
+    return files
+
+
+def subtitles_to_zip(files: Dict[str, str]) -> bytes:
+    """Pack per-clip subtitle files into a ZIP for a single download."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
@@ -1,214 +1,300 @@
 """Export utilities for generating CSV and Markdown outputs.
 
-Handles formatting of moment data for download by editors.
+Handles formatting of moment data for download by editors. Each format has a
+generator-based writer (iter_*/write_*) for streaming large exports; the
+to_* helpers are thin wrappers that join the stream into a string.
 """
 
 import csv
 import io
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, TextIO
+
+
+# CSV column order shared by the buffered and streaming writers
+CSV_FIELDNAMES = [
+    # Basic moment data
+    "clip_id",
+    "clip_label",
+    "timestamps",
+    "quote",
+    "clip_duration_seconds",
+    "viral_trigger",
+    "why_it_hits",
+    "energy_tag",
+    "flags",
+
+    # Persona captions (6 columns)
+    "historian_caption",
+    "thomist_caption",
+    "ex_protestant_caption",
+    "meme_catholic_caption",
+    "old_world_catholic_caption",
+    "catholic_caption",
+
+    # Editor cut sheet fields
+    "in_point",
+    "out_point",
+    "aspect_ratio",
+    "crop_note",
+    "opening_hook_subtitle",
+    "emphasis_words_caps",
+    "pacing_note",
+    "b_roll_ideas",
+    "text_on_screen_idea",
+    "silence_handling",
+    "thumbnail_text",
+    "thumbnail_face_cue",
+    "platform_priority",
+    "use_persona_caption"
+]
+
+PERSONA_LABELS = [
+    ("historian", "Historian"),
+    ("thomist", "Thomist"),
+    ("ex_protestant", "Ex-Protestant"),
+    ("meme_catholic", "Meme Catholic"),
+    ("old_world_catholic", "Old World Catholic"),
+    ("catholic", "Catholic")
+]
+
+
+def _moment_to_csv_row(moment: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a single moment into a CSV row keyed by CSV_FIELDNAMES."""
+    cut_sheet = moment.get("editor_cut_sheet", {})
+    personas = moment.get("persona_captions", {})
+
+    return {
+        # Basic data
+        "clip_id": moment.get("id", ""),
+        "clip_label": cut_sheet.get("clip_label", ""),
+        "timestamps": moment.get("timestamps", ""),
+        "quote": moment.get("quote", ""),
+        "clip_duration_seconds": moment.get("clip_duration_seconds", ""),
+        "viral_trigger": moment.get("viral_trigger", ""),
+        "why_it_hits": moment.get("why_it_hits", ""),
+        "energy_tag": moment.get("energy_tag", ""),
+        "flags": "; ".join(moment.get("flags", [])),
 
-
-def to_csv(moments_with_cuts: List[Dict[str, Any]]) -> str:
-    """Convert moments with cut sheets to CSV format.
+        # Persona captions
+        "historian_caption": personas.get("historian", ""),
+        "thomist_caption": personas.get("thomist", ""),
+        "ex_protestant_caption": personas.get("ex_protestant", ""),
+        "meme_catholic_caption": personas.get("meme_catholic", ""),
+        "old_world_catholic_caption": personas.get("old_world_catholic", ""),
+        "catholic_caption": personas.get("catholic", ""),
+
+        # Cut sheet data
+        "in_point": cut_sheet.get("in_point", ""),
+        "out_point": cut_sheet.get("out_point", ""),
+        "aspect_ratio": cut_sheet.get("aspect_ratio", ""),
+        "crop_note": cut_sheet.get("crop_note", ""),
+        "opening_hook_subtitle": cut_sheet.get("opening_hook_subtitle", ""),
+        "emphasis_words_caps": "; ".join(cut_sheet.get("emphasis_words_caps", [])),
+        "pacing_note": cut_sheet.get("pacing_note", ""),
+        "b_roll_ideas": cut_sheet.get("b_roll_ideas", ""),
+        "text_on_screen_idea": cut_sheet.get("text_on_screen_idea", ""),
+        "silence_handling": cut_sheet.get("silence_handling", ""),
+        "thumbnail_text": cut_sheet.get("thumbnail_text", ""),
+        "thumbnail_face_cue": cut_sheet.get("thumbnail_face_cue", ""),
+        "platform_priority": cut_sheet.get("platform_priority", ""),
+        "use_persona_caption": cut_sheet.get("use_persona_caption", "")
+    }
+
+
+def iter_csv(moments_with_cuts: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Stream moments with cut sheets as CSV, one encoded row at a time.
+
+    Only a single row is ever buffered, so memory stays flat no matter how
+    many clips are exported.
 
     Args:
-        moments_with_cuts: List of moment dictionaries with editor_cut_sheet data
+        moments_with_cuts: Iterable of moment dictionaries with editor_cut_sheet data
 
-    Returns:
-        CSV string ready for download
+    Yields:
+        CSV text chunks (header first, then one chunk per row)
     """
-    if not moments_with_cuts:
-        return ""
+    # One small buffer is reused for every row
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDNAMES)
+    header_written = False
 
-    # Build CSV in memory
-    output = io.StringIO()
-
-    # Define CSV columns
-    fieldnames = [
-        # Basic moment data
-        "clip_id",
-        "clip_label",
-        "timestamps",
-        "quote",
-        "clip_duration_seconds",
-        "viral_trigger",
-        "why_it_hits",
-        "energy_tag",
-        "flags",
-
-        # Persona captions (6 columns)
-        "historian_caption",
-        "thomist_caption",
-        "ex_protestant_caption",
-        "meme_catholic_caption",
-        "old_world_catholic_caption",
-        "catholic_caption",
-
-        # Editor cut sheet fields
-        "in_point",
-        "out_point",
-        "aspect_ratio",
-        "crop_note",
-        "opening_hook_subtitle",
-        "emphasis_words_caps",
-        "pacing_note",
-        "b_roll_ideas",
-        "text_on_screen_idea",
-        "silence_handling",
-        "thumbnail_text",
-        "thumbnail_face_cue",
-        "platform_priority",
-        "use_persona_caption"
-    ]
+    for moment in moments_with_cuts:
+        if not header_written:
+            writer.writeheader()
+            header_written = True
 
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
+        writer.writerow(_moment_to_csv_row(moment))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
 
-    # Write each moment as a row
-    for moment in moments_with_cuts:
-        cut_sheet = moment.get("editor_cut_sheet", {})
-        personas = moment.get("persona_captions", {})
-
-        row = {
-            # Basic data
-            "clip_id": moment.get("id", ""),
-            "clip_label": cut_sheet.get("clip_label", ""),
-            "timestamps": moment.get("timestamps", ""),
-            "quote": moment.get("quote", ""),
-            "clip_duration_seconds": moment.get("clip_duration_seconds", ""),
-            "viral_trigger": moment.get("viral_trigger", ""),
-            "why_it_hits": moment.get("why_it_hits", ""),
-            "energy_tag": moment.get("energy_tag", ""),
-            "flags": "; ".join(moment.get("flags", [])),
-
-            # Persona captions
-            "historian_caption": personas.get("historian", ""),
-            "thomist_caption": personas.get("thomist", ""),
-            "ex_protestant_caption": personas.get("ex_protestant", ""),
-            "meme_catholic_caption": personas.get("meme_catholic", ""),
-            "old_world_catholic_caption": personas.get("old_world_catholic", ""),
-            "catholic_caption": personas.get("catholic", ""),
-
-            # Cut sheet data
-            "in_point": cut_sheet.get("in_point", ""),
-            "out_point": cut_sheet.get("out_point", ""),
-            "aspect_ratio": cut_sheet.get("aspect_ratio", ""),
-            "crop_note": cut_sheet.get("crop_note", ""),
-            "opening_hook_subtitle": cut_sheet.get("opening_hook_subtitle", ""),
-            "emphasis_words_caps": "; ".join(cut_sheet.get("emphasis_words_caps", [])),
-            "pacing_note": cut_sheet.get("pacing_note", ""),
-            "b_roll_ideas": cut_sheet.get("b_roll_ideas", ""),
-            "text_on_screen_idea": cut_sheet.get("text_on_screen_idea", ""),
-            "silence_handling": cut_sheet.get("silence_handling", ""),
-            "thumbnail_text": cut_sheet.get("thumbnail_text", ""),
-            "thumbnail_face_cue": cut_sheet.get("thumbnail_face_cue", ""),
-            "platform_priority": cut_sheet.get("platform_priority", ""),
-            "use_persona_caption": cut_sheet.get("use_persona_caption", "")
-        }
-
-        writer.writerow(row)
-
-    csv_content = output.getvalue()
-    output.close()
-
-    return csv_content
+    buffer.close()
 
 
-def to_markdown(moments_with_cuts: List[Dict[str, Any]]) -> str:
-    """Convert moments with cut sheets to Markdown format.
+def write_csv(moments_with_cuts: Iterable[Dict[str, Any]], fileobj: TextIO) -> int:
+    """Write moments as CSV straight to a text file or response stream.
+
+    Args:
+        moments_with_cuts: Iterable of moment dictionaries with editor_cut_sheet data
+        fileobj: Writable text stream (open with newline="" for files)
+
+    Returns:
+        Number of characters written
+    """
+    written = 0
+    for chunk in iter_csv(moments_with_cuts):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def to_csv(moments_with_cuts: List[Dict[str, Any]]) -> str:
+    """Convert moments with cut sheets to CSV format.
 
     Args:
         moments_with_cuts: List of moment dictionaries with editor_cut_sheet data
 
     Returns:
-        Markdown string ready for download
+        CSV string ready for download
     """
     if not moments_with_cuts:
-        return "# Viral Clips\n\nNo clips found."
+        return ""
+
+    return "".join(iter_csv(moments_with_cuts))
+
 
+def _markdown_clip_lines(i: int, moment: Dict[str, Any]) -> List[str]:
+    """Build the Markdown lines for a single clip (ending with a separator)."""
+    cut_sheet = moment.get("editor_cut_sheet", {})
+    personas = moment.get("persona_captions", {})
     lines = []
-    lines.append("# Viral Clips")
+
+    # Clip header
+    clip_label = cut_sheet.get("clip_label", "UNLABELED")
+    lines.append(f"## Clip {i} – {clip_label}")
     lines.append("")
-    lines.append(f"Generated {len(moments_with_cuts)} clips for editing.")
+
+    # Basic info
+    lines.append(f"- **Timestamps:** {moment.get('timestamps', 'N/A')}")
+    lines.append(f"- **Duration:** {moment.get('clip_duration_seconds', 'N/A')} seconds")
+    lines.append(f"- **Trigger:** {moment.get('viral_trigger', 'N/A')}")
+    lines.append(f"- **Energy:** {moment.get('energy_tag', 'N/A')}")
+
+    flags = moment.get('flags', [])
+    if flags:
+        lines.append(f"- **Flags:** {', '.join(flags)}")
+
     lines.append("")
 
-    for i, moment in enumerate(moments_with_cuts, 1):
-        cut_sheet = moment.get("editor_cut_sheet", {})
-        personas = moment.get("persona_captions", {})
+    # Quote
+    quote = moment.get("quote", "")
+    if quote:
+        lines.append("**Quote:**")
+        lines.append(f"> {quote}")
+        lines.append("")
 
-        # Clip header
-        clip_id = moment.get("id", f"clip_{i}")
-        clip_label = cut_sheet.get("clip_label", "UNLABELED")
-        lines.append(f"## Clip {i} – {clip_label}")
+    # Why it hits
+    why_hits = moment.get("why_it_hits", "")
+    if why_hits:
+        lines.append(f"**Why it hits:** {why_hits}")
         lines.append("")
 
-        # Basic info
-        lines.append(f"- **Timestamps:** {moment.get('timestamps', 'N/A')}")
-        lines.append(f"- **Duration:** {moment.get('clip_duration_seconds', 'N/A')} seconds")
-        lines.append(f"- **Trigger:** {moment.get('viral_trigger', 'N/A')}")
-        lines.append(f"- **Energy:** {moment.get('energy_tag', 'N/A')}")
+    # Persona captions
+    lines.append("**Persona Captions:**")
+    for persona_key, persona_name in PERSONA_LABELS:
+        caption = personas.get(persona_key, "")
+        lines.append(f"- {persona_name}: {caption}")
+    lines.append("")
 
-        flags = moment.get('flags', [])
-        if flags:
-            lines.append(f"- **Flags:** {', '.join(flags)}")
+    # Editor cut sheet
+    lines.append("**Editor Cut Sheet:**")
+    lines.append(f"- **In Point:** {cut_sheet.get('in_point', 'N/A')}")
+    lines.append(f"- **Out Point:** {cut_sheet.get('out_point', 'N/A')}")
+    lines.append(f"- **Aspect Ratio:** {cut_sheet.get('aspect_ratio', '9:16')}")
+    lines.append(f"- **Crop Note:** {cut_sheet.get('crop_note', 'N/A')}")
+    lines.append(f"- **Opening Hook Subtitle:** {cut_sheet.get('opening_hook_subtitle', 'N/A')}")
+
+    emphasis_words = cut_sheet.get('emphasis_words_caps', [])
+    if emphasis_words:
+        lines.append(f"- **Emphasis Words (ALL CAPS):** {', '.join(emphasis_words)}")
+    else:
+        lines.append(f"- **Emphasis Words (ALL CAPS):** None specified")
+
+    lines.append(f"- **Pacing Note:** {cut_sheet.get('pacing_note', 'N/A')}")
+    lines.append(f"- **B-Roll Ideas:** {cut_sheet.get('b_roll_ideas', 'none')}")
+    lines.append(f"- **Text on Screen Idea:** {cut_sheet.get('text_on_screen_idea', 'none')}")
+    lines.append(f"- **Silence Handling:** {cut_sheet.get('silence_handling', 'none')}")
+    lines.append(f"- **Thumbnail Text:** {cut_sheet.get('thumbnail_text', 'N/A')}")
+    lines.append(f"- **Thumbnail Face Cue:** {cut_sheet.get('thumbnail_face_cue', 'N/A')}")
+    lines.append(f"- **Platform Priority:** {cut_sheet.get('platform_priority', 'All')}")
+    lines.append(f"- **Use Persona Caption:** {cut_sheet.get('use_persona_caption', 'N/A')}")
 
-        lines.append("")
+    lines.append("")
+    lines.append("---")
 
-        # Quote
-        quote = moment.get("quote", "")
-        if quote:
-            lines.append("**Quote:**")
-            lines.append(f"> {quote}")
-            lines.append("")
+    return lines
 
-        # Why it hits
-        why_hits = moment.get("why_it_hits", "")
-        if why_hits:
-            lines.append(f"**Why it hits:** {why_hits}")
-            lines.append("")
 
-        # Persona captions
-        lines.append("**Persona Captions:**")
-        for persona_key, persona_name in [
-            ("historian", "Historian"),
-            ("thomist", "Thomist"),
-            ("ex_protestant", "Ex-Protestant"),
-            ("meme_catholic", "Meme Catholic"),
-            ("old_world_catholic", "Old World Catholic"),
-            ("catholic", "Catholic")
-        ]:
-            caption = personas.get(persona_key, "")
-            lines.append(f"- {persona_name}: {caption}")
-        lines.append("")
+def iter_markdown(moments_with_cuts: Iterable[Dict[str, Any]], total: Optional[int] = None) -> Iterator[str]:
+    """Stream moments with cut sheets as Markdown, one clip block at a time.
+
+    Args:
+        moments_with_cuts: Iterable of moment dictionaries with editor_cut_sheet data
+        total: Clip count for the document header. Taken from len() when the
+            input is a sized collection; omitted from the header otherwise.
+
+    Yields:
+        Markdown text chunks (document header first, then one chunk per clip)
+    """
+    if total is None and hasattr(moments_with_cuts, "__len__"):
+        total = len(moments_with_cuts)
 
-        # Editor cut sheet
-        lines.append("**Editor Cut Sheet:**")
-        lines.append(f"- **In Point:** {cut_sheet.get('in_point', 'N/A')}")
-        lines.append(f"- **Out Point:** {cut_sheet.get('out_point', 'N/A')}")
-        lines.append(f"- **Aspect Ratio:** {cut_sheet.get('aspect_ratio', '9:16')}")
-        lines.append(f"- **Crop Note:** {cut_sheet.get('crop_note', 'N/A')}")
-        lines.append(f"- **Opening Hook Subtitle:** {cut_sheet.get('opening_hook_subtitle', 'N/A')}")
-
-        emphasis_words = cut_sheet.get('emphasis_words_caps', [])
-        if emphasis_words:
-            lines.append(f"- **Emphasis Words (ALL CAPS):** {', '.join(emphasis_words)}")
+    count = 0
+    for i, moment in enumerate(moments_with_cuts, 1):
+        if i == 1:
+            header = "# Viral Clips\n\n"
+            if total is not None:
+                header += f"Generated {total} clips for editing.\n\n"
+            yield header
         else:
-            lines.append(f"- **Emphasis Words (ALL CAPS):** None specified")
+            # Blank line between the previous separator and this clip
+            yield "\n"
 
-        lines.append(f"- **Pacing Note:** {cut_sheet.get('pacing_note', 'N/A')}")
-        lines.append(f"- **B-Roll Ideas:** {cut_sheet.get('b_roll_ideas', 'none')}")
-        lines.append(f"- **Text on Screen Idea:** {cut_sheet.get('text_on_screen_idea', 'none')}")
-        lines.append(f"- **Silence Handling:** {cut_sheet.get('silence_handling', 'none')}")
-        lines.append(f"- **Thumbnail Text:** {cut_sheet.get('thumbnail_text', 'N/A')}")
-        lines.append(f"- **Thumbnail Face Cue:** {cut_sheet.get('thumbnail_face_cue', 'N/A')}")
-        lines.append(f"- **Platform Priority:** {cut_sheet.get('platform_priority', 'All')}")
-        lines.append(f"- **Use Persona Caption:** {cut_sheet.get('use_persona_caption', 'N/A')}")
+        yield "\n".join(_markdown_clip_lines(i, moment)) + "\n"
+        count = i
 
-        lines.append("")
-        lines.append("---")
-        lines.append("")
+    if count == 0:
+        yield "# Viral Clips\n\nNo clips found."
+
+
+def write_markdown(moments_with_cuts: Iterable[Dict[str, Any]], fileobj: TextIO, total: Optional[int] = None) -> int:
+    """Write moments as Markdown straight to a text file or response stream.
 
-    return "\n".join(lines)
+    Args:
+        moments_with_cuts: Iterable of moment dictionaries with editor_cut_sheet data
+        fileobj: Writable text stream
+        total: Optional clip count for the header (see iter_markdown)
+
+    Returns:
+        Number of characters written
+    """
+    written = 0
+    for chunk in iter_markdown(moments_with_cuts, total=total):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def to_markdown(moments_with_cuts: List[Dict[str, Any]]) -> str:
+    """Convert moments with cut sheets to Markdown format.
+
+    Args:
+        moments_with_cuts: List of moment dictionaries with editor_cut_sheet data
+
+    Returns:
+        Markdown string ready for download
+    """
+    return "".join(iter_markdown(moments_with_cuts or []))
 
 
 def format_clip_summary(moments_with_cuts: List[Dict[str, Any]]) -> str:
@@ -1,38 +1,86 @@
+import tempfile
+from functools import lru_cache
 from io import BytesIO
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
 from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
 from src.export_utils import format_clip_summary
 
+# Stream chunk size for iter_pdf, and how much of the rendered PDF is kept
+# in RAM before the spool spills to a temporary file on disk.
+PDF_STREAM_CHUNK_BYTES = 64 * 1024
+PDF_SPOOL_MAX_BYTES = 1024 * 1024
+
+# "simple" is the original line-by-line canvas sheet; "flow" uses platypus
+# with wrapped paragraphs and a per-clip table.
+PDF_LAYOUTS = ("simple", "flow")
+
+# Flow layout geometry
+FLOW_MARGIN = 40
+FLOW_LABEL_COL_WIDTH = 110
+FLOW_THUMBNAIL_WIDTH = 160
+
+# Thumbnails are keyed by moment id; values are image file paths or raw bytes
+Thumbnails = Optional[Dict[str, Union[str, bytes]]]
 
-def clips_to_pdf(moments_with_cuts, metadata=None) -> bytes:
+
+def write_pdf(moments_with_cuts, fileobj: BinaryIO, metadata=None, layout: str = "simple", thumbnails: Thumbnails = None) -> None:
     """
-    Build a simple, readable PDF summary of all clips.
-    Returns PDF bytes suitable for Streamlit download_button.
+    Render the clip summary PDF directly into a writable binary stream
+    (an open file, HTTP response, spooled temp file, ...).
+
+    layout selects one of PDF_LAYOUTS; thumbnails are only drawn by "flow".
     """
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=LETTER)
+    if layout == "flow":
+        _write_pdf_flow(moments_with_cuts, fileobj, metadata, thumbnails)
+    elif layout == "simple":
+        _write_pdf_simple(moments_with_cuts, fileobj, metadata)
+    else:
+        raise ValueError(f"Unknown PDF layout: {layout!r}. Allowed: {', '.join(PDF_LAYOUTS)}")
+
+
+def _write_pdf_simple(moments_with_cuts, fileobj: BinaryIO, metadata=None) -> None:
+    """Line-by-line canvas layout (the original cut sheet PDF)."""
+    c = canvas.Canvas(fileobj, pagesize=LETTER)
     width, height = LETTER
 
     x_margin = 40
     y = height - 50
     line_height = 14
+    max_width = width - 2 * x_margin
+    current_font = None
 
     def write_line(text: str = "", bold: bool = False):
-        nonlocal y
-        if y < 60:  # new page if too low
-            c.showPage()
-            y = height - 50
-        if bold:
-            c.setFont("Helvetica-Bold", 10)
-        else:
-            c.setFont("Helvetica", 10)
-        # Truncate very long lines so they don't run off the page
-        max_chars = 110
-        if len(text) > max_chars:
-            text = text[: max_chars - 3] + "..."
-        c.drawString(x_margin, y, text)
-        y -= line_height
+        nonlocal y, current_font
+        font = "Helvetica-Bold" if bold else "Helvetica"
+        # Wrap long lines instead of truncating them. simpleSplit drops leading
+        # spaces, so the indent is re-applied to the first line and continuation
+        # lines get two more; each is wrapped to the width left after its indent.
+        indent = text[: len(text) - len(text.lstrip(" "))]
+        prefix = indent + "  "
+        wrapped = simpleSplit(text[len(indent):], font, 10, max_width - stringWidth(indent, font, 10)) or [""]
+        if len(wrapped) > 1:
+            rest_width = max_width - stringWidth(prefix, font, 10)
+            wrapped = wrapped[:1] + simpleSplit(" ".join(wrapped[1:]), font, 10, rest_width)
+        for n, segment in enumerate(wrapped):
+            if y < 60:  # new page if too low
+                c.showPage()
+                y = height - 50
+                current_font = None  # showPage resets the graphics state
+            # Only switch fonts when the weight actually changes
+            if font != current_font:
+                c.setFont(font, 10)
+                current_font = font
+            c.drawString(x_margin, y, (indent if n == 0 else prefix) + segment)
+            y -= line_height
 
     # Header
     write_line("Catholic Cuts – Viral Clips Cut Sheet", bold=True)
@@ -122,6 +170,181 @@ def clips_to_pdf(moments_with_cuts, metadata=None) -> bytes:
 
     c.showPage()
     c.save()
+
+
+@lru_cache(maxsize=1)
+def _flow_styles() -> Dict[str, ParagraphStyle]:
+    """Paragraph styles for the flow layout, built once per process."""
+    base = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle("CCTitle", parent=base["Title"], fontSize=16, leading=20, spaceAfter=8),
+        "meta": ParagraphStyle("CCMeta", parent=base["Normal"], fontSize=9, leading=12),
+        "clip": ParagraphStyle("CCClip", parent=base["Heading2"], fontSize=12, leading=15, spaceBefore=10, spaceAfter=4),
+        "label": ParagraphStyle("CCLabel", parent=base["Normal"], fontName="Helvetica-Bold", fontSize=9, leading=11),
+        "cell": ParagraphStyle("CCCell", parent=base["Normal"], fontSize=9, leading=11),
+        "quote": ParagraphStyle("CCQuote", parent=base["Normal"], fontName="Helvetica-Oblique", fontSize=9, leading=11),
+    }
+
+
+# Shared by every clip table so style commands are only parsed once
+_CLIP_TABLE_STYLE = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
+    ("LEFTPADDING", (0, 0), (-1, -1), 4),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+    ("TOPPADDING", (0, 0), (-1, -1), 2),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+])
+
+_PERSONA_ROWS = [
+    ("historian", "Historian"),
+    ("thomist", "Thomist"),
+    ("ex_protestant", "Ex-Protestant"),
+    ("meme_catholic", "Meme Catholic"),
+    ("old_world_catholic", "Old World Catholic"),
+    ("catholic", "Catholic"),
+]
+
+
+def _para(text: Any, style: ParagraphStyle) -> Paragraph:
+    """Wrap arbitrary text in a Paragraph, escaping markup and keeping line breaks."""
+    return Paragraph(escape(str(text)).replace("\n", "<br/>"), style)
+
+
+def _thumbnail_flowable(source: Union[str, bytes]) -> Optional[Image]:
+    """Build a fixed-width Image flowable from a path or bytes, or None if unreadable."""
+    try:
+        data = BytesIO(source) if isinstance(source, bytes) else source
+        img_w, img_h = ImageReader(data).getSize()
+        if isinstance(data, BytesIO):
+            data.seek(0)
+        scale = FLOW_THUMBNAIL_WIDTH / float(img_w)
+        return Image(data, width=FLOW_THUMBNAIL_WIDTH, height=img_h * scale, hAlign="LEFT")
+    except Exception as e:
+        print(f"[export_pdf] Skipping unreadable thumbnail: {e}")
+        return None
+
+
+def _clip_table(moment: Dict[str, Any], table_width: float) -> Table:
+    """Two-column label/value table for one clip, with wrapped cells."""
+    styles = _flow_styles()
+    cut = moment.get("editor_cut_sheet", {}) or {}
+    personas = moment.get("persona_captions", {}) or {}
+
+    rows = [
+        ("Timestamps", moment.get("timestamps", "")),
+        ("Duration", f"{moment['clip_duration_seconds']} s" if moment.get("clip_duration_seconds") is not None else ""),
+        ("Trigger", moment.get("viral_trigger", "")),
+        ("Energy", moment.get("energy_tag", "")),
+        ("Flags", ", ".join(moment.get("flags", []) or [])),
+        ("Why it hits", moment.get("why_it_hits", "")),
+        ("Quote", moment.get("quote", "")),
+        ("In → Out", f"{cut.get('in_point', 'N/A')} → {cut.get('out_point', 'N/A')}"),
+        ("Aspect", cut.get("aspect_ratio", "9:16")),
+        ("Crop", cut.get("crop_note", "")),
+        ("Hook", cut.get("opening_hook_subtitle", "")),
+        ("Emphasis", ", ".join(cut.get("emphasis_words_caps", []) or [])),
+        ("Pacing", cut.get("pacing_note", "")),
+        ("B-roll", cut.get("b_roll_ideas", "")),
+        ("Text on screen", cut.get("text_on_screen_idea", "")),
+        ("Silence", cut.get("silence_handling", "")),
+        ("Thumbnail text", cut.get("thumbnail_text", "")),
+        ("Thumbnail cue", cut.get("thumbnail_face_cue", "")),
+        ("Platform priority", cut.get("platform_priority", "")),
+        ("Default caption", cut.get("use_persona_caption", "")),
+    ]
+    rows.extend((name, personas.get(key, "")) for key, name in _PERSONA_ROWS)
+
+    data = []
+    for label, value in rows:
+        if value in ("", None):
+            continue
+        style = styles["quote"] if label == "Quote" else styles["cell"]
+        data.append([_para(label, styles["label"]), _para(value, style)])
+
+    table = Table(
+        data or [[_para("Clip", styles["label"]), _para("", styles["cell"])]],
+        colWidths=[FLOW_LABEL_COL_WIDTH, table_width - FLOW_LABEL_COL_WIDTH],
+    )
+    table.setStyle(_CLIP_TABLE_STYLE)
+    return table
+
+
+def _write_pdf_flow(moments_with_cuts, fileobj: BinaryIO, metadata=None, thumbnails: Thumbnails = None) -> None:
+    """Platypus layout: wrapped paragraphs and one table per clip."""
+    styles = _flow_styles()
+    thumbnails = thumbnails or {}
+
+    doc = SimpleDocTemplate(
+        fileobj,
+        pagesize=LETTER,
+        leftMargin=FLOW_MARGIN,
+        rightMargin=FLOW_MARGIN,
+        topMargin=FLOW_MARGIN,
+        bottomMargin=FLOW_MARGIN,
+        title="Catholic Cuts – Viral Clips Cut Sheet",
+    )
+
+    story: List[Any] = [_para("Catholic Cuts – Viral Clips Cut Sheet", styles["title"])]
+
+    if metadata:
+        for label, key in [("Title", "title"), ("Channel", "channel_name"), ("URL", "url")]:
+            value = metadata.get(key) or ""
+            if value:
+                story.append(_para(f"{label}: {value}", styles["meta"]))
+        story.append(Spacer(1, 6))
+
+    # Summary uses **bold** markdown; the PDF shows it as plain text
+    summary = format_clip_summary(moments_with_cuts).replace("**", "")
+    story.append(_para(summary, styles["meta"]))
+
+    for i, moment in enumerate(moments_with_cuts, 1):
+        cut = moment.get("editor_cut_sheet", {}) or {}
+        story.append(_para(f"Clip {i}: {cut.get('clip_label', f'CLIP_{i}')}", styles["clip"]))
+
+        thumb_source = thumbnails.get(moment.get("id", ""))
+        if thumb_source:
+            thumb = _thumbnail_flowable(thumb_source)
+            if thumb is not None:
+                story.append(thumb)
+                story.append(Spacer(1, 4))
+
+        story.append(_clip_table(moment, doc.width))
+
+    doc.build(story)
+
+
+def iter_pdf(moments_with_cuts, metadata=None, chunk_size: int = PDF_STREAM_CHUNK_BYTES, layout: str = "simple", thumbnails: Thumbnails = None) -> Iterator[bytes]:
+    """
+    Render the clip summary PDF and yield it in fixed-size byte chunks.
+
+    The rendered document goes to a spooled temp file that moves to disk once
+    it outgrows PDF_SPOOL_MAX_BYTES, so large exports never need a second
+    full in-memory copy of the PDF. reportlab itself keeps page objects until
+    the document is saved, so memory still grows with the page count (unlike
+    iter_csv/iter_markdown, which stay flat).
+    """
+    with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES) as spool:
+        write_pdf(moments_with_cuts, spool, metadata, layout=layout, thumbnails=thumbnails)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def clips_to_pdf(moments_with_cuts, metadata=None, layout: str = "simple", thumbnails: Thumbnails = None) -> bytes:
+    """
+    Build a simple, readable PDF summary of all clips.
+    Returns PDF bytes suitable for Streamlit download_button.
+
+    Pass layout="flow" for the wrapped table layout with optional thumbnails
+    (a dict of moment id -> image path or bytes).
+    """
+    buffer = BytesIO()
+    write_pdf(moments_with_cuts, buffer, metadata, layout=layout, thumbnails=thumbnails)
     pdf = buffer.getvalue()
     buffer.close()
     return pdf
\ No newline at end of file
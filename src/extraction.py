@@ -1,45 +1,51 @@
 from typing import List, Dict, Any, Optional
+import json
+import re
 import uuid
 
+from src.transcript_utils import seconds_to_timestamp, strip_omitted_spans
+from src.cutsheet_fields import PERSONA_KEYS, create_fallback_cut_sheet, normalize_cut_sheet_fields
 
-def parse_moment_response(response_text: str) -> List[Dict[str, Any]]:
-    """Parse GPT's JSON response into structured moment data.
+_LINE_REF_RE = re.compile(r"L(\d+)")
+
+
+def _strip_code_fences(text: str) -> str:
+    t = text.strip()
+
+    # Strip ```json ... ``` or ``` ... ```
+    if t.startswith("```"):
+        # remove leading ```... first line
+        # e.g. ```json\n{...}
+        first_newline = t.find("\n")
+        if first_newline != -1:
+            t = t[first_newline + 1 :]
+        # remove trailing ```
+        if t.endswith("```"):
+            t = t[:-3]
+    return t.strip()
 
-    This is intentionally defensive because models sometimes:
-    - wrap JSON in prose,
-    - wrap JSON in markdown fences,
-    - return a top-level list instead of {"moments": [...]},
-    - or include extra keys around the "moments" array.
-    """
-    import json
-    import re
-
-    def strip_code_fences(text: str) -> str:
-        t = text.strip()
-
-        # Strip ```json ... ``` or ``` ... ```
-        if t.startswith("```"):
-            # remove leading ```... first line
-            # e.g. ```json\n{...}
-            first_newline = t.find("\n")
-            if first_newline != -1:
-                t = t[first_newline + 1 :]
-            # remove trailing ```
-            if t.endswith("```"):
-                t = t[:-3]
-        return t.strip()
-
-    def try_load_json(candidate: str) -> Optional[Any]:
-        try:
-            return json.loads(candidate)
-        except json.JSONDecodeError:
-            return None
 
+def _try_load_json(candidate: str) -> Optional[Any]:
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+
+
+def load_json_response(response_text: str) -> Optional[Any]:
+    """Defensively load the JSON payload of an LLM response.
+
+    Strips markdown fences, then falls back to the biggest JSON-looking
+    object or list embedded in surrounding prose.
+
+    Returns:
+        Parsed JSON value, or None if nothing usable was found
+    """
     # 1) Clean obvious markdown wrappers
-    clean_response = strip_code_fences(response_text)
+    clean_response = _strip_code_fences(response_text or "")
 
     # 2) First attempt: direct parse of the whole thing
-    data = try_load_json(clean_response)
+    data = _try_load_json(clean_response)
 
     # 3) If that fails, try to extract the biggest JSON-looking block
     if data is None:
@@ -54,7 +60,58 @@ def parse_moment_response(response_text: str) -> List[Dict[str, Any]]:
             candidate = list_match.group(0)
 
         if candidate:
-            data = try_load_json(candidate)
+            data = _try_load_json(candidate)
+
+    return data
+
+
+def restore_line_refs(moment: Dict[str, Any], line_map: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill timestamps, quote, duration and in/out points of a moment answered with "lines" ids.
+
+    Reversed ranges are reordered and ids past either end of the chunk are
+    clamped to its first/last line. Moments without a "lines" reference
+    inside the chunk are returned unchanged.
+    """
+    refs = sorted({int(n) for n in _LINE_REF_RE.findall(str(moment.get("lines", "")))})
+    if not refs or not any(f"L{i}" in line_map for i in refs):
+        return moment
+
+    first, last = max(refs[0], 1), min(refs[-1], len(line_map))
+    span = [line_map[f"L{i}"] for i in range(first, last + 1) if f"L{i}" in line_map]
+    start, end = span[0]["start"], span[-1]["end"]
+
+    moment["timestamps"] = f"{seconds_to_timestamp(start)}-{seconds_to_timestamp(end)}"
+    moment["clip_duration_seconds"] = int(round(end - start))
+    if not moment.get("quote"):
+        moment["quote"] = " ".join(seg["text"] for seg in span)
+
+    # The model only saw line ids, so in/out points come from the lines too
+    cut_sheet = moment.get("editor_cut_sheet")
+    if isinstance(cut_sheet, dict):
+        cut_sheet["in_point"] = seconds_to_timestamp(start)
+        cut_sheet["out_point"] = seconds_to_timestamp(end)
+    return moment
+
+
+def parse_moment_response(response_text: str, expect_cut_sheet: bool = False,
+                          line_map: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Parse GPT's JSON response into structured moment data.
+
+    This is intentionally defensive because models sometimes:
+    - wrap JSON in prose,
+    - wrap JSON in markdown fences,
+    - return a top-level list instead of {"moments": [...]},
+    - or include extra keys around the "moments" array.
+
+    With expect_cut_sheet (fused extraction mode) each moment's
+    "editor_cut_sheet" is validated, and replaced by a fallback cut sheet
+    when it is missing or unusable.
+
+    With line_map (compact prompt encoding) moments that answer with
+    "lines" ids get their timestamps, duration, quote and cut sheet in/out
+    points restored from the original transcript lines.
+    """
+    data = load_json_response(response_text)
 
     if data is None:
         # Still nothing usable
@@ -86,6 +143,13 @@ def parse_moment_response(response_text: str) -> List[Dict[str, Any]]:
         # Add unique ID
         moment["id"] = str(uuid.uuid4())[:8]
 
+        if line_map:
+            restore_line_refs(moment, line_map)
+
+        # Pre-filter placeholders are not speech, even if the model quoted one
+        if isinstance(moment.get("quote"), str):
+            moment["quote"] = strip_omitted_spans(moment["quote"])
+
         # Ensure required fields exist
         # We require at least a quote. If timestamps are missing, keep the moment
         # but set an empty timestamps string so downstream code can still operate
@@ -108,9 +172,18 @@ def parse_moment_response(response_text: str) -> List[Dict[str, Any]]:
         moment.setdefault("energy_tag", "")
         moment.setdefault("flags", [])
         moment.setdefault("persona_captions", {})
-        for key in ["historian", "thomist", "ex_protestant", "meme_catholic", "old_world_catholic", "catholic"]:
+        for key in PERSONA_KEYS:
             moment["persona_captions"].setdefault(key, "")
 
+        if expect_cut_sheet:
+            cut_sheet = normalize_cut_sheet_fields(moment.get("editor_cut_sheet"), moment)
+            if cut_sheet is None:
+                print(f"Warning: Moment {i+1} missing editor_cut_sheet; using fallback cut sheet")
+                cut_sheet = create_fallback_cut_sheet(moment)
+            moment["editor_cut_sheet"] = cut_sheet
+        else:
+            moment.pop("editor_cut_sheet", None)
+
         processed_moments.append(moment)
 
     return processed_moments
\ No newline at end of file
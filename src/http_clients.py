@@ -0,0 +1,121 @@
+"""Shared, pooled HTTP clients for OpenAI and Apify.
+
+One ClientRegistry per process owns a single OpenAI client (httpx connection
+pool with keep-alive, HTTP/2 when the h2 package is installed) and a single
+requests.Session for Apify. Every caller reuses them instead of paying TCP and
+TLS setup per request. Workers use the module singleton; the Streamlit app
+installs a registry cached with st.cache_resource via set_registry().
+
+The async Apify path (src.apify_async) is the one exception: an
+httpx.AsyncClient's connections belong to the event loop that opened them,
+and each blocking call runs its own loop via asyncio.run, so that client
+cannot live here. It is built once per batch and shared by every run in it.
+"""
+
+import importlib.util
+import threading
+from typing import Any, Optional
+
+from src import config
+
+
+def http2_available() -> bool:
+    """True if httpx can negotiate HTTP/2 (requires the optional h2 package)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """Lazily-built, thread-safe holder for the process-wide API clients."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._openai = None
+        self._apify_session = None
+
+    def openai(self) -> Any:
+        """Return the shared OpenAI client, building it on first use."""
+        if self._openai is None:
+            with self._lock:
+                if self._openai is None:
+                    self._openai = self._build_openai()
+        return self._openai
+
+    def apify_session(self) -> Any:
+        """Return the shared requests.Session for Apify, building it on first use."""
+        if self._apify_session is None:
+            with self._lock:
+                if self._apify_session is None:
+                    self._apify_session = self._build_apify_session()
+        return self._apify_session
+
+    def close(self) -> None:
+        """Close pooled connections (the clients are rebuilt on next use)."""
+        with self._lock:
+            if self._openai is not None:
+                self._openai.close()
+                self._openai = None
+            if self._apify_session is not None:
+                self._apify_session.close()
+                self._apify_session = None
+
+    @staticmethod
+    def _build_openai() -> Any:
+        import httpx
+        from openai import OpenAI
+
+        config.load_environment()
+        http_client = httpx.Client(
+            http2=http2_available(),
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(config.OPENAI_TIMEOUT_SECONDS, connect=config.HTTP_CONNECT_TIMEOUT_SECONDS),
+        )
+        return OpenAI(http_client=http_client, max_retries=config.OPENAI_MAX_RETRIES)
+
+    @staticmethod
+    def _build_apify_session() -> Any:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.HTTP_MAX_KEEPALIVE,
+            pool_maxsize=config.HTTP_MAX_CONNECTIONS,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ClientRegistry:
+    """Return the process-wide registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
+
+
+def set_registry(registry: ClientRegistry) -> None:
+    """Install a registry (e.g. one cached by st.cache_resource in the UI)."""
+    global _registry
+    with _registry_lock:
+        _registry = registry
+
+
+def get_openai_client() -> Any:
+    """Shared OpenAI client."""
+    return get_registry().openai()
+
+
+def get_apify_session() -> Any:
+    """Shared requests.Session for Apify calls."""
+    return get_registry().apify_session()
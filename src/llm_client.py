@@ -5,17 +5,17 @@ import math
 import uuid
 import time
 import traceback
-from typing import Any, Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from openai import OpenAI
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 
 from src import config
+from src.http_clients import get_openai_client
 from src.extraction import parse_moment_response
-from src.cache_utils import get_cached_moments, save_moments_to_cache
+from src.concurrency import call_with_retries, get_latency_tracker, get_llm_limiter
+from src.cache_utils import get_cached_moments, save_moments_to_cache, cache_namespace
+from src.transcript_utils import is_omitted_span, parse_timestamped_line, parse_timestamped_transcript
 
-# Initialize new OpenAI client (reads OPENAI_API_KEY from environment)
-client = OpenAI()
 # Default model from config
 DEFAULT_MODEL = config.PRIMARY_MODEL
 
@@ -94,32 +94,158 @@ IMPORTANT:
 
 """.strip()
 
-def build_prompt_for_chunk(transcript_chunk: str, chunk_index: int, total_chunks: int) -> str:
-    """Build the user prompt for a single transcript chunk.
+# Appended to SYSTEM_PROMPT in fused mode so each moment also carries its cut sheet
+FUSED_CUT_SHEET_PROMPT = """
+EDITOR CUT SHEET (FUSED MODE):
+
+Each moment object MUST also include an "editor_cut_sheet" object with exactly these keys:
+
+"editor_cut_sheet": {
+    "clip_label": "UPPER_SNAKE_CASE name for the moment",
+    "in_point": "start timestamp of the moment",
+    "out_point": "end timestamp of the moment",
+    "aspect_ratio": "9:16",
+    "crop_note": "1 short line, e.g. tight on face, slow push in",
+    "opening_hook_subtitle": "1-2 lines under 3 seconds, strongest idea in the quote",
+    "emphasis_words_caps": ["3-8 words or phrases from the quote to be in ALL CAPS in subtitles"],
+    "pacing_note": "e.g. fast, no pauses / let last line breathe",
+    "b_roll_ideas": "only if naturally obvious, 1 short line, or none",
+    "text_on_screen_idea": "optional big text word/phrase, or none",
+    "silence_handling": "none | hard cut silence | cover with b-roll",
+    "thumbnail_text": "2-5 word ALL-CAPS phrase that matches the punch of the quote",
+    "thumbnail_face_cue": "1 short line, e.g. use frame where he leans in",
+    "platform_priority": "TikTok | Reels | YouTube Shorts | All",
+    "use_persona_caption": "KEY of the strongest persona caption: historian | thomist | ex_protestant | meme_catholic | old_world_catholic | catholic"
+}
 
-    The chunk index is 1-based.
+- Keep cut sheet notes short, sharp, and literal.
+- Thumbnail_text must be brutal and simple, not pious or wordy.
+""".strip()
+
+
+# Appended to the system prompt when chunks are sent in the compact line-id encoding
+COMPACT_LINES_PROMPT = """
+COMPACT TRANSCRIPT FORMAT:
+
+- Each transcript line is "L<number> text". Lines like "@12:00" are time anchors (minutes:seconds) for the lines that follow.
+- Instead of "timestamps" and "quote", give each moment "lines": "L<first>-L<last>" (the exact, contiguous lines of the moment).
+- Timestamps and the quote are filled in from those lines automatically. Leave "in_point" and "out_point" empty if you write a cut sheet.
+""".strip()
+
+def build_system_prompt(fused_cut_sheets: bool = False, compact_lines: bool = False) -> str:
+    """Return the extraction system prompt.
+
+    Extended with cut sheet fields in fused mode, and with the line-id
+    answer format when chunks use the compact encoding.
     """
+    parts = [SYSTEM_PROMPT]
+    if fused_cut_sheets:
+        parts.append(FUSED_CUT_SHEET_PROMPT)
+    if compact_lines:
+        parts.append(COMPACT_LINES_PROMPT)
+    return "\n\n".join(parts)
+
+
+def encode_chunk_compact(transcript_chunk: str, anchor_seconds: Optional[float] = None) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """Re-encode a timestamped chunk with short line ids and sparse time anchors.
+
+    "[MM:SS.xx–MM:SS.xx] text" lines become "L<n> text", with an "@MM:SS"
+    anchor line whenever anchor_seconds have passed, so the model can still
+    judge clip length. The returned map restores exact timestamps.
+    Pre-filter placeholders are kept as plain text without a line id, so
+    they can never end up in a restored quote.
+
+    Args:
+        transcript_chunk: Chunk in flatten_transcript format
+        anchor_seconds: Spacing of time anchors (defaults to config.PROMPT_TIME_ANCHOR_SECONDS)
+
+    Returns:
+        Tuple of (encoded_text, line_map of "L<n>" -> {"start", "end", "text"}).
+        The map is empty (and the chunk returned unchanged) when the chunk
+        has no timestamped lines.
+    """
+    anchor_seconds = anchor_seconds or config.PROMPT_TIME_ANCHOR_SECONDS
+    encoded: List[str] = []
+    line_map: Dict[str, Dict[str, Any]] = {}
+    next_anchor = None
+
+    for line in transcript_chunk.splitlines():
+        segment = parse_timestamped_line(line)
+        if segment is None:
+            if line.strip():
+                encoded.append(line)
+            continue
+        if is_omitted_span(segment["text"]):
+            encoded.append(segment["text"])
+            continue
+        if next_anchor is None or segment["start"] >= next_anchor:
+            minutes, seconds = divmod(int(segment["start"]), 60)
+            encoded.append(f"@{minutes:02d}:{seconds:02d}")
+            next_anchor = (segment["start"] // anchor_seconds + 1) * anchor_seconds
+        line_id = f"L{len(line_map) + 1}"
+        line_map[line_id] = segment
+        encoded.append(f"{line_id} {segment['text']}")
+
+    if not line_map:
+        return transcript_chunk, {}
+    return "\n".join(encoded), line_map
+
+
+def build_chunk_prompt(transcript_chunk: str, chunk_index: int, total_chunks: int,
+                       run_config: Optional[config.RunConfig] = None) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """Build the user prompt for a chunk plus its line-id map.
+
+    With run_config.compact_prompts the chunk is sent in the compact line-id
+    encoding; the map is empty when the original format is used.
+    """
+    run_config = run_config or config.default_run_config()
+    line_map: Dict[str, Dict[str, Any]] = {}
+    if run_config.compact_prompts:
+        transcript_chunk, line_map = encode_chunk_compact(transcript_chunk)
+
     header = f"Chunk {chunk_index} of {total_chunks}. The text below is a continuous portion of a longer talk.\n"
     instructions = (
-        f"Find at most {config.MAX_MOMENTS_PER_CHUNK} of the strongest viral clip moments ONLY from this chunk.\n"
+        f"Find at most {run_config.max_moments_per_chunk} of the strongest viral clip moments ONLY from this chunk.\n"
         "Return them in the JSON format described in the system prompt.\n"
         "Transcript chunk:\n"
     )
-    return header + instructions + transcript_chunk
+    return header + instructions + transcript_chunk, line_map
+
+
+def build_prompt_for_chunk(transcript_chunk: str, chunk_index: int, total_chunks: int, run_config: Optional[config.RunConfig] = None) -> str:
+    """Build the user prompt for a single transcript chunk.
+
+    The chunk index is 1-based.
+    """
+    prompt, _ = build_chunk_prompt(transcript_chunk, chunk_index, total_chunks, run_config)
+    return prompt
+
+
+def get_client():
+    """Return the shared, pooled OpenAI client (created on first use)."""
+    return get_openai_client()
 
 
-def call_llm(user_prompt: str, model: Optional[str] = None, temperature: float = 0.3) -> str:
+def call_llm(user_prompt: str, model: Optional[str] = None, temperature: float = 0.3,
+             max_retries: Optional[int] = None) -> str:
     """Simple wrapper with a generic system prompt using the new OpenAI client."""
-    return call_llm_with_system("You are a helpful assistant.", user_prompt, model=model, temperature=temperature)
+    return call_llm_with_system("You are a helpful assistant.", user_prompt, model=model, temperature=temperature,
+                                max_retries=max_retries)
 
 
-def call_llm_with_system(system_prompt: str, user_prompt: str, model: Optional[str] = None, temperature: float = 0.3) -> str:
+def call_llm_with_system(system_prompt: str, user_prompt: str, model: Optional[str] = None, temperature: float = 0.3,
+                         max_retries: Optional[int] = None) -> str:
     """Call OpenAI chat API using the new client interface.
 
     Uses `client.chat.completions.create(...)` from the `openai` package v1+.
+    max_retries overrides the client's retry count for this call (0 for
+    limiter-gated calls, so throttles reach the limiter).
     """
     model = model or DEFAULT_MODEL
 
+    client = get_client()
+    if max_retries is not None:
+        client = client.with_options(max_retries=max_retries)
     resp = client.chat.completions.create(
         model=model,
         messages=[
@@ -138,38 +264,103 @@ def call_llm_with_system(system_prompt: str, user_prompt: str, model: Optional[s
 
 # parse_moment_response is provided by src.extraction; use that implementation
 
-def extract_moments(transcript: str, video_metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+def split_transcript_into_chunks(transcript: str, max_chunk_chars: int, overlap_chars: int = 0) -> List[str]:
+    """Character-based chunking on line boundaries.
+
+    When overlap_chars is set, the trailing lines of each chunk (up to that
+    many characters) are repeated at the start of the next one so moments
+    spanning a boundary aren't cut in half.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    for line in transcript.splitlines():
+        if current_len + len(line) + 1 > max_chunk_chars and current:
+            chunks.append("\n".join(current))
+
+            carried: List[str] = []
+            carried_len = 0
+            for prev in reversed(current):
+                if carried_len + len(prev) + 1 > overlap_chars:
+                    break
+                carried.insert(0, prev)
+                carried_len += len(prev) + 1
+            current, current_len = carried, sum(len(l) for l in carried)
+
+        current.append(line)
+        current_len += len(line)
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
+
+
+def _dedupe_moments(moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop moments found twice in overlapping chunks (same quote)."""
+    seen = set()
+    unique = []
+    for moment in moments:
+        key = " ".join(moment.get("quote", "").split()).lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(moment)
+    return unique
+
+
+def extraction_cache_namespace(run_config: config.RunConfig) -> str:
+    """Cache namespace for this run's prompts, model and extraction settings."""
+    prompt_text = (
+        build_system_prompt(run_config.fused_cut_sheets, run_config.compact_prompts)
+        + build_prompt_for_chunk("", 0, 0, run_config)
+    )
+    return cache_namespace(prompt_text, run_config)
+
+
+def _prefilter_for_extraction(transcript: str, run_config: config.RunConfig) -> str:
+    """Apply the lexical pre-filter when enabled and available."""
+    if not run_config.prefilter_enabled:
+        return transcript
+    try:
+        from src.prefilter import prefilter_transcript
+    except ImportError as e:
+        print(f"[extract_moments] Pre-filter unavailable ({e}) – sending the full transcript")
+        return transcript
+    filtered, _ = prefilter_transcript(transcript)
+    return filtered
+
+
+def extract_moments(transcript: str, video_metadata: Optional[Dict] = None, run_config: Optional[config.RunConfig] = None,
+                    intensity: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Chunk the transcript, call GPT-5.1 on each chunk, and collect viral moments.
 
     Args:
         transcript: The transcript text to process
         video_metadata: Optional video metadata for better caching
+        run_config: Per-run settings (defaults to the module defaults)
+        intensity: Optional audio intensity timeline (stats["intensity"] from
+            transcribe_media). Chunks are then extracted hottest first, and
+            chunks below run_config.intensity_skip_below are skipped.
 
     Raises:
         RuntimeError: if no usable moments are found from any chunk.
     """
+    run_config = run_config or config.default_run_config()
     transcript = (transcript or "").strip()
     if not transcript:
         raise RuntimeError("Transcript is empty; cannot extract moments.")
 
-    # Check cache first
-    cached_moments = get_cached_moments(transcript, video_metadata)
+    # Check cache first (namespaced by prompt text, model and settings)
+    namespace = extraction_cache_namespace(run_config)
+    cached_moments = get_cached_moments(transcript, video_metadata, run_config, namespace)
     if cached_moments is not None:
         return cached_moments
 
-    # Character-based chunking using config
-    max_chunk_chars = config.CHARS_PER_CHUNK
-    chunks: List[str] = []
-    current = []
+    # Local lexical pre-filter; the cache stays keyed on the full transcript
+    llm_transcript = _prefilter_for_extraction(transcript, run_config)
 
-    for line in transcript.splitlines():
-        if sum(len(l) for l in current) + len(line) + 1 > max_chunk_chars:
-            if current:
-                chunks.append("\n".join(current))
-                current = []
-        current.append(line)
-    if current:
-        chunks.append("\n".join(current))
+    chunks = split_transcript_into_chunks(llm_transcript, run_config.chars_per_chunk, run_config.chunk_overlap_chars)
 
     total_chunks = len(chunks)
     all_moments: List[Dict[str, Any]] = []
@@ -178,55 +369,171 @@ def extract_moments(transcript: str, video_metadata: Optional[Dict] = None) -> L
     print(f"[extract_moments] Transcript length: {len(transcript)} chars, chunks: {total_chunks}")
 
     # Process chunks in parallel for speed
-    all_moments = _process_chunks_parallel(chunks)
+    all_moments = _process_chunks_parallel(chunks, run_config, intensity)
+    if run_config.chunk_overlap_chars:
+        all_moments = _dedupe_moments(all_moments)
 
     if not all_moments:
         print(f"[WARN] No viral moments could be extracted from transcript. Transcript length: {len(transcript)} chars, Chunks processed: {total_chunks}.")
         return []
 
     # Cache the results
-    save_moments_to_cache(all_moments, transcript, video_metadata)
+    save_moments_to_cache(all_moments, transcript, video_metadata, run_config, namespace)
 
     return all_moments
 
 
+def _prepare_chunk_request(chunk: str, idx: int, total_chunks: int,
+                           run_config: config.RunConfig) -> Tuple[str, str, Dict[str, Dict[str, Any]]]:
+    """Build (system_prompt, user_prompt, line_map) for one chunk."""
+    user_prompt, line_map = build_chunk_prompt(chunk, idx, total_chunks, run_config)
+
+    # Log chunk info for debugging
+    if line_map:
+        print(f"[extract_moments] Processing chunk {idx}/{total_chunks} (chars: {len(chunk)}, compact prompt chars: {len(user_prompt)})")
+    else:
+        print(f"[extract_moments] Processing chunk {idx}/{total_chunks} (chars: {len(chunk)})")
+
+    system_prompt = build_system_prompt(run_config.fused_cut_sheets, compact_lines=bool(line_map))
+    return system_prompt, user_prompt, line_map
+
+
+def _parse_chunk_response(raw_response: str, idx: int, total_chunks: int, run_config: config.RunConfig,
+                          line_map: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parse and limit the moments returned for one chunk."""
+    snippet = raw_response[:400].replace("\n", " ")
+    print(f"[extract_moments] Chunk {idx}/{total_chunks} raw response (truncated): {snippet}...")
+    if idx == 1:
+        # Print more of the first chunk's raw response for debugging
+        print(f"[extract_moments] Chunk 1 raw response (first 2000 chars):\n{raw_response[:2000]}")
+
+    moments = parse_moment_response(raw_response, expect_cut_sheet=run_config.fused_cut_sheets, line_map=line_map or None)
+
+    # Safety limit: truncate if too many moments returned
+    if len(moments) > run_config.moment_safety_limit:
+        print(f"[extract_moments] Chunk {idx} returned {len(moments)} moments, truncating to {run_config.moment_safety_limit}")
+        moments = moments[:run_config.moment_safety_limit]
+
+    if not moments:
+        print(f"[extract_moments] No moments parsed for chunk {idx}")
+        return []
+    else:
+        print(f"[extract_moments] Parsed {len(moments)} moments for chunk {idx}")
+        return moments
+
+
+_call_pool: Optional[ThreadPoolExecutor] = None
+_call_pool_lock = threading.Lock()
+
+
+def _get_call_pool() -> ThreadPoolExecutor:
+    """Shared pool that runs chunk calls (and their hedged duplicates) so callers can wait with a timeout."""
+    global _call_pool
+    if _call_pool is None:
+        with _call_pool_lock:
+            if _call_pool is None:
+                _call_pool = ThreadPoolExecutor(max_workers=2 * config.CONCURRENCY_MAX, thread_name_prefix="llm-call")
+    return _call_pool
+
+
+def _start_call(system_prompt: str, user_prompt: str, run_config: config.RunConfig, holds_slot: bool) -> Future:
+    """Start one chat call on the call pool; its latency and slot are settled when it finishes."""
+    started = time.monotonic()
+    future = _get_call_pool().submit(
+        call_llm_with_system, system_prompt, user_prompt, model=run_config.primary_model,
+        max_retries=0 if holds_slot else None,
+    )
+
+    def settle(done: Future) -> None:
+        latency = time.monotonic() - started
+        error = None if done.cancelled() else done.exception()
+        if error is None and not done.cancelled():
+            get_latency_tracker().record(latency)
+        if holds_slot:
+            get_llm_limiter().release(latency=None if done.cancelled() else latency, error=error)
+
+    future.add_done_callback(settle)
+    return future
+
+
+def _call_chunk_llm(system_prompt: str, user_prompt: str, idx: int, run_config: config.RunConfig) -> str:
+    """Call the LLM for one chunk (see _call_chunk_llm_once).
+
+    With adaptive concurrency the SDK doesn't retry limiter-gated calls, so
+    throttled or timed-out attempts are retried here with backoff.
+    """
+    if not run_config.adaptive_concurrency:
+        return _call_chunk_llm_once(system_prompt, user_prompt, idx, run_config)
+    return call_with_retries(
+        lambda: _call_chunk_llm_once(system_prompt, user_prompt, idx, run_config), label=f"Chunk {idx}"
+    )
+
+
+def _call_chunk_llm_once(system_prompt: str, user_prompt: str, idx: int, run_config: config.RunConfig) -> str:
+    """One attempt at a chunk call, hedging calls that run past the observed p95 latency.
+
+    When the primary call is still running after max(p95, HEDGE_MIN_DELAY_SECONDS),
+    a duplicate request is sent (only if the adaptive limiter has a free slot)
+    and the first successful reply wins. The loser is cancelled if it has not
+    started. A call already on the wire can't be interrupted with the sync
+    client: it runs to completion, holding a call-pool thread and (with
+    adaptive concurrency) its limiter slot until it returns, it is billed,
+    and its reply is discarded. Such losers are counted in the latency
+    metrics (hedge_losers_running / hedge_losers_billed).
+    """
+    adaptive = run_config.adaptive_concurrency
+    if adaptive:
+        get_llm_limiter().acquire()
+    primary = _start_call(system_prompt, user_prompt, run_config, holds_slot=adaptive)
+    futures = [primary]
+
+    tracker = get_latency_tracker()
+    hedge_after = tracker.quantile(config.HEDGE_LATENCY_QUANTILE) if run_config.hedged_requests else None
+    if hedge_after is not None:
+        hedge_after = max(hedge_after, config.HEDGE_MIN_DELAY_SECONDS)
+        done, _ = wait([primary], timeout=hedge_after)
+        if not done and (not adaptive or get_llm_limiter().try_acquire()):
+            print(f"[extract_moments] Chunk {idx} exceeded p95 latency ({hedge_after:.1f}s); sending hedged request")
+            tracker.record_hedge()
+            futures.append(_start_call(system_prompt, user_prompt, run_config, holds_slot=adaptive))
+
+    winner = None
+    for future in as_completed(futures):
+        if future.exception() is None:
+            winner = future
+            break
+    if winner is None:
+        # Every attempt failed; surface the primary call's error
+        return primary.result()
+
+    for future in futures:
+        if future is winner:
+            continue
+        running = not future.cancel()
+        tracker.record_hedge_loser(running)
+        if running:
+            future.add_done_callback(lambda _: tracker.hedge_loser_finished())
+    if winner is not primary:
+        tracker.record_hedge(won=True)
+        print(f"[extract_moments] Hedged request won for chunk {idx}")
+    return winner.result()
+
+
 def _process_single_chunk(chunk_data: tuple) -> List[Dict[str, Any]]:
     """Process a single chunk - used for parallel processing.
 
     Args:
-        chunk_data: Tuple of (chunk_text, chunk_index, total_chunks)
+        chunk_data: Tuple of (chunk_text, chunk_index, total_chunks, run_config)
 
     Returns:
         List of moments from this chunk
     """
-    chunk, idx, total_chunks = chunk_data
+    chunk, idx, total_chunks, run_config = chunk_data
 
     try:
-        user_prompt = build_prompt_for_chunk(chunk, idx, total_chunks)
-
-        # Log chunk info for debugging
-        print(f"[extract_moments] Processing chunk {idx}/{total_chunks} (chars: {len(chunk)})")
-
-        raw_response = call_llm_with_system(SYSTEM_PROMPT, user_prompt)
-        snippet = raw_response[:400].replace("\n", " ")
-        print(f"[extract_moments] Chunk {idx}/{total_chunks} raw response (truncated): {snippet}...")
-        if idx == 1:
-            # Print more of the first chunk's raw response for debugging
-            print(f"[extract_moments] Chunk 1 raw response (first 2000 chars):\n{raw_response[:2000]}")
-
-        moments = parse_moment_response(raw_response)
-
-        # Safety limit: truncate if too many moments returned
-        if len(moments) > config.MOMENT_SAFETY_LIMIT:
-            print(f"[extract_moments] Chunk {idx} returned {len(moments)} moments, truncating to {config.MOMENT_SAFETY_LIMIT}")
-            moments = moments[:config.MOMENT_SAFETY_LIMIT]
-
-        if not moments:
-            print(f"[extract_moments] No moments parsed for chunk {idx}")
-            return []
-        else:
-            print(f"[extract_moments] Parsed {len(moments)} moments for chunk {idx}")
-            return moments
+        system_prompt, user_prompt, line_map = _prepare_chunk_request(chunk, idx, total_chunks, run_config)
+        raw_response = _call_chunk_llm(system_prompt, user_prompt, idx, run_config)
+        return _parse_chunk_response(raw_response, idx, total_chunks, run_config, line_map)
 
     except Exception as e:
         print(f"[extract_moments] Error processing chunk {idx}: {e}")
@@ -235,23 +542,102 @@ def _process_single_chunk(chunk_data: tuple) -> List[Dict[str, Any]]:
         return []
 
 
-def _process_chunks_parallel(chunks: List[str]) -> List[Dict[str, Any]]:
+def _process_chunks_batch(chunks: List[str], chunk_indices: List[int], run_config: config.RunConfig) -> List[Dict[str, Any]]:
+    """Extract all chunks in one Batch API job (run_config.execution_mode == "batch").
+
+    Args:
+        chunks: List of transcript chunks
+        chunk_indices: 1-based indices of the chunks to process
+        run_config: Per-run settings
+
+    Returns:
+        Combined list of all moments from all chunks
+    """
+    from src.batch_client import BatchRequest, run_chat_batch
+
+    total_chunks = len(chunks)
+    requests: List[BatchRequest] = []
+    line_maps: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    for idx in chunk_indices:
+        system_prompt, user_prompt, line_maps[idx] = _prepare_chunk_request(chunks[idx - 1], idx, total_chunks, run_config)
+        requests.append(BatchRequest(f"chunk-{idx}", system_prompt, user_prompt, run_config.primary_model))
+
+    replies = run_chat_batch(requests)
+
+    all_moments = []
+    for idx in chunk_indices:
+        raw_response = replies.get(f"chunk-{idx}")
+        if raw_response is None:
+            continue
+        try:
+            all_moments.extend(_parse_chunk_response(raw_response, idx, total_chunks, run_config, line_maps[idx]))
+        except Exception as e:
+            print(f"[extract_moments] Error processing chunk {idx}: {e}")
+    return all_moments
+
+
+def _schedule_chunks(chunks: List[str], intensity: Optional[Dict[str, Any]], run_config: config.RunConfig) -> List[int]:
+    """Order 1-based chunk indices for submission.
+
+    With an intensity timeline the hottest audio goes first; chunks scoring
+    below run_config.intensity_skip_below are dropped, but the hottest chunk
+    is always kept. Otherwise chunks are ordered longest first: call time
+    grows with chunk length, and starting the longest calls first keeps one
+    late long call from setting the total job time.
+    """
+    indices = list(range(1, len(chunks) + 1))
+    if not chunks:
+        return indices
+    if not intensity:
+        return sorted(indices, key=lambda idx: len(chunks[idx - 1]), reverse=True)
+
+    from src.audio_features import IntensityTimeline, chunk_intensity
+
+    timeline = IntensityTimeline.from_dict(intensity)
+    scores = {idx: chunk_intensity(parse_timestamped_transcript(chunks[idx - 1]), timeline) for idx in indices}
+    ordered = sorted(indices, key=lambda idx: scores[idx], reverse=True)
+
+    threshold = run_config.intensity_skip_below
+    kept = [idx for idx in ordered if scores[idx] >= threshold] or ordered[:1]
+    if len(kept) < len(ordered):
+        print(f"[extract_moments] Skipping {len(ordered) - len(kept)} flat chunks below intensity {threshold:.2f}")
+    print("[extract_moments] Chunk order by intensity: " + ", ".join(f"{idx} ({scores[idx]:.2f})" for idx in kept))
+    return kept
+
+
+def _process_chunks_parallel(chunks: List[str], run_config: config.RunConfig,
+                             intensity: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Process chunks in parallel for better performance.
 
+    In batch execution mode all chunks are submitted as one Batch API job
+    instead.
+
     Args:
         chunks: List of transcript chunks to process
+        run_config: Per-run settings
+        intensity: Optional audio intensity timeline used to order/skip chunks
 
     Returns:
         Combined list of all moments from all chunks
     """
     all_moments = []
     total_chunks = len(chunks)
-
-    # Prepare chunk data for parallel processing
-    chunk_data = [(chunk, idx, total_chunks) for idx, chunk in enumerate(chunks, start=1)]
-
-    # Process chunks in parallel with limited concurrency
-    with ThreadPoolExecutor(max_workers=config.MAX_PARALLEL_CHUNKS) as executor:
+    chunk_indices = _schedule_chunks(chunks, intensity, run_config)
+
+    if run_config.execution_mode == "batch":
+        return _process_chunks_batch(chunks, chunk_indices, run_config)
+
+    # Prepare chunk data for parallel processing (the executor starts them in submission order)
+    chunk_data = [(chunks[idx - 1], idx, total_chunks, run_config) for idx in chunk_indices]
+
+    # Process chunks in parallel with limited concurrency. With adaptive
+    # concurrency the pool is sized for the limiter's ceiling and the
+    # shared AIMD limiter decides how many calls are actually in flight.
+    if run_config.adaptive_concurrency:
+        max_workers = max(1, min(get_llm_limiter().max_limit, len(chunk_data)))
+    else:
+        max_workers = run_config.max_parallel_chunks
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all chunks
         future_to_chunk = {executor.submit(_process_single_chunk, data): data[1] for data in chunk_data}
 
@@ -265,6 +651,9 @@ def _process_chunks_parallel(chunks: List[str]) -> List[Dict[str, Any]]:
             except Exception as e:
                 print(f"[extract_moments] Parallel processing error for chunk {chunk_idx}: {e}")
 
+    if run_config.adaptive_concurrency:
+        metrics = get_llm_limiter().metrics()
+        print(f"[extract_moments] Adaptive concurrency limit: {metrics['limit']} (counts: {metrics['counts']})")
     return all_moments
 
 
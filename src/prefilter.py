@@ -0,0 +1,199 @@
+"""Local lexical pre-filter for transcripts.
+
+Long talks carry announcements, logistics, music cues and readings that
+never become clips. Before chunking, every transcript line is scored
+locally on:
+
+- Catholic rhetoric lexicon hits: doctrinal terms, absolutes and contrast
+  markers score up; logistics and stage cues score down.
+- Questions.
+- TF-IDF novelty.
+- Line length.
+
+Scores are smoothed over neighbouring lines, so fragments of a strong
+sentence survive. Long runs of low-scoring lines are then dropped or
+collapsed into one placeholder that keeps the time range. Kept lines are
+untouched, so their timestamps stay exact.
+
+Tokenization is one pass over the lines; every feature after that is
+computed with NumPy over the whole transcript at once.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src import config
+from src.transcript_utils import omitted_span_text, parse_timestamped_line, seconds_to_timestamp
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+# word -> weight; single words so lookups stay vectorized
+DOCTRINAL_TERMS = {
+    "god", "christ", "jesus", "lord", "spirit", "trinity", "church", "catholic", "catholics",
+    "eucharist", "mass", "sacrament", "sacraments", "grace", "sin", "sins", "mortal", "venial",
+    "salvation", "saved", "heaven", "hell", "purgatory", "soul", "souls", "cross", "resurrection",
+    "mary", "virgin", "saint", "saints", "pope", "apostles", "scripture", "tradition", "faith",
+    "confession", "repent", "repentance", "baptism", "holy", "truth", "doctrine", "heresy",
+    "protestant", "protestants", "martyr", "martyrs", "eternal", "eternity", "mercy", "judgment",
+    "prayer", "pray", "rosary", "devil", "satan", "demons", "sacrifice", "altar", "priest",
+}
+ABSOLUTES = {
+    "never", "always", "every", "everyone", "everything", "nothing", "nobody", "only", "must",
+    "all", "none", "forever", "absolutely", "entire", "impossible", "certainly",
+}
+CONTRAST_MARKERS = {"but", "yet", "however", "instead", "rather", "actually", "unless", "although", "whereas"}
+LOW_VALUE_TERMS = {
+    "announcement", "announcements", "bulletin", "parking", "lot", "coffee", "donuts", "registration",
+    "register", "website", "subscribe", "link", "description", "sponsor", "sponsored", "collection",
+    "envelope", "schedule", "volunteers", "music", "applause", "laughter", "inaudible", "um", "uh",
+}
+
+LEXICON_WEIGHTS: Dict[str, float] = {
+    **{w: 1.0 for w in DOCTRINAL_TERMS},
+    **{w: 0.6 for w in ABSOLUTES},
+    **{w: 0.5 for w in CONTRAST_MARKERS},
+    **{w: -1.0 for w in LOW_VALUE_TERMS},
+}
+
+
+class PrefilterReport(NamedTuple):
+    """What the pre-filter removed from one transcript."""
+    lines_in: int
+    lines_kept: int
+    spans_removed: int
+    chars_in: int
+    chars_out: int
+
+    @property
+    def estimated_tokens_saved(self) -> int:
+        # ~4 characters per token for English prose
+        return max(self.chars_in - self.chars_out, 0) // 4
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+
+def score_lines(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Score transcript lines for clip potential.
+
+    Args:
+        texts: Line texts (timestamps stripped)
+
+    Returns:
+        Tuple of (smoothed_scores, lexicon_scores), one entry per line
+    """
+    n = len(texts)
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+
+    tokens = [_WORD_RE.findall(text.lower()) for text in texts]
+    lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=n)
+    total = int(lengths.sum())
+
+    vocab: Dict[str, int] = {}
+    term_ids = np.fromiter((vocab.setdefault(w, len(vocab)) for line in tokens for w in line), dtype=np.int64, count=total)
+    line_ids = np.repeat(np.arange(n), lengths)
+    vocab_size = max(len(vocab), 1)
+
+    term_weights = np.zeros(vocab_size)
+    for word, weight in LEXICON_WEIGHTS.items():
+        if word in vocab:
+            term_weights[vocab[word]] = weight
+    lexicon = np.bincount(line_ids, weights=term_weights[term_ids], minlength=n)
+
+    # Document frequency over lines, from unique (line, term) pairs
+    pairs = np.unique(line_ids * vocab_size + term_ids)
+    df = np.bincount(pairs % vocab_size, minlength=vocab_size)
+    idf = np.log((n + 1) / (df + 1)) + 1.0
+    novelty = np.bincount(line_ids, weights=idf[term_ids], minlength=n) / np.maximum(lengths, 1)
+
+    questions = np.fromiter(("?" in text for text in texts), dtype=np.float64, count=n)
+
+    raw = (
+        config.PREFILTER_WEIGHT_LEXICON * lexicon
+        + config.PREFILTER_WEIGHT_NOVELTY * _zscore(novelty)
+        + config.PREFILTER_WEIGHT_LENGTH * _zscore(np.log1p(lengths))
+        + config.PREFILTER_WEIGHT_QUESTION * questions
+    )
+
+    width = max(1, config.PREFILTER_CONTEXT_LINES * 2 + 1)
+    smoothed = np.convolve(raw, np.ones(width) / width, mode="same")
+
+    # Net lexicon weight over the same neighbourhood, so a doctrinal line protects its fragments
+    lexicon_context = np.convolve(lexicon, np.ones(width), mode="same")
+    return smoothed, lexicon_context
+
+
+def _low_spans(low: np.ndarray, min_span: int) -> List[Tuple[int, int]]:
+    """Runs of True at least min_span long, as [start, end) line indices."""
+    edges = np.diff(np.concatenate(([0], low.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = (ends - starts) >= min_span
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def prefilter_transcript(transcript: str, drop_quantile: Optional[float] = None,
+                         collapse: Optional[bool] = None) -> Tuple[str, PrefilterReport]:
+    """Drop or collapse low-value spans from a transcript.
+
+    A line is low-value when its smoothed score is in the bottom
+    drop_quantile of the transcript and its neighbourhood carries less
+    than one doctrinal term's worth of net lexicon weight. Only runs of at least PREFILTER_MIN_SPAN_LINES such
+    lines are removed.
+
+    Args:
+        transcript: Transcript text (timestamped lines or plain lines)
+        drop_quantile: Fraction of lowest-scoring lines eligible for removal
+            (defaults to config.PREFILTER_DROP_QUANTILE)
+        collapse: Replace each removed span with one "[start–end] [...]" line
+            instead of dropping it (defaults to config.PREFILTER_COLLAPSE).
+            Placeholders never get a compact line id and are stripped from
+            quotes (see transcript_utils.is_omitted_span)
+
+    Returns:
+        Tuple of (filtered_transcript, report)
+    """
+    drop_quantile = config.PREFILTER_DROP_QUANTILE if drop_quantile is None else drop_quantile
+    collapse = config.PREFILTER_COLLAPSE if collapse is None else collapse
+
+    lines = transcript.splitlines()
+    parsed = [parse_timestamped_line(line) for line in lines]
+    texts = [seg["text"] if seg else line for seg, line in zip(parsed, lines)]
+
+    spans: List[Tuple[int, int]] = []
+    if lines and drop_quantile > 0:
+        scores, lexicon_context = score_lines(texts)
+        low = (scores <= np.quantile(scores, drop_quantile)) & (lexicon_context < 1.0)
+        spans = _low_spans(low, config.PREFILTER_MIN_SPAN_LINES)
+
+    out: List[str] = []
+    cursor = 0
+    for start, end in spans:
+        out.extend(lines[cursor:start])
+        first, last = parsed[start], parsed[end - 1]
+        if collapse and first and last:
+            out.append(
+                f"[{seconds_to_timestamp(first['start'])}–{seconds_to_timestamp(last['end'])}] "
+                f"{omitted_span_text(end - start)}"
+            )
+        cursor = end
+    out.extend(lines[cursor:])
+
+    filtered = "\n".join(out)
+    report = PrefilterReport(
+        lines_in=len(lines),
+        lines_kept=len(lines) - sum(end - start for start, end in spans),
+        spans_removed=len(spans),
+        chars_in=len(transcript),
+        chars_out=len(filtered),
+    )
+    print(
+        f"[prefilter] Kept {report.lines_kept}/{report.lines_in} lines, removed {report.spans_removed} spans "
+        f"({report.chars_in - report.chars_out:,} chars, ~{report.estimated_tokens_saved:,} tokens saved)"
+    )
+    return filtered, report
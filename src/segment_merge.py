@@ -0,0 +1,154 @@
+"""Sentence-level consolidation of fragmentary auto-captions.
+
+YouTube auto-generated captions arrive as short, overlapping fragments that
+often repeat the last words of the previous fragment (rolling captions).
+Emitted one line per fragment, they inflate line counts, chunk overhead and
+quote matching. merge_caption_fragments folds them into sentence-level
+segments in a single pass:
+
+- rolling duplicates are removed by matching the new fragment's leading
+  words against the tail of the current sentence (bounded lookback);
+- a sentence ends at terminal punctuation, at a pause longer than
+  CAPTION_MERGE_PAUSE_SECONDS, or when it grows past
+  CAPTION_MERGE_MAX_CHARS / CAPTION_MERGE_MAX_SECONDS;
+- sentences closed by a pause get a full stop, and every sentence starts
+  with a capital letter, since auto-captions usually carry no punctuation.
+
+Each merged segment starts at the first fragment that contributed words and
+ends at the last one, clipped so consecutive segments never overlap.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src import config
+
+MAX_OVERLAP_WORDS = 12  # Longest rolling repeat looked for between fragments
+
+_TERMINAL_RE = re.compile(r"[.!?…][\"')\]]*$")
+_WORD_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+def _norm(word: str) -> str:
+    return _WORD_NORMALIZE_RE.sub("", word.lower())
+
+
+def _rolling_overlap(tail: List[str], normalized: List[str]) -> int:
+    """Length of the longest suffix of tail that equals a prefix of normalized."""
+    for size in range(min(len(tail), len(normalized), MAX_OVERLAP_WORDS), 0, -1):
+        if tail[-size:] == normalized[:size]:
+            return size
+    return 0
+
+
+def _finish(words: List[str], capitalize: bool, add_period: bool) -> str:
+    text = " ".join(words)
+    if capitalize:
+        text = text[:1].upper() + text[1:]
+    if add_period and not _TERMINAL_RE.search(text):
+        text += "."
+    return text
+
+
+def iter_merged_segments(
+    fragments: Iterable[Dict[str, Any]],
+    pause_seconds: Optional[float] = None,
+    max_chars: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream sentence-level {"start", "end", "text"} segments from caption fragments.
+
+    Args:
+        fragments: {"start", "end", "text"} fragments in time order
+        pause_seconds: Gap that ends a sentence (defaults to config.CAPTION_MERGE_PAUSE_SECONDS)
+        max_chars: Longest merged text (defaults to config.CAPTION_MERGE_MAX_CHARS)
+        max_seconds: Longest merged duration (defaults to config.CAPTION_MERGE_MAX_SECONDS)
+    """
+    pause_seconds = config.CAPTION_MERGE_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+    max_chars = max_chars or config.CAPTION_MERGE_MAX_CHARS
+    max_seconds = max_seconds or config.CAPTION_MERGE_MAX_SECONDS
+
+    words: List[str] = []
+    tail: List[str] = []  # Normalized last words (of the previous sentence too, for rolling repeats)
+    chars = 0
+    start = end = 0.0
+    last_end = None
+    sentence_start = True  # Current segment begins a new sentence (not a length split)
+    pending: Optional[Dict[str, Any]] = None
+
+    def emit(sentence_end: bool, add_period: bool) -> Iterator[Dict[str, Any]]:
+        nonlocal pending, words, chars, sentence_start
+        if pending is not None:
+            # Clip the previous segment so it doesn't overlap this one
+            pending["end"] = max(pending["start"], min(pending["end"], start))
+            yield pending
+        pending = {"start": start, "end": end, "text": _finish(words, sentence_start, add_period)}
+        words, chars = [], 0
+        sentence_start = sentence_end
+
+    for fragment in fragments:
+        text = str(fragment.get("text", "")).strip()
+        if not text:
+            continue
+        frag_start = float(fragment.get("start", 0) or 0)
+        frag_end = max(float(fragment.get("end", 0) or 0), frag_start)
+
+        new_words = text.split()
+        normalized = [_norm(w) for w in new_words]
+        overlap = _rolling_overlap(tail, normalized)
+        new_words, normalized = new_words[overlap:], normalized[overlap:]
+        if not new_words:
+            # Pure repeat: only extends how long the words stay on screen
+            if words:
+                end = max(end, frag_end)
+            last_end = frag_end if last_end is None else max(last_end, frag_end)
+            continue
+
+        if words:
+            paused = last_end is not None and frag_start - last_end > pause_seconds
+            too_long = chars >= max_chars or frag_end - start > max_seconds
+            if paused or too_long:
+                yield from emit(sentence_end=paused, add_period=paused)
+
+        if not words:
+            start = frag_start
+        words.extend(new_words)
+        chars += sum(len(w) + 1 for w in new_words)
+        end = max(end, frag_end) if len(words) > len(new_words) else frag_end
+        tail = (tail + normalized)[-MAX_OVERLAP_WORDS:]
+        last_end = frag_end if last_end is None else max(last_end, frag_end)
+
+        if _TERMINAL_RE.search(new_words[-1]):
+            yield from emit(sentence_end=True, add_period=False)
+
+    if words:
+        yield from emit(sentence_end=True, add_period=True)
+    if pending is not None:
+        yield pending
+
+
+def rolling_overlap_words(previous_text: str, text: str) -> int:
+    """Number of leading words of text that repeat the last words of previous_text."""
+    tail = [_norm(w) for w in previous_text.split()][-MAX_OVERLAP_WORDS:]
+    return _rolling_overlap(tail, [_norm(w) for w in text.split()])
+
+
+def rolling_repeat_ratio(segments: List[Dict[str, Any]], min_words: int = 2) -> float:
+    """Share of segments that open by repeating at least min_words of the previous one.
+
+    Rolling auto-captions repeat the previous fragment's tail on almost every
+    cue; edited captions practically never do.
+    """
+    texts = [str(s.get("text", "")) for s in segments if str(s.get("text", "")).strip()]
+    if len(texts) < 2:
+        return 0.0
+    repeats = sum(
+        1 for previous, text in zip(texts, texts[1:])
+        if rolling_overlap_words(previous, text) >= min(min_words, len(text.split()))
+    )
+    return repeats / (len(texts) - 1)
+
+
+def merge_caption_fragments(fragments: Iterable[Dict[str, Any]], **kwargs: Any) -> List[Dict[str, Any]]:
+    """List version of iter_merged_segments."""
+    return list(iter_merged_segments(fragments, **kwargs))
@@ -4,10 +4,11 @@ Handles video ID extraction, synchronous Apify API calls, and transcript formatt
 """
 
 import re
-import requests
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from urllib.parse import urlparse, parse_qs
 from src import config
+from src.http_clients import get_apify_session
+from src.segment_merge import merge_caption_fragments
 
 
 def extract_video_id_from_url(youtube_url: str) -> str:
@@ -91,6 +92,51 @@ def seconds_to_timestamp(seconds: float) -> str:
     return f"{minutes:02d}:{secs:05.2f}"
 
 
+def build_apify_payload(canonical_url: str, language: str = "en") -> Dict[str, Any]:
+    """Actor input for a single video (canonical URL + language)."""
+    return {
+        "youtube_url": canonical_url,
+        "language": (language or "en").strip(),
+    }
+
+
+def validate_apify_items(items: Any, canonical_url: str) -> Dict[str, Any]:
+    """Check the actor's dataset items and return the single video item.
+
+    Args:
+        items: Dataset items returned by the actor
+        canonical_url: Canonical video URL (for error messages)
+
+    Returns:
+        The video item containing a non-empty transcript
+
+    Raises:
+        RuntimeError: If the payload is empty, failed, or has no transcript
+    """
+    if not isinstance(items, list) or not items:
+        raise RuntimeError(
+            f"Apify Actor returned no items or unexpected payload: {items}"
+        )
+
+    item = items[0]  # Single video response
+
+    # Check status if available
+    status = item.get("status", "")
+    if status and status != "success":
+        message = item.get("message", "Unknown error")
+        raise RuntimeError(f"Apify Actor failed: {message}")
+
+    # Validate transcript exists
+    transcript = item.get("transcript", [])
+    if not transcript:
+        raise RuntimeError(
+            f"No transcript available for video: {canonical_url}. "
+            f"Video may not have captions or may be private/restricted."
+        )
+
+    return item
+
+
 def call_apify_actor(youtube_url: str, language: str = "en") -> Dict[str, Any]:
     """Call Apify Actor to get YouTube transcript with normalized URL.
 
@@ -104,6 +150,8 @@ def call_apify_actor(youtube_url: str, language: str = "en") -> Dict[str, Any]:
     Raises:
         RuntimeError: If API call fails or returns invalid data
     """
+    import requests  # Deferred: only needed when actually calling Apify
+
     config.validate_config()
 
     # Normalize the YouTube URL to canonical format
@@ -111,50 +159,23 @@ def call_apify_actor(youtube_url: str, language: str = "en") -> Dict[str, Any]:
 
     # Build the synchronous endpoint URL
     url = (
-        f"https://api.apify.com/v2/acts/"
+        f"{config.APIFY_BASE_URL}/v2/acts/"
         f"{config.APIFY_ACTOR_ID}/run-sync-get-dataset-items"
         f"?token={config.APIFY_TOKEN}"
     )
 
-    # Prepare payload with canonical URL
-    payload = {
-        "youtube_url": canonical_url,
-        "language": (language or "en").strip(),
-    }
+    payload = build_apify_payload(canonical_url, language)
 
     try:
         # Call the synchronous endpoint that returns dataset items directly
-        response = requests.post(url, json=payload, timeout=300)
+        response = get_apify_session().post(url, json=payload, timeout=config.APIFY_TIMEOUT_SECONDS)
 
         if response.status_code >= 400:
             raise RuntimeError(
                 f"Failed to call Apify Actor ({response.status_code}): {response.text}"
             )
 
-        items = response.json()
-
-        if not isinstance(items, list) or not items:
-            raise RuntimeError(
-                f"Apify Actor returned no items or unexpected payload: {items}"
-            )
-
-        item = items[0]  # Single video response
-
-        # Check status if available
-        status = item.get("status", "")
-        if status and status != "success":
-            message = item.get("message", "Unknown error")
-            raise RuntimeError(f"Apify Actor failed: {message}")
-
-        # Validate transcript exists
-        transcript = item.get("transcript", [])
-        if not transcript:
-            raise RuntimeError(
-                f"No transcript available for video: {canonical_url}. "
-                f"Video may not have captions or may be private/restricted."
-            )
-
-        return item
+        return validate_apify_items(response.json(), canonical_url)
 
     except requests.RequestException as e:
         raise RuntimeError(f"Failed to call Apify Actor: {e}")
@@ -168,6 +189,10 @@ def flatten_transcript(item: Dict[str, Any]) -> str:
     Builds a transcript string with timestamp ranges for each segment:
     Format: [MM:SS.xx–MM:SS.xx] transcript text
 
+    Auto-generated captions (item["is_auto_generated"]) are first merged
+    from fragments into sentence-level segments when
+    config.MERGE_AUTO_CAPTIONS is on.
+
     Args:
         item: Apify Actor response item containing transcript data
 
@@ -183,6 +208,13 @@ def flatten_transcript(item: Dict[str, Any]) -> str:
         if not isinstance(transcript_segments, list):
             raise RuntimeError("Transcript is not in expected list format")
 
+        if item.get("is_auto_generated") and config.MERGE_AUTO_CAPTIONS:
+            fragment_count = len(transcript_segments)
+            transcript_segments = merge_caption_fragments(
+                seg for seg in transcript_segments if isinstance(seg, dict)
+            )
+            print(f"[transcript_utils] Merged {fragment_count} auto-caption fragments into {len(transcript_segments)} segments")
+
         lines = []
         for segment in transcript_segments:
             if not isinstance(segment, dict):
@@ -206,11 +238,75 @@ def flatten_transcript(item: Dict[str, Any]) -> str:
         raise RuntimeError(f"Missing required field in transcript data: {e}")
 
 
+# Matches one flatten_transcript line: [MM:SS.xx–MM:SS.xx] text
+_TIMESTAMPED_LINE_RE = re.compile(
+    r"^\[(\d+):(\d+(?:\.\d+)?)\s*[–—-]\s*(\d+):(\d+(?:\.\d+)?)\]\s*(.*)$"
+)
+
+
+def parse_timestamped_line(line: str) -> Optional[Dict[str, Any]]:
+    """Parse one "[MM:SS.xx–MM:SS.xx] text" line into a segment dict.
+
+    Returns:
+        {"start", "end", "text"} (seconds as floats), or None if the line has
+        no leading time range
+    """
+    match = _TIMESTAMPED_LINE_RE.match(line.strip())
+    if not match:
+        return None
+    start_m, start_s, end_m, end_s, text = match.groups()
+    return {
+        "start": int(start_m) * 60 + float(start_s),
+        "end": int(end_m) * 60 + float(end_s),
+        "text": text.strip(),
+    }
+
+
+# Placeholder text the pre-filter leaves in place of a collapsed span
+_OMITTED_SPAN_RE = re.compile(r"\s*\[… \d+ low-value lines omitted …\]\s*")
+
+
+def omitted_span_text(line_count: int) -> str:
+    """Placeholder text for a span of line_count lines removed by the pre-filter."""
+    return f"[… {line_count} low-value lines omitted …]"
+
+
+def is_omitted_span(text: str) -> bool:
+    """True if text is a pre-filter placeholder rather than spoken words."""
+    return bool(_OMITTED_SPAN_RE.fullmatch(text or ""))
+
+
+def strip_omitted_spans(text: str) -> str:
+    """Remove pre-filter placeholders a model copied into a quote."""
+    return _OMITTED_SPAN_RE.sub(" ", text or "").strip()
+
+
+def parse_timestamped_transcript(transcript_text: str) -> List[Dict[str, Any]]:
+    """Parse flatten_transcript output back into timestamped segments.
+
+    Lines without a leading [start–end] range are ignored.
+
+    Args:
+        transcript_text: Transcript in the "[MM:SS.xx–MM:SS.xx] text" format
+
+    Returns:
+        List of {"start", "end", "text"} segment dicts (seconds as floats)
+    """
+    segments = []
+    for line in (transcript_text or "").splitlines():
+        segment = parse_timestamped_line(line)
+        if segment and segment["text"]:
+            segments.append(segment)
+    return segments
+
+
 def get_transcript_from_youtube(youtube_url: str, language: str = "en") -> Tuple[str, Dict[str, Any]]:
     """Get formatted transcript and metadata from YouTube URL.
 
     Main function that orchestrates the full process:
-    1. Call Apify Actor synchronously using run-sync-get-dataset-items
+    1. Run the Apify Actor: start a run, poll it and read its dataset
+       (src.apify_async) when config.APIFY_ASYNC_RUNS is on, otherwise one
+       blocking run-sync-get-dataset-items call
     2. Format transcript text
     3. Extract metadata
 
@@ -224,14 +320,39 @@ def get_transcript_from_youtube(youtube_url: str, language: str = "en") -> Tuple
     Raises:
         RuntimeError: If any step in the process fails
     """
+    if config.APIFY_ASYNC_RUNS:
+        # Deferred: apify_async builds on this module. Each call runs its own
+        # event loop, so the async client (and its pool) lasts one call.
+        from src.apify_async import get_transcripts_from_youtube_batch
+
+        result = get_transcripts_from_youtube_batch([youtube_url], language)[0]
+        if isinstance(result, RuntimeError):
+            raise result
+        if isinstance(result, Exception):
+            raise RuntimeError(f"Failed to fetch transcript from Apify: {result}") from result
+        return result
+
     # Get raw data from Apify
     item = call_apify_actor(youtube_url, language)
 
     # Build formatted transcript
     transcript_text = flatten_transcript(item)
 
-    # Extract metadata
-    metadata = {
+    return transcript_text, build_video_metadata(item, youtube_url, language)
+
+
+def build_video_metadata(item: Dict[str, Any], youtube_url: str, language: str = "en") -> Dict[str, Any]:
+    """Extract the video metadata dict from an Apify item.
+
+    Args:
+        item: Apify Actor response item
+        youtube_url: URL the item was requested for
+        language: Requested transcript language
+
+    Returns:
+        Metadata dictionary used by caching, exports and the UI
+    """
+    return {
         "title": item.get("title", ""),
         "channel_name": item.get("channel_name", ""),
         "video_id": item.get("video_id", ""),
@@ -244,6 +365,4 @@ def get_transcript_from_youtube(youtube_url: str, language: str = "en") -> Tuple
         "comment_count": item.get("comment_count", 0),
         "published_at": item.get("published_at", ""),
         "is_auto_generated": item.get("is_auto_generated", False)
-    }
-
-    return transcript_text, metadata
\ No newline at end of file
+    }
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""Bounded-memory handling of uploaded files.
+
+Uploads are copied in fixed-size blocks (hashing each block as it passes)
+instead of being read into one bytes object, and text uploads are decoded
+incrementally. Peak extra memory per upload is one block, whatever the
+file size.
+"""
+
+import codecs
+import hashlib
+import io
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from src import config
+
+
+def iter_upload_blocks(uploaded_file: BinaryIO, block_size: Optional[int] = None) -> Iterator[bytes]:
+    """Yield an upload's bytes in fixed-size blocks, starting from the beginning."""
+    block_size = block_size or config.UPLOAD_BLOCK_BYTES
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    while True:
+        block = uploaded_file.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def copy_upload(uploaded_file: BinaryIO, dest: BinaryIO, block_size: Optional[int] = None) -> Tuple[int, str]:
+    """Copy an upload into dest block by block, hashing while copying.
+
+    Args:
+        uploaded_file: Readable binary file (e.g. Streamlit UploadedFile)
+        dest: Writable binary file
+        block_size: Bytes per block (defaults to config.UPLOAD_BLOCK_BYTES)
+
+    Returns:
+        Tuple of (bytes_copied, sha256_hex)
+    """
+    digest = hashlib.sha256()
+    total = 0
+    for block in iter_upload_blocks(uploaded_file, block_size):
+        digest.update(block)
+        dest.write(block)
+        total += len(block)
+    return total, digest.hexdigest()
+
+
+def save_upload(uploaded_file: BinaryIO, path: str, block_size: Optional[int] = None) -> Tuple[int, str]:
+    """Stream an upload to a file on disk.
+
+    Returns:
+        Tuple of (bytes_written, sha256_hex)
+    """
+    with open(path, "wb") as dest:
+        return copy_upload(uploaded_file, dest, block_size)
+
+
+def read_upload_text(uploaded_file: BinaryIO, encoding: str = "utf-8-sig", block_size: Optional[int] = None) -> str:
+    """Decode a text upload block by block without first materialising its bytes.
+
+    Multi-byte characters split across blocks are handled by the incremental
+    decoder. Invalid bytes raise UnicodeDecodeError, as str(data, "utf-8") did.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    text = io.StringIO()
+    for block in iter_upload_blocks(uploaded_file, block_size):
+        text.write(decoder.decode(block))
+    text.write(decoder.decode(b"", final=True))
+    return text.getvalue()
+
+
+def open_upload_text(uploaded_file: BinaryIO, encoding: str = "utf-8-sig") -> io.TextIOWrapper:
+    """Wrap an upload as a line-iterable text stream decoded in blocks.
+
+    Call .detach() on the wrapper when done to leave the upload open.
+    """
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return io.TextIOWrapper(uploaded_file, encoding=encoding, errors="replace")
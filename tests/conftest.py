@@ -0,0 +1,57 @@
+"""Shared pytest setup: make the repo root importable as `src`."""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def install_fake_tools(tmp_path, monkeypatch, **scripts):
+    """Make PATH hold only stand-in executables, e.g. install_fake_tools(..., ffmpeg=SCRIPT).
+
+    Each script is Python source; "{python}" in it becomes the interpreter path.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir(exist_ok=True)
+    for name, script in scripts.items():
+        tool = bin_dir / name
+        tool.write_text(script.format(python=sys.executable))
+        tool.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    return bin_dir
+
+
+def make_moment(i: int, quote_words: int = 60):
+    """A fully populated moment with a cut sheet, as produced by the pipeline."""
+    return {
+        "id": f"m{i:05d}",
+        "timestamps": "00:01.00-00:30.00",
+        "quote": "grace " * quote_words,
+        "clip_duration_seconds": 29,
+        "viral_trigger": "Contrast",
+        "why_it_hits": "Short and punchy",
+        "energy_tag": "HIGH",
+        "flags": ["quote"],
+        "persona_captions": {"catholic": "Caption", "thomist": "Caption"},
+        "editor_cut_sheet": {
+            "clip_label": f"CLIP_{i}",
+            "in_point": "00:01.00",
+            "out_point": "00:30.00",
+            "aspect_ratio": "9:16",
+            "emphasis_words_caps": ["GRACE"],
+        },
+    }
+
+
+@pytest.fixture
+def tmp_cache(tmp_path, monkeypatch):
+    """Point the module-level cache directory at a temporary folder."""
+    from src import config
+
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(config, "CACHE_DIR", cache_dir)
+    return cache_dir
@@ -0,0 +1,148 @@
+"""Async Apify runs against a local fake of the run/dataset endpoints."""
+
+import asyncio
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src import config
+from src.apify_async import ApifyAsyncClient
+from src.transcript_utils import get_transcript_from_youtube
+
+
+class FakeApify:
+    """In-memory Apify: runs finish after a few polls, datasets are paged."""
+
+    def __init__(self, polls_until_done=2):
+        self.polls_until_done = polls_until_done
+        self.runs = {}
+        self.datasets = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def add_dataset(self, dataset_id, items):
+        self.datasets[dataset_id] = items
+
+    def start_run(self, body):
+        with self.lock:
+            run_id = f"run{len(self.runs) + 1}"
+            video = body.get("youtube_url", "")
+            status = "FAILED" if "fail" in video else "SUCCEEDED"
+            self.runs[run_id] = {"polls": 0, "final": status, "dataset": f"ds_{run_id}"}
+            self.datasets[f"ds_{run_id}"] = [{
+                "status": "success",
+                "title": f"Talk {run_id}",
+                "video_id": run_id,
+                "url": video,
+                "language": body.get("language"),
+                "transcript": [
+                    {"start": 0.0, "end": 2.5, "text": "Grace builds on nature."},
+                    {"start": 2.5, "end": 5.0, "text": f"This is {video}."},
+                ],
+            }]
+            return {"id": run_id, "status": "READY", "defaultDatasetId": f"ds_{run_id}"}
+
+    def get_run(self, run_id):
+        with self.lock:
+            run = self.runs[run_id]
+            run["polls"] += 1
+            status = run["final"] if run["polls"] >= self.polls_until_done else "RUNNING"
+            return {"id": run_id, "status": status, "defaultDatasetId": run["dataset"]}
+
+
+@pytest.fixture
+def fake_apify(monkeypatch):
+    fake = FakeApify()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            fake.requests.append(("POST", self.path, self.headers.get("Authorization")))
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+            if re.fullmatch(r"/v2/acts/[^/]+/runs", urlparse(self.path).path):
+                return self._send(201, {"data": fake.start_run(body)})
+            self._send(404, {"error": "not found"})
+
+        def do_GET(self):
+            fake.requests.append(("GET", self.path, self.headers.get("Authorization")))
+            url = urlparse(self.path)
+            run = re.fullmatch(r"/v2/actor-runs/([^/]+)", url.path)
+            if run:
+                return self._send(200, {"data": fake.get_run(run.group(1))})
+            items = re.fullmatch(r"/v2/datasets/([^/]+)/items", url.path)
+            if items:
+                query = parse_qs(url.query)
+                offset, limit = int(query["offset"][0]), int(query["limit"][0])
+                return self._send(200, fake.datasets[items.group(1)][offset:offset + limit])
+            self._send(404, {"error": "not found"})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(config, "APIFY_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(config, "APIFY_TOKEN", "test-token")
+    monkeypatch.setattr(config, "APIFY_ACTOR_ID", "test~actor")
+    monkeypatch.setattr(config, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(config, "APIFY_POLL_INITIAL_SECONDS", 0.01)
+    monkeypatch.setattr(config, "APIFY_POLL_MAX_SECONDS", 0.02)
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_path_uses_async_runs(fake_apify, monkeypatch):
+    monkeypatch.setattr(config, "APIFY_ASYNC_RUNS", True)
+    transcript, metadata = get_transcript_from_youtube("https://youtu.be/abc123DEF45", "en")
+
+    assert transcript.splitlines()[0] == "[00:00.00–00:02.50] Grace builds on nature."
+    assert metadata["video_id"] == "run1"
+    methods = [(method, re.sub(r"\?.*", "", path)) for method, path, _ in fake_apify.requests]
+    assert methods[0] == ("POST", "/v2/acts/test~actor/runs")
+    assert methods.count(("GET", "/v2/actor-runs/run1")) == 2
+    assert methods[-1] == ("GET", "/v2/datasets/ds_run1/items")
+    assert {auth for _, _, auth in fake_apify.requests} == {"Bearer test-token"}
+
+
+def test_failed_run_raises_runtime_error(fake_apify, monkeypatch):
+    monkeypatch.setattr(config, "APIFY_ASYNC_RUNS", True)
+    with pytest.raises(RuntimeError, match="FAILED"):
+        get_transcript_from_youtube("https://youtu.be/failfailfai", "en")
+
+
+def test_dataset_is_paged(fake_apify):
+    fake_apify.add_dataset("big", [{"n": i} for i in range(250)])
+
+    async def collect():
+        async with ApifyAsyncClient() as client:
+            return [item async for item in client.iter_dataset_items("big", page_size=100)]
+
+    items = asyncio.run(collect())
+    assert [item["n"] for item in items] == list(range(250))
+    pages = [path for method, path, _ in fake_apify.requests if "/datasets/big/" in path]
+    assert len(pages) == 3
+
+
+def test_batch_fetch_keeps_order_and_errors(fake_apify):
+    from src.apify_async import get_transcripts_from_youtube_batch
+
+    urls = ["https://youtu.be/oneoneone01", "https://youtu.be/failfailfai", "https://youtu.be/threethree3"]
+    results = get_transcripts_from_youtube_batch(urls, "en", max_concurrency=2)
+
+    assert isinstance(results[1], RuntimeError)
+    assert results[0][0].endswith("This is https://www.youtube.com/watch?v=oneoneone01.")
+    assert results[2][0].endswith("This is https://www.youtube.com/watch?v=threethree3.")
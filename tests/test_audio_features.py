@@ -0,0 +1,30 @@
+"""Mapping the audio intensity timeline onto transcript segments."""
+
+from src.audio_features import IntensityTimeline, chunk_intensity, score_segments
+
+TIMELINE = IntensityTimeline(5.0, [0.1, 0.9, 0.5])
+
+
+def test_score_segments_averages_overlapping_windows():
+    segments = [
+        {"start": 0.0, "end": 4.0, "text": "a"},
+        {"start": 4.0, "end": 6.0, "text": "b"},  # Straddles windows 0 and 1
+        {"start": 12.0, "end": 30.0, "text": "c"},  # Runs past the end of the timeline
+        {"start": 40.0, "end": 45.0, "text": "d"},  # Entirely past the end
+    ]
+
+    scored = score_segments(segments, TIMELINE)
+
+    assert [s["intensity"] for s in scored] == [0.1, 0.5, 0.5, 0.0]
+    assert [s["text"] for s in scored] == ["a", "b", "c", "d"]
+    assert "intensity" not in segments[0]
+
+
+def test_chunk_intensity_uses_hottest_quarter():
+    flat = [{"start": 0.0, "end": 4.0, "text": "flat"}] * 7
+    hot = [{"start": 5.0, "end": 9.0, "text": "hot"}]
+
+    assert chunk_intensity(flat + hot, TIMELINE) == (0.9 + 0.1) / 2
+    assert chunk_intensity(flat, TIMELINE) == 0.1
+    assert chunk_intensity([], TIMELINE) == 0.0
+    assert chunk_intensity(flat, IntensityTimeline(5.0, [])) == 0.0
@@ -0,0 +1,139 @@
+"""Tests for PCM decoding and the frame-level voice activity detector."""
+
+import tracemalloc
+
+import numpy as np
+
+from src import audio_preprocess, config
+from src.audio_preprocess import SAMPLE_RATE, detect_speech_frames
+from tests.conftest import install_fake_tools
+
+
+def _tone_and_silence(seconds: int, period: int = 4) -> np.ndarray:
+    """Alternate `period`-second stretches of a voiced tone and faint noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * SAMPLE_RATE, dtype=np.float32) / SAMPLE_RATE
+    tone = 0.3 * np.sin(2 * np.pi * 220.0 * t) + 0.1 * np.sin(2 * np.pi * 660.0 * t)
+    noise = rng.normal(0.0, 1e-4, size=t.shape).astype(np.float32)
+    on = (t // period).astype(np.int64) % 2 == 0
+    return np.where(on, tone, noise).astype(np.float32)
+
+
+def _unblocked(samples: np.ndarray) -> np.ndarray:
+    frame_len = SAMPLE_RATE * config.VAD_FRAME_MS // 1000
+    n_frames = len(samples) // frame_len
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float64)
+    energy_db = 10.0 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    noise_floor = np.percentile(energy_db, 10)
+    loud = (energy_db > noise_floor + config.VAD_THRESHOLD_DB) & (energy_db > config.VAD_MIN_ENERGY_DB)
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame_len), axis=1)) + 1e-10
+    flatness = np.exp(np.mean(np.log(spectrum), axis=1)) / np.mean(spectrum, axis=1)
+    return loud & (flatness < config.VAD_MAX_FLATNESS)
+
+
+def test_blocked_vad_matches_whole_array_computation(monkeypatch):
+    samples = _tone_and_silence(60)
+    monkeypatch.setattr(audio_preprocess, "FFT_BLOCK_FRAMES", 97)  # Force uneven block edges
+
+    speech = detect_speech_frames(samples)
+
+    assert np.array_equal(speech, _unblocked(samples))
+    assert 0.3 < speech.mean() < 0.7
+
+
+def _peak_bytes(samples: np.ndarray) -> int:
+    tracemalloc.start()
+    try:
+        detect_speech_frames(samples)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_long_signal_keeps_peak_memory_bounded():
+    frame_len = SAMPLE_RATE * config.VAD_FRAME_MS // 1000
+    block_bytes = audio_preprocess.FFT_BLOCK_FRAMES * (frame_len // 2 + 1) * 16  # complex128 rfft
+
+    short_peak = _peak_bytes(_tone_and_silence(10 * 60))
+    long_peak = _peak_bytes(_tone_and_silence(40 * 60))  # 40 minutes, ~150 MB of float32 PCM
+
+    # A whole-array FFT grows with duration; blocking keeps the working set to
+    # a few FFT blocks however long the recording is.
+    assert long_peak < 1.1 * short_peak
+    assert long_peak < 4 * block_bytes
+
+
+FAKE_FFMPEG = """#!{python}
+import os, sys
+from array import array
+if os.environ.get("FAKE_FFMPEG_FAIL"):
+    sys.stderr.write("Invalid data found when processing input\\n")
+    sys.exit(1)
+n = int(os.environ["FAKE_PCM_SAMPLES"])
+pcm = array("h", ((i % 65536) - 32768 for i in range(n))).tobytes()
+for start in range(0, len(pcm), 777):  # Odd-sized writes split samples across reads
+    sys.stdout.buffer.write(pcm[start:start + 777])
+    sys.stdout.buffer.flush()
+"""
+
+FAKE_FFPROBE = """#!{python}
+import os
+print(os.environ["FAKE_DURATION"])
+"""
+
+
+def _install_fake_tools(tmp_path, monkeypatch, samples, duration=None):
+    """Stand-in ffmpeg (and ffprobe when duration is given) as the only tools on PATH."""
+    tools = {"ffmpeg": FAKE_FFMPEG}
+    if duration is not None:
+        tools["ffprobe"] = FAKE_FFPROBE
+        monkeypatch.setenv("FAKE_DURATION", str(duration))
+    install_fake_tools(tmp_path, monkeypatch, **tools)
+    monkeypatch.setenv("FAKE_PCM_SAMPLES", str(samples))
+
+
+def _expected_pcm(n: int) -> np.ndarray:
+    return ((np.arange(n) % 65536) - 32768).astype(np.int16).astype(np.float32) / 32768.0
+
+
+def test_streamed_decode_matches_ffmpeg_output(tmp_path, monkeypatch):
+    _install_fake_tools(tmp_path, monkeypatch, samples=3 * SAMPLE_RATE + 7, duration=3.0)
+    monkeypatch.setattr(audio_preprocess, "PCM_READ_BLOCK_BYTES", 1000)
+
+    samples = audio_preprocess.decode_to_pcm(str(tmp_path / "talk.mp4"))
+
+    assert samples.dtype == np.float32
+    assert np.array_equal(samples, _expected_pcm(3 * SAMPLE_RATE + 7))
+
+
+def test_decode_grows_the_buffer_when_duration_is_unknown(tmp_path, monkeypatch):
+    _install_fake_tools(tmp_path, monkeypatch, samples=5 * SAMPLE_RATE)
+    monkeypatch.setattr(audio_preprocess, "PCM_UNKNOWN_DURATION_SECONDS", 1)
+
+    samples = audio_preprocess.decode_to_pcm(str(tmp_path / "talk.mp4"))
+
+    assert np.array_equal(samples, _expected_pcm(5 * SAMPLE_RATE))
+
+
+def test_failed_decode_returns_none_and_reports_stderr(tmp_path, monkeypatch, capsys):
+    _install_fake_tools(tmp_path, monkeypatch, samples=SAMPLE_RATE, duration=1.0)
+    monkeypatch.setenv("FAKE_FFMPEG_FAIL", "1")
+
+    assert audio_preprocess.decode_to_pcm(str(tmp_path / "talk.mp4")) is None
+    assert "Invalid data found" in capsys.readouterr().out
+
+
+def test_decode_peak_memory_is_about_one_copy_of_the_samples(tmp_path, monkeypatch):
+    n = 120 * SAMPLE_RATE  # Two minutes: 7.7 MB of float32
+    _install_fake_tools(tmp_path, monkeypatch, samples=n, duration=120.0)
+
+    tracemalloc.start()
+    try:
+        samples = audio_preprocess.decode_to_pcm(str(tmp_path / "talk.mp4"))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # The old path held the s16le bytes plus two float32 copies (~2.5x)
+    assert len(samples) == n
+    assert peak < samples.nbytes + 2 * audio_preprocess.PCM_READ_BLOCK_BYTES + SAMPLE_RATE * 4
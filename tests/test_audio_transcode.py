@@ -0,0 +1,110 @@
+"""ffmpeg speech transcoding and its fallback to the original upload."""
+
+import io
+
+import pytest
+
+from src import audio_utils, config
+from src.audio_transcode import TRANSCODE_CODECS, transcode_for_upload
+from tests.conftest import install_fake_tools
+
+# Writes FAKE_ENCODED_BYTES to the output path (the last argument), or fails
+FAKE_FFMPEG = """#!{python}
+import os, sys
+if os.environ.get("FAKE_FFMPEG_FAIL"):
+    sys.stderr.write("Unknown encoder 'libopus'\\n")
+    sys.exit(1)
+with open(sys.argv[-1], "wb") as f:
+    f.write(b"\\0" * int(os.environ["FAKE_ENCODED_BYTES"]))
+"""
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "talk.mp4"
+    path.write_bytes(b"\1" * 10_000)
+    return str(path)
+
+
+def _fake_ffmpeg(tmp_path, monkeypatch, encoded_bytes=1_000, fail=False):
+    install_fake_tools(tmp_path, monkeypatch, ffmpeg=FAKE_FFMPEG)
+    monkeypatch.setenv("FAKE_ENCODED_BYTES", str(encoded_bytes))
+    if fail:
+        monkeypatch.setenv("FAKE_FFMPEG_FAIL", "1")
+
+
+def test_smaller_encode_reports_bytes_saved(tmp_path, monkeypatch, source):
+    _fake_ffmpeg(tmp_path, monkeypatch, encoded_bytes=1_500)
+
+    path, stats = transcode_for_upload(source, str(tmp_path), codec="mp3")
+
+    assert path == str(tmp_path / "speech_mp3.mp3")
+    assert stats == {"original_bytes": 10_000, "encoded_bytes": 1_500, "bytes_saved": 8_500}
+
+
+def test_missing_ffmpeg_returns_none(tmp_path, monkeypatch, source):
+    install_fake_tools(tmp_path, monkeypatch)
+    assert transcode_for_upload(source, str(tmp_path)) is None
+
+
+def test_failed_encode_returns_none(tmp_path, monkeypatch, source, capsys):
+    _fake_ffmpeg(tmp_path, monkeypatch, fail=True)
+
+    assert transcode_for_upload(source, str(tmp_path)) is None
+    assert "Unknown encoder" in capsys.readouterr().out
+
+
+def test_encode_that_is_not_smaller_keeps_the_original(tmp_path, monkeypatch, source):
+    _fake_ffmpeg(tmp_path, monkeypatch, encoded_bytes=10_000)
+    assert transcode_for_upload(source, str(tmp_path)) is None
+
+
+def test_unknown_codec_is_rejected(tmp_path, monkeypatch, source):
+    _fake_ffmpeg(tmp_path, monkeypatch)
+    with pytest.raises(ValueError):
+        transcode_for_upload(source, str(tmp_path), codec="flac")
+
+
+class _RecordingUploadBackend(audio_utils.OpenAIWhisperBackend):
+    def __init__(self):
+        self.uploads = []
+
+    def transcribe(self, path, samples=None):
+        with open(path, "rb") as f:
+            self.uploads.append((path.rsplit("/", 1)[-1], len(f.read())))
+        return [{"start": 0.0, "end": 1.0, "text": "Grace builds on nature."}], 1.0
+
+
+def _upload():
+    upload = io.BytesIO(b"\1" * 10_000)
+    upload.name = "talk.mp4"
+    return upload
+
+
+@pytest.mark.parametrize("ffmpeg", ["missing", "fails", "larger"])
+def test_transcribe_media_uploads_the_original_when_transcoding_gives_nothing(tmp_path, monkeypatch, ffmpeg):
+    monkeypatch.setattr(config, "INTENSITY_SCORING_ENABLED", False)
+    if ffmpeg == "missing":
+        install_fake_tools(tmp_path, monkeypatch)
+    else:
+        _fake_ffmpeg(tmp_path, monkeypatch, encoded_bytes=20_000, fail=ffmpeg == "fails")
+    backend = _RecordingUploadBackend()
+
+    _, stats = audio_utils.transcribe_media(_upload(), trim_silence=False, transcode=True,
+                                            use_cache=False, backend=backend)
+
+    assert backend.uploads == [("upload.mp4", 10_000)]
+    assert (stats["upload_bytes"], stats["bytes_saved"]) == (10_000, 0)
+
+
+def test_transcribe_media_uploads_the_encode_and_counts_savings(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INTENSITY_SCORING_ENABLED", False)
+    _fake_ffmpeg(tmp_path, monkeypatch, encoded_bytes=2_000)
+    backend = _RecordingUploadBackend()
+
+    _, stats = audio_utils.transcribe_media(_upload(), trim_silence=False, transcode=True,
+                                            use_cache=False, backend=backend)
+
+    extension = TRANSCODE_CODECS[config.TRANSCODE_CODEC][0]
+    assert backend.uploads == [(f"speech_{config.TRANSCODE_CODEC}{extension}", 2_000)]
+    assert (stats["original_bytes"], stats["upload_bytes"], stats["bytes_saved"]) == (10_000, 2_000, 8_000)
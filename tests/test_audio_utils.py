@@ -0,0 +1,124 @@
+"""Transcription backends and the decode-once path of transcribe_media."""
+
+import io
+from dataclasses import replace
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src import audio_preprocess, audio_utils, config
+from src.audio_preprocess import SAMPLE_RATE, write_wav
+
+
+class _FakeModel:
+    def __init__(self):
+        self.inputs = []
+
+    def transcribe(self, samples, beam_size=None):
+        self.inputs.append(samples)
+        return [SimpleNamespace(start=0.0, end=1.0, text=" Grace builds on nature.")], None
+
+
+class _FakeLocalBackend(audio_utils.LocalWhisperBackend):
+    def __init__(self):
+        super().__init__(workers=1)
+        self.model = _FakeModel()
+
+    def _model(self):
+        return self.model
+
+
+def _wav_upload(tmp_path, seconds_on=3, seconds_off=3):
+    t = np.arange(seconds_on * SAMPLE_RATE, dtype=np.float32) / SAMPLE_RATE
+    tone = (0.3 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32)
+    silence = np.zeros(seconds_off * SAMPLE_RATE, dtype=np.float32)
+    path = str(tmp_path / "talk.wav")
+    write_wav(np.concatenate([tone, silence, tone]), path)
+    with open(path, "rb") as f:
+        upload = io.BytesIO(f.read())
+    upload.name = "talk.wav"
+    return upload
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        audio_utils.TranscriptionBackend()
+
+    class NoTranscribe(audio_utils.TranscriptionBackend):
+        def cache_model_id(self):
+            return "x"
+
+    with pytest.raises(TypeError):
+        NoTranscribe()
+
+
+@pytest.mark.parametrize("trim_silence", [False, True])
+def test_local_backend_reuses_decoded_pcm(tmp_path, monkeypatch, trim_silence):
+    monkeypatch.setattr(config, "INTENSITY_SCORING_ENABLED", False)
+    decode_calls = []
+    real_decode = audio_preprocess.decode_to_pcm
+
+    def counting_decode(path):
+        decode_calls.append(path)
+        return real_decode(path)
+
+    monkeypatch.setattr(audio_preprocess, "decode_to_pcm", counting_decode)
+    backend = _FakeLocalBackend()
+
+    transcript, stats = audio_utils.transcribe_media(
+        _wav_upload(tmp_path), trim_silence=trim_silence, use_cache=False, backend=backend
+    )
+
+    assert len(decode_calls) == 1
+    assert "Grace builds on nature." in transcript
+    (samples,) = backend.model.inputs
+    if trim_silence:
+        assert stats["removed_seconds"] > 0
+        assert len(samples) < 9 * SAMPLE_RATE
+    else:
+        assert len(samples) == 9 * SAMPLE_RATE
+
+
+def test_intensity_is_scored_only_when_it_can_skip_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INTENSITY_SCORING_ENABLED", False)
+    run_config = config.default_run_config()
+
+    _, stats = audio_utils.transcribe_media(
+        _wav_upload(tmp_path), trim_silence=False, use_cache=False,
+        backend=_FakeLocalBackend(), run_config=run_config,
+    )
+    assert "intensity" not in stats
+
+    _, stats = audio_utils.transcribe_media(
+        _wav_upload(tmp_path), trim_silence=False, use_cache=False,
+        backend=_FakeLocalBackend(), run_config=replace(run_config, intensity_skip_below=0.3),
+    )
+    assert stats["intensity"]["window_seconds"] == config.INTENSITY_WINDOW_SECONDS
+    assert stats["intensity"]["scores"]
+
+
+def test_cache_hit_without_intensity_scores_it_when_needed(tmp_path, tmp_cache, monkeypatch):
+    monkeypatch.setattr(config, "INTENSITY_SCORING_ENABLED", False)
+    decode_calls = []
+    real_decode = audio_preprocess.decode_to_pcm
+    monkeypatch.setattr(audio_preprocess, "decode_to_pcm", lambda path: decode_calls.append(path) or real_decode(path))
+    run_config = replace(config.default_run_config(), cache_enabled=True)
+    skipping = replace(run_config, intensity_skip_below=0.3)
+    backend = _FakeLocalBackend()
+
+    def transcribe(rc):
+        return audio_utils.transcribe_media(_wav_upload(tmp_path), trim_silence=False, backend=backend, run_config=rc)
+
+    _, first = transcribe(run_config)
+    assert "intensity" not in first
+
+    _, hit = transcribe(skipping)
+    assert hit["cache_hit"] and hit["intensity"]["scores"]
+    assert len(backend.model.inputs) == 1  # Scored from the media, not transcribed again
+
+    # The entry now carries the timeline, so the next hit needs no decode
+    decodes = len(decode_calls)
+    _, again = transcribe(skipping)
+    assert again["cache_hit"] and again["intensity"] == hit["intensity"]
+    assert len(decode_calls) == decodes
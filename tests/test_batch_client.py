@@ -0,0 +1,175 @@
+"""Batch API execution against a local fake of the files/batches endpoints."""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import batch_client, config, http_clients
+from src.batch_client import BatchRequest, run_chat_batch
+from src.llm_client import _process_chunks_batch
+
+
+class FakeBatchAPI:
+    """In-memory OpenAI files/batches: a batch completes after a few status polls."""
+
+    def __init__(self, polls_until_done=2):
+        self.polls_until_done = polls_until_done
+        self.files = {}
+        self.batches = {}
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def reply_for(self, body):
+        """Assistant reply for one request, or None to fail it."""
+        user = body["messages"][1]["content"]
+        if "FAIL" in user:
+            return None
+        match = re.search(r"^(L\d+) ", user, re.M)
+        if match:
+            return json.dumps({"moments": [{"lines": f"{match.group(1)}-L2", "viral_trigger": "Contrast"}]})
+        return f"echo: {user}"
+
+    def _new_id(self, prefix):
+        return f"{prefix}-{len(self.files) + len(self.batches) + 1}"
+
+    def upload(self, raw):
+        content = re.search(rb"filename=[^\r]*\r\n(?:[^\r]+\r\n)*\r\n(.*?)\r\n--", raw, re.S).group(1).decode()
+        with self.lock:
+            file_id = self._new_id("file")
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": 0,
+                "filename": "input.jsonl", "purpose": "batch", "status": "processed"}
+
+    def create_batch(self, body):
+        output, errors = [], []
+        for line in self.files[body["input_file_id"]].splitlines():
+            request = json.loads(line)
+            content = self.reply_for(request["body"])
+            if content is None:
+                errors.append({"custom_id": request["custom_id"], "error": None,
+                               "response": {"status_code": 500, "body": {"error": {"message": "boom"}}}})
+            else:
+                output.append({"custom_id": request["custom_id"], "error": None, "response": {
+                    "status_code": 200, "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}}})
+        with self.lock:
+            self.created += 1
+            batch_id = self._new_id("batch")
+            output_id, error_id = f"{batch_id}-out", f"{batch_id}-err"
+            self.files[output_id] = "\n".join(json.dumps(r) for r in output)
+            self.files[error_id] = "\n".join(json.dumps(r) for r in errors)
+            self.batches[batch_id] = {"polls": 0, "output": output_id, "errors": error_id,
+                                      "endpoint": body["endpoint"], "input": body["input_file_id"]}
+        return self._batch_json(batch_id, "validating")
+
+    def get_batch(self, batch_id):
+        with self.lock:
+            batch = self.batches[batch_id]
+            batch["polls"] += 1
+            done = batch["polls"] >= self.polls_until_done
+        return self._batch_json(batch_id, "completed" if done else "in_progress")
+
+    def _batch_json(self, batch_id, status):
+        batch = self.batches[batch_id]
+        done = status == "completed"
+        return {"id": batch_id, "object": "batch", "endpoint": batch["endpoint"], "input_file_id": batch["input"],
+                "completion_window": "24h", "created_at": 0, "status": status,
+                "output_file_id": batch["output"] if done else None, "error_file_id": batch["errors"] if done else None}
+
+
+@pytest.fixture
+def fake_batches(tmp_cache, monkeypatch):
+    fake = FakeBatchAPI()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, data, content_type="application/json"):
+            self.send_response(200)
+            self.send_header("content-type", content_type)
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get("content-length", 0)))
+            if self.path.endswith("/files"):
+                result = fake.upload(raw)
+            else:
+                result = fake.create_batch(json.loads(raw))
+            self._send(json.dumps(result).encode())
+
+        def do_GET(self):
+            content = re.search(r"/files/([\w-]+)/content$", self.path)
+            if content:
+                self._send(fake.files[content.group(1)].encode(), "application/octet-stream")
+            else:
+                self._send(json.dumps(fake.get_batch(self.path.rsplit("/", 1)[-1])).encode())
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(config, "BATCH_POLL_INITIAL_SECONDS", 0.01)
+    monkeypatch.setattr(config, "BATCH_POLL_MAX_SECONDS", 0.02)
+    monkeypatch.setattr(http_clients, "_registry", http_clients.ClientRegistry())
+    yield fake
+    http_clients.get_registry().close()
+    server.shutdown()
+
+
+def _requests():
+    return [
+        BatchRequest("a", "system", "first question", "gpt-test"),
+        BatchRequest("b", "system", "FAIL this one", "gpt-test"),
+        BatchRequest("c", "system", "third question", "gpt-test"),
+    ]
+
+
+def test_replies_map_back_by_custom_id_and_failures_are_left_out(fake_batches):
+    replies = run_chat_batch(_requests())
+
+    assert replies == {"a": "echo: first question", "c": "echo: third question"}
+    assert fake_batches.created == 1
+    assert batch_client.load_pending_batch(batch_client.batch_fingerprint(_requests())) is None
+
+
+def test_rerun_after_timeout_resumes_the_submitted_batch(fake_batches):
+    fake_batches.polls_until_done = 50
+    with pytest.raises(RuntimeError, match="resume"):
+        run_chat_batch(_requests(), timeout=0.05)
+    fingerprint = batch_client.batch_fingerprint(_requests())
+    assert batch_client.load_pending_batch(fingerprint) is not None
+
+    fake_batches.polls_until_done = 0
+    replies = run_chat_batch(_requests())
+
+    assert fake_batches.created == 1
+    assert set(replies) == {"a", "c"}
+    assert batch_client.load_pending_batch(fingerprint) is None
+
+
+def test_different_requests_do_not_resume_another_jobs_batch(fake_batches):
+    fake_batches.polls_until_done = 50
+    with pytest.raises(RuntimeError):
+        run_chat_batch(_requests(), timeout=0.05)
+
+    fake_batches.polls_until_done = 0
+    run_chat_batch([BatchRequest("z", "system", "another job", "gpt-test")])
+    assert fake_batches.created == 2
+
+
+def test_chunk_extraction_in_batch_mode(fake_batches):
+    chunks = [
+        "[00:00.00–00:05.00] Grace does not destroy nature.\n[00:05.00–00:09.00] It perfects it.",
+        "[00:10.00–00:14.00] FAIL\n[00:14.00–00:18.00] Nothing here.",
+    ]
+    run_config = config.default_run_config()
+
+    moments = _process_chunks_batch(chunks, [1, 2], run_config)
+
+    assert [m["timestamps"] for m in moments] == ["00:00.00-00:09.00"]
+    assert moments[0]["quote"] == "Grace does not destroy nature. It perfects it."
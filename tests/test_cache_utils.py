@@ -0,0 +1,122 @@
+"""Moment cache namespaces, legacy migration and garbage collection."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import replace
+
+from src import cache_utils, config
+
+MOMENTS = [{"quote": "grace builds on nature", "timestamps": "00:01.00–00:10.00"}]
+
+
+def _run_config(cache_dir):
+    return replace(config.default_run_config(), cache_dir=cache_dir)
+
+
+def _age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_lookup_does_not_create_directories(tmp_cache):
+    run_config = _run_config(tmp_cache)
+    assert cache_utils.get_cached_moments("transcript", run_config=run_config) is None
+    assert cache_utils.get_cached_transcription("0" * 64, "whisper-1", run_config=run_config) is None
+    assert not os.path.exists(tmp_cache)
+
+
+def test_save_then_hit(tmp_cache):
+    run_config = _run_config(tmp_cache)
+    cache_utils.save_moments_to_cache(MOMENTS, "transcript", run_config=run_config)
+    assert cache_utils.get_cached_moments("transcript", run_config=run_config) == MOMENTS
+
+
+def test_legacy_migration_runs_once_and_only_on_legacy_files(tmp_cache):
+    os.makedirs(tmp_cache)
+    legacy_key = "transcript_" + hashlib.md5(b"old").hexdigest()
+    files = {
+        f"{legacy_key}.json": {"cache_key": legacy_key, "moments_count": 0, "moments": []},
+        "video_abc_en.json": {"cache_key": "video_abc_en", "moments": []},
+        "video_other_en.json": {"something": "else"},  # Matches the name, not the content
+        "notes.json": {"mine": True},
+    }
+    for name, data in files.items():
+        with open(os.path.join(tmp_cache, name), "w") as f:
+            json.dump(data, f)
+
+    assert cache_utils.gc_cache_namespaces(cache_dir=tmp_cache) == 2
+    remaining = set(os.listdir(tmp_cache))
+    assert remaining == {"video_other_en.json", "notes.json", cache_utils.LAYOUT_MARKER}
+
+    # A legacy-looking file written later is left alone
+    with open(os.path.join(tmp_cache, "video_new_en.json"), "w") as f:
+        json.dump({"cache_key": "video_new_en", "moments": []}, f)
+    assert cache_utils.gc_cache_namespaces(cache_dir=tmp_cache) == 0
+    assert "video_new_en.json" in os.listdir(tmp_cache)
+
+
+def test_gc_removes_only_stale_inactive_namespaces(tmp_cache):
+    for name in ("ns_stale", "ns_active", "ns_fresh"):
+        cache_utils._touch_namespace(name, tmp_cache, create=True)
+    for name in ("ns_stale", "ns_active"):
+        _age(os.path.join(tmp_cache, name, cache_utils.NAMESPACE_MARKER), 3600)
+    os.makedirs(os.path.join(tmp_cache, "ns_old" + cache_utils.GC_TOMBSTONE + "1.2"))
+
+    assert cache_utils.gc_cache_namespaces("ns_active", tmp_cache, max_age_seconds=60) == 1
+    assert sorted(e for e in os.listdir(tmp_cache) if e.startswith("ns_")) == ["ns_active", "ns_fresh"]
+
+
+def test_concurrent_saves_survive_gc(tmp_cache, capsys):
+    run_config = _run_config(tmp_cache)
+    namespace = cache_utils.cache_namespace("prompt", run_config)
+    stop = threading.Event()
+
+    def sweep():
+        while not stop.is_set():
+            cache_utils.gc_cache_namespaces(cache_dir=tmp_cache, max_age_seconds=0.02)
+
+    sweeper = threading.Thread(target=sweep)
+    sweeper.start()
+    try:
+        for i in range(200):
+            if i % 10 == 0:
+                time.sleep(0.03)  # Idle long enough for the namespace to go stale
+            cache_utils.save_moments_to_cache(MOMENTS, f"transcript {i}", run_config=run_config, namespace=namespace)
+    finally:
+        stop.set()
+        sweeper.join()
+
+    assert "Error saving to cache" not in capsys.readouterr().out
+    leftovers = [e for e in os.listdir(tmp_cache) if cache_utils.GC_TOMBSTONE in e]
+    assert leftovers == []
+
+
+def test_transcription_cache_follows_run_config(tmp_cache, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_ENABLED", True)
+    disabled = replace(_run_config(tmp_cache), cache_enabled=False)
+    cache_utils.save_transcription_to_cache("[00:00.00–00:01.00] hi", "a" * 64, "whisper-1", run_config=disabled)
+    assert not os.path.exists(tmp_cache)
+
+    enabled = _run_config(tmp_cache)
+    cache_utils.save_transcription_to_cache("[00:00.00–00:01.00] hi", "a" * 64, "whisper-1", run_config=enabled)
+    assert cache_utils.get_cached_transcription("a" * 64, "whisper-1", run_config=disabled) is None
+    cached = cache_utils.get_cached_transcription("a" * 64, "whisper-1", run_config=enabled)
+    assert cached["transcript_text"] == "[00:00.00–00:01.00] hi"
+
+
+def test_gc_transcriptions_drops_stale_then_least_recently_used(tmp_cache):
+    run_config = _run_config(tmp_cache)
+    for i, age in enumerate((10, 20, 30, 3600)):
+        cache_utils.save_transcription_to_cache("x" * 1000, f"{i}" * 64, "whisper-1", run_config=run_config)
+        key = cache_utils.transcription_cache_key(f"{i}" * 64, "whisper-1")
+        _age(cache_utils._get_transcription_path(key, tmp_cache), age)
+    size = os.path.getsize(cache_utils._get_transcription_path(key, tmp_cache))
+
+    # Entry 3 is past the TTL; of the rest only the two most recent fit the cap
+    assert cache_utils.gc_transcriptions(tmp_cache, max_age_seconds=600, max_bytes=2 * size) == 2
+    remaining = [f"{i}" * 64 for i in range(4)
+                 if cache_utils.get_cached_transcription(f"{i}" * 64, "whisper-1", run_config=run_config)]
+    assert remaining == ["0" * 64, "1" * 64]
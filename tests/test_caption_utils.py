@@ -0,0 +1,90 @@
+"""Caption parsing: rolling VTT dedupe and auto-caption detection."""
+
+import json
+
+import pytest
+
+from src.caption_utils import iter_vtt_segments, json3_is_auto_generated, parse_caption_file
+
+ROLLING_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.000 --> 00:00:02.000
+we are going
+
+00:00:02.000 --> 00:00:02.010
+we are going
+
+00:00:02.010 --> 00:00:04.000
+we are going
+to the store today
+
+00:00:04.000 --> 00:00:06.000
+to the store today
+because grace builds
+
+00:00:06.000 --> 00:00:08.000
+grace builds on nature
+"""
+
+EDITED_SRT = """1
+00:00:00,000 --> 00:00:03,000
+The Church does not invent the sacraments.
+
+2
+00:00:03,000 --> 00:00:06,000
+She receives them.
+
+3
+00:00:06,500 --> 00:00:09,000
+And she hands them on.
+"""
+
+
+def test_vtt_rolling_repeats_keep_only_new_words():
+    stats = {}
+    segments = list(iter_vtt_segments(ROLLING_VTT.splitlines(True)[4:], stats))
+    assert [s["text"] for s in segments] == [
+        "we are going", "to the store today", "because grace builds", "on nature",
+    ]
+    # The exact repeat only extended the first cue
+    assert segments[0]["end"] == pytest.approx(2.01)
+    assert segments[1]["start"] == pytest.approx(2.01)
+    assert stats == {"cues": 5, "rolling_repeats": 4}
+
+
+def test_vtt_single_word_coincidence_is_not_trimmed():
+    vtt = "00:00:00.000 --> 00:00:02.000\nlook at the\n\n00:00:02.000 --> 00:00:04.000\nthe altar rail\n"
+    assert [s["text"] for s in iter_vtt_segments(vtt.splitlines(True))] == ["look at the", "the altar rail"]
+
+
+def test_rolling_vtt_is_detected_and_merged():
+    text, metadata = parse_caption_file(ROLLING_VTT, "talk.vtt")
+    assert metadata["is_auto_generated"] is True
+    assert "we are going to the store today" in text.lower()
+    assert text.lower().count("we are going") == 1
+
+
+def test_edited_srt_is_not_auto_generated():
+    text, metadata = parse_caption_file(EDITED_SRT, "talk.srt")
+    assert metadata["is_auto_generated"] is False
+    assert len(text.splitlines()) == 3
+
+
+def test_user_choice_overrides_detection():
+    _, metadata = parse_caption_file(EDITED_SRT, "talk.srt", auto_generated=True)
+    assert metadata["is_auto_generated"] is True
+    _, metadata = parse_caption_file(ROLLING_VTT, "talk.vtt", auto_generated=False)
+    assert metadata["is_auto_generated"] is False
+
+
+def test_json3_asr_markers():
+    auto = {"events": [
+        {"tStartMs": 0, "dDurationMs": 2000, "wWinId": 1, "segs": [{"utf8": "we", "acAsrConf": 0}, {"utf8": " are", "tOffsetMs": 300}]},
+        {"tStartMs": 1900, "dDurationMs": 100, "wWinId": 1, "aAppend": 1, "segs": [{"utf8": "\n"}]},
+    ]}
+    manual = {"events": [{"tStartMs": 0, "dDurationMs": 2000, "segs": [{"utf8": "We are here."}]}]}
+    assert json3_is_auto_generated(auto) and not json3_is_auto_generated(manual)
+    assert parse_caption_file(json.dumps(auto), "a.json3")[1]["is_auto_generated"] is True
+    assert parse_caption_file(json.dumps(manual), "m.json3")[1]["is_auto_generated"] is False
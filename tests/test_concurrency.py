@@ -0,0 +1,160 @@
+"""AIMD limiter behaviour, the retry path of limiter-gated calls and hedging metrics."""
+
+import threading
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+from src import concurrency, config, llm_client
+from src.concurrency import AdaptiveLimiter, call_with_retries
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def _healthy_round(limiter, latency=1.0):
+    """One reply per slot currently allowed, all under the latency target."""
+    for _ in range(limiter.limit):
+        limiter.acquire()
+        limiter.release(latency=latency)
+
+
+def _throttle(limiter):
+    limiter.acquire()
+    limiter.release(error=RateLimitError())
+
+
+def test_limit_grows_by_about_one_per_healthy_round():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=16, latency_target=10.0)
+
+    limits = []
+    for _ in range(8):
+        _healthy_round(limiter)
+        limits.append(limiter.limit)
+
+    # +1/limit per reply adds just under one slot per round
+    assert limits == [4, 5, 6, 7, 8, 9, 10, 11]
+    assert all(b - a <= 1 for a, b in zip(limits, limits[1:]))
+
+
+def test_slow_replies_do_not_grow_the_limit():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=16, latency_target=10.0)
+    _healthy_round(limiter, latency=30.0)
+    assert limiter.limit == 4
+    assert limiter.metrics()["counts"]["slow"] == 4
+
+
+def test_a_burst_of_throttles_halves_the_limit_once():
+    limiter = AdaptiveLimiter(initial=8, min_limit=1, max_limit=16, latency_target=100.0, decrease_factor=0.5)
+    limiter.acquire()
+    limiter.release(latency=60.0)  # Replies in the next minute belong to the same burst
+
+    for _ in range(5):
+        _throttle(limiter)
+
+    assert limiter.limit == 4
+    assert limiter.metrics()["counts"]["throttle"] == 5
+    assert [h["reason"] for h in limiter.metrics()["history"]][-1] == "throttle"
+
+
+def test_limit_is_clamped_to_min_and_max():
+    limiter = AdaptiveLimiter(initial=4, min_limit=2, max_limit=6, latency_target=10.0)
+    for _ in range(10):
+        _throttle(limiter)  # No latency seen yet, so every throttle is its own signal
+    assert limiter.limit == 2
+
+    for _ in range(20):
+        _healthy_round(limiter)
+    assert limiter.limit == 6
+
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(min_limit=5, max_limit=2)
+
+
+def test_call_with_retries_retries_throttles_only(monkeypatch):
+    monkeypatch.setattr(config, "THROTTLE_RETRY_BASE_SECONDS", 0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RateLimitError()
+        return "ok"
+
+    assert call_with_retries(flaky, retries=2) == "ok"
+    assert len(attempts) == 3
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    attempts.clear()
+    with pytest.raises(ValueError):
+        call_with_retries(broken, retries=2)
+    assert len(attempts) == 1
+
+
+def test_gated_chunk_calls_disable_sdk_retries_and_feed_the_limiter(monkeypatch):
+    monkeypatch.setattr(config, "THROTTLE_RETRY_BASE_SECONDS", 0.0)
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=8)
+    monkeypatch.setattr(concurrency, "_limiter", limiter)
+    seen_retries = []
+    replies = iter([RateLimitError(), "reply"])
+
+    class FakeClient:
+        def with_options(self, max_retries=None):
+            seen_retries.append(max_retries)
+            return self
+
+        @property
+        def chat(self):
+            return SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+        def create(self, **kwargs):
+            reply = next(replies)
+            if isinstance(reply, Exception):
+                raise reply
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    monkeypatch.setattr(llm_client, "get_client", lambda: FakeClient())
+    run_config = config.default_run_config()
+
+    assert llm_client._call_chunk_llm("system", "user", 1, run_config) == "reply"
+    assert seen_retries == [0, 0]
+    assert limiter.metrics()["counts"]["throttle"] == 1
+    assert limiter.limit == 2
+
+
+def test_hedge_losers_are_counted_until_they_return(monkeypatch):
+    tracker = concurrency.LatencyTracker()
+    monkeypatch.setattr(concurrency, "_latency_tracker", tracker)
+    monkeypatch.setattr(config, "HEDGE_MIN_DELAY_SECONDS", 0.0)
+    for _ in range(config.HEDGE_MIN_SAMPLES):
+        tracker.record(0.02)
+    calls = []
+    release_primary = threading.Event()
+
+    def fake_call(system_prompt, user_prompt, model=None, temperature=0.3, max_retries=None):
+        calls.append(user_prompt)
+        if len(calls) == 1:
+            release_primary.wait(5)  # The straggler
+            return "late"
+        return "fast"
+
+    monkeypatch.setattr(llm_client, "call_llm_with_system", fake_call)
+    run_config = replace(config.default_run_config(), adaptive_concurrency=False, hedged_requests=True)
+
+    assert llm_client._call_chunk_llm("system", "user", 1, run_config) == "fast"
+    metrics = tracker.metrics()
+    assert (metrics["hedges"], metrics["hedge_wins"]) == (1, 1)
+    assert (metrics["hedge_losers_running"], metrics["hedge_losers_billed"]) == (1, 1)
+
+    release_primary.set()
+    deadline = time.monotonic() + 5
+    while tracker.metrics()["hedge_losers_running"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert tracker.metrics()["hedge_losers_running"] == 0
+    assert tracker.metrics()["hedge_losers_billed"] == 1
@@ -0,0 +1,94 @@
+"""Cut sheet parsing on hand-written compact and legacy responses.
+
+The fixtures in tests/fixtures/cutsheets mimic model output, including its
+usual quirks; they are not captured replies. Real captures and timings come
+from `python benchmarks/bench_cutsheet_tokens.py --live`.
+"""
+
+import json
+import os
+
+import pytest
+
+from src.cutsheet_fields import CUT_SHEET_FIELDS, create_fallback_cut_sheet, normalize_cut_sheet_fields
+from src.cutsheets import parse_cut_sheet_response
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "cutsheets")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def moments():
+    return json.loads(_fixture("moments.json"))
+
+
+def test_compact_response_merges_by_id(moments):
+    result = parse_cut_sheet_response(_fixture("compact_response.txt"), moments)
+    assert [m["id"] for m in result] == [m["id"] for m in moments]
+    first, second, third = (m["editor_cut_sheet"] for m in result)
+
+    assert set(first) == set(CUT_SHEET_FIELDS)
+    assert first["clip_label"] == "NOBODY_TOLD_YOU"
+    # Persona keys resolve to caption text, whatever their spelling
+    assert first["use_persona_caption"] == moments[0]["persona_captions"]["ex_protestant"]
+    assert second["use_persona_caption"] == moments[1]["persona_captions"]["old_world_catholic"]
+    # Omitted in_point comes from the moment, a tightened out_point is kept
+    assert (second["in_point"], second["out_point"]) == ("11:05.00", "11:37.80")
+    # Comma-separated emphasis string becomes a list
+    assert second["emphasis_words_caps"] == ["SYMBOL", "PRESENCE", "EVERYTHING"]
+    # SILENCE FIX REQUIRED overrides "none"
+    assert second["silence_handling"] != "none"
+    # M3 missing from the response: fallback cut sheet
+    assert third == create_fallback_cut_sheet(moments[2])
+    # Quotes and captions are never taken from the response
+    assert [m["quote"] for m in result] == [m["quote"] for m in moments]
+
+
+def test_legacy_response_matches_compact(moments):
+    compact = parse_cut_sheet_response(_fixture("compact_response.txt"), moments)
+    legacy = parse_cut_sheet_response(_fixture("legacy_response.txt"), moments)
+    for field in ("clip_label", "in_point", "out_point", "emphasis_words_caps", "silence_handling",
+                  "thumbnail_text", "platform_priority", "use_persona_caption"):
+        assert [m["editor_cut_sheet"][field] for m in legacy] == [m["editor_cut_sheet"][field] for m in compact], field
+
+
+def test_compact_response_is_smaller_than_legacy():
+    assert len(_fixture("compact_response.txt")) < 0.75 * len(_fixture("legacy_response.txt"))
+
+
+@pytest.mark.parametrize("fields", [None, "text", [], {}, {"unknown": "x"}, {"clip_label": ""}])
+def test_normalize_rejects_unusable_fields(fields, moments):
+    assert normalize_cut_sheet_fields(fields, moments[0]) is None
+
+
+def test_normalize_keeps_unknown_persona_text(moments):
+    sheet = normalize_cut_sheet_fields({"clip_label": "X", "use_persona_caption": "A custom line"}, moments[0])
+    assert sheet["use_persona_caption"] == "A custom line"
+    assert sheet["in_point"] == "03:12.40" and sheet["out_point"] == "03:41.90"
+
+
+def test_generate_only_fills_moments_without_cut_sheets(monkeypatch, moments):
+    import src.cutsheets as cutsheets
+
+    prompts = []
+
+    def fake_call_llm(prompt, model=None, max_retries=None):
+        prompts.append(prompt)
+        return _fixture("compact_response.txt")
+
+    monkeypatch.setattr(cutsheets, "call_llm", fake_call_llm)
+    fused_sheet = dict(create_fallback_cut_sheet(moments[1]), clip_label="FROM_FUSED_EXTRACTION")
+    moments[1]["editor_cut_sheet"] = fused_sheet
+
+    result = cutsheets.generate_cut_sheets(moments)
+
+    assert len(prompts) == 1 and moments[1]["quote"] not in prompts[0]
+    assert [m["id"] for m in result] == [m["id"] for m in moments]
+    assert result[0]["editor_cut_sheet"]["clip_label"] == "NOBODY_TOLD_YOU"
+    assert result[1]["editor_cut_sheet"] == fused_sheet
+    # The second pending moment was sent as M2
+    assert result[2]["editor_cut_sheet"]["clip_label"] == "NOT_A_SYMBOL"
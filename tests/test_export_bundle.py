@@ -0,0 +1,60 @@
+"""Export bundle ZIP contents and manifest."""
+
+import csv
+import hashlib
+import io
+import json
+import zipfile
+
+import pytest
+
+from src.export_bundle import BUNDLE_FILENAMES, MANIFEST_NAME, build_export_bundle, iter_export_bundle
+from tests.conftest import make_moment
+
+
+def _result_sets():
+    return [
+        {"moments_with_cuts": [make_moment(i) for i in range(5)], "metadata": {"title": "First Talk", "url": "https://youtu.be/a"}},
+        {"moments_with_cuts": [make_moment(i) for i in range(3)], "metadata": {"title": "Second Talk"}},
+    ]
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_bundle_round_trip_matches_manifest(use_processes):
+    data = build_export_bundle(_result_sets(), use_processes=use_processes, max_pdf_workers=2)
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        manifest = json.loads(zf.read(MANIFEST_NAME))
+        assert manifest["errors"] == []
+        assert [v["folder"] for v in manifest["videos"]] == ["01_first_talk", "02_second_talk"]
+        assert [v["clip_count"] for v in manifest["videos"]] == [5, 3]
+
+        for video in manifest["videos"]:
+            assert set(video["files"]) == set(BUNDLE_FILENAMES)
+            for fmt, record in video["files"].items():
+                assert record["path"] == f"{video['folder']}/{BUNDLE_FILENAMES[fmt]}"
+                content = zf.read(record["path"])
+                assert len(content) == record["bytes"]
+                assert hashlib.sha256(content).hexdigest() == record["sha256"]
+
+        first = manifest["videos"][0]["files"]
+        assert zf.read(first["pdf"]["path"]).startswith(b"%PDF")
+        rows = list(csv.DictReader(io.StringIO(zf.read(first["csv"]["path"]).decode("utf-8"))))
+        assert len(rows) == 5
+        saved = json.loads(zf.read(first["json"]["path"]))
+        assert saved["metadata"]["title"] == "First Talk"
+        assert len(saved["moments_with_cuts"]) == 5
+
+
+def test_bundle_streams_in_pieces():
+    result_sets = [{"moments_with_cuts": [make_moment(i) for i in range(400)], "metadata": {"title": "Big"}}]
+    chunks = list(iter_export_bundle(result_sets, formats=("csv", "markdown", "json"), use_processes=False))
+    assert len(chunks) > 3
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+        assert len(zf.namelist()) == 4
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        build_export_bundle(_result_sets(), formats=("csv", "docx"))
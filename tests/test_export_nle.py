@@ -0,0 +1,85 @@
+"""NLE timeline exports: CMX3600 golden file, FCPXML DTD and xmeml structure."""
+
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.export_nle import OFFLINE_MEDIA_DIR, parse_timestamp, source_media_url, to_edl, to_fcpxml, to_premiere_xml
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+MOMENTS = [
+    {"timestamps": "01:05.50–01:40.00", "editor_cut_sheet": {"clip_label": "HOOK_ONE", "in_point": "01:05.50", "out_point": "01:40.00"}},
+    # Invalid cut sheet points fall back to the moment range
+    {"timestamps": "12:00.00–12:30.00", "editor_cut_sheet": {"clip_label": "SECOND", "in_point": "nan", "out_point": "-3"}},
+    {"timestamps": "1:02:03.10–1:02:33.00", "editor_cut_sheet": {"clip_label": "LATE"}},
+    # No usable range at all: skipped
+    {"timestamps": "bad", "editor_cut_sheet": {"in_point": "00:10", "out_point": "00:05"}},
+]
+METADATA = {"title": "Talk", "source_id": "https://www.youtube.com/watch?v=abc123&t=10"}
+
+
+@pytest.mark.parametrize("text", ["nan", "inf", "-1", "01:-05", "-0:10", "1:2:3:4", "", "ab:cd"])
+def test_parse_timestamp_rejects_invalid(text):
+    assert parse_timestamp(text) is None
+
+
+@pytest.mark.parametrize("text,seconds", [("90", 90.0), ("01:30.5", 90.5), ("1:00:01", 3601.0), ("0", 0.0)])
+def test_parse_timestamp_accepts_valid(text, seconds):
+    assert parse_timestamp(text) == seconds
+
+
+def test_edl_matches_golden_cmx3600():
+    with open(os.path.join(FIXTURES, "golden.edl"), encoding="utf-8") as f:
+        assert to_edl(MOMENTS, METADATA) == f.read()
+
+
+def test_source_media_url_is_a_file_url():
+    assert source_media_url(METADATA) == f"file://{OFFLINE_MEDIA_DIR}/abc123.mp4"
+    assert source_media_url({"source_id": "video-My Talk.mov"}) == f"file://{OFFLINE_MEDIA_DIR}/My_Talk.mov"
+    assert source_media_url({"source_id": "talk.srt"}) == f"file://{OFFLINE_MEDIA_DIR}/talk.mp4"
+    assert source_media_url({"media_path": "/media/a b.mp4"}) == "file:///media/a%20b.mp4"
+
+
+def test_fcpxml_validates_against_dtd():
+    etree = pytest.importorskip("lxml.etree")
+    document = to_fcpxml(MOMENTS, METADATA).encode("utf-8")
+    with open(os.path.join(FIXTURES, "fcpxml_1_9_subset.dtd"), "rb") as f:
+        dtd = etree.DTD(f)
+    root = etree.fromstring(document)
+    assert dtd.validate(root), dtd.error_log.filter_from_errors()
+
+    asset = root.find("resources/asset")
+    assert "src" not in asset.attrib
+    assert asset.find("media-rep").get("src") == f"file://{OFFLINE_MEDIA_DIR}/abc123.mp4"
+    assert "name" not in root.find("resources/format").attrib
+    clips = root.findall(".//spine/asset-clip")
+    assert [c.get("name") for c in clips] == ["HOOK_ONE", "SECOND", "LATE"]
+    assert [c.get("offset") for c in clips] == ["0s", "1035/30s", "1935/30s"]
+
+
+def test_premiere_xml_structure():
+    root = ET.fromstring(to_premiere_xml(MOMENTS, METADATA))
+    assert root.tag == "xmeml" and root.get("version") == "4"
+    sequence = root.find("sequence")
+    assert sequence.findtext("rate/timebase") == "30"
+
+    video_items = sequence.findall("media/video/track/clipitem")
+    audio_items = sequence.findall("media/audio/track/clipitem")
+    assert len(video_items) == len(audio_items) == 3
+    # Clipitems sit end to end and their in/out span matches start/end
+    previous_end = 0
+    for item in video_items:
+        start, end = int(item.findtext("start")), int(item.findtext("end"))
+        assert start == previous_end
+        assert end - start == int(item.findtext("out")) - int(item.findtext("in"))
+        previous_end = end
+    assert int(sequence.findtext("duration")) == previous_end
+
+    # The file is described once, then referenced by id
+    files = sequence.findall(".//clipitem/file")
+    assert {f.get("id") for f in files} == {"file-1"}
+    described = [f for f in files if f.find("pathurl") is not None]
+    assert len(described) == 1
+    assert described[0].findtext("pathurl").startswith("file://")
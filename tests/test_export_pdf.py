@@ -0,0 +1,61 @@
+"""PDF export layouts and line wrapping."""
+
+from io import BytesIO
+
+import pytest
+from reportlab.lib.pagesizes import LETTER
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from src.export_utils_pdf import PDF_LAYOUTS, clips_to_pdf, write_pdf
+from tests.conftest import make_moment
+
+
+def _record_draws(monkeypatch):
+    drawn = []
+    original = canvas.Canvas.drawString
+
+    def record(self, x, y, text, *args, **kwargs):
+        drawn.append((x, text, self._fontname))
+        return original(self, x, y, text, *args, **kwargs)
+
+    monkeypatch.setattr(canvas.Canvas, "drawString", record)
+    return drawn
+
+
+def test_simple_layout_continuation_lines_stay_inside_margin(monkeypatch):
+    drawn = _record_draws(monkeypatch)
+    moment = make_moment(0, quote_words=400)
+    write_pdf([moment], BytesIO(), layout="simple")
+
+    right_edge = LETTER[0] - 40  # x_margin on both sides
+    continuation = [d for d in drawn if d[1].startswith("  ") and len(d[1].strip()) > 20]
+    assert continuation, "expected wrapped continuation lines"
+    for x, text, font in drawn:
+        assert x + stringWidth(text, font, 10) <= right_edge + 0.5, text
+
+
+def test_simple_layout_keeps_indentation(monkeypatch):
+    drawn = _record_draws(monkeypatch)
+    write_pdf([make_moment(0, quote_words=400)], BytesIO(), layout="simple")
+    texts = [text for _, text, _ in drawn]
+
+    assert "  In → Out: 00:01.00 → 00:30.00" in texts
+    assert "  Emphasis: GRACE" in texts
+    # The wrapped quote starts at its own indent and continues two spaces deeper
+    start = texts.index("Quote:") + 1
+    quote = texts[start:texts.index("Cut sheet:")]
+    assert len(quote) > 1
+    assert quote[0].startswith("  grace") and not quote[0].startswith("   ")
+    assert all(line.startswith("    grace") for line in quote[1:])
+
+
+@pytest.mark.parametrize("layout", PDF_LAYOUTS)
+def test_every_layout_renders(layout):
+    pdf = clips_to_pdf([make_moment(i) for i in range(3)], {"title": "Test"}, layout=layout)
+    assert pdf.startswith(b"%PDF") and b"%%EOF" in pdf[-1024:]
+
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(ValueError):
+        clips_to_pdf([make_moment(0)], layout="poster")
@@ -0,0 +1,65 @@
+"""Streaming export writers keep peak memory bounded."""
+
+import tracemalloc
+
+from src.export_utils import iter_csv, iter_markdown
+from src.export_utils_pdf import clips_to_pdf, iter_pdf
+from tests.conftest import make_moment
+
+
+def _moments(n):
+    return (make_moment(i) for i in range(n))
+
+
+def _peak_bytes(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _drain(chunks):
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+    return total
+
+
+def test_csv_peak_memory_is_flat():
+    small = _peak_bytes(lambda: _drain(iter_csv(_moments(500))))
+    large = _peak_bytes(lambda: _drain(iter_csv(_moments(8000))))
+    # 16x the rows; the peak must not grow with them
+    assert large < small + 64 * 1024
+    assert large < 512 * 1024
+
+
+def test_markdown_peak_memory_is_flat():
+    small = _peak_bytes(lambda: _drain(iter_markdown(_moments(500))))
+    large = _peak_bytes(lambda: _drain(iter_markdown(_moments(8000))))
+    assert large < small + 64 * 1024
+    assert large < 512 * 1024
+
+
+def test_csv_stream_matches_row_count():
+    text = "".join(iter_csv(_moments(50)))
+    # Header + one line per clip (quotes contain no newlines)
+    assert len(text.strip().splitlines()) == 51
+
+
+def test_iter_pdf_adds_no_second_copy():
+    moments = [make_moment(i) for i in range(1000)]
+    size = {}
+
+    def stream():
+        size["pdf"] = _drain(iter_pdf(moments))
+
+    streamed = _peak_bytes(stream)
+    buffered = _peak_bytes(lambda: clips_to_pdf(moments))
+
+    # reportlab keeps page objects until save(), so PDF memory is linear in
+    # pages; streaming must not add a full in-memory copy on top of that.
+    assert streamed <= buffered + 256 * 1024
+    assert streamed < 2 * 1024 * 1024 + 8 * 1024 * len(moments)
+    assert size["pdf"] > 0
@@ -0,0 +1,83 @@
+"""Per-clip subtitles from a shared transcript index."""
+
+import src.export_subtitles as export_subtitles
+from src.export_subtitles import build_clip_subtitles, build_transcript_index
+
+TRANSCRIPT = "\n".join(
+    f"[{i // 60:02d}:{i % 60:02d}.00–{(i + 4) // 60:02d}:{(i + 4) % 60:02d}.00] sentence number {i} about grace"
+    for i in range(0, 240, 4)
+)
+MOMENTS = [
+    {"editor_cut_sheet": {"clip_label": "ONE", "in_point": "00:20.00", "out_point": "00:40.00",
+                          "emphasis_words_caps": ["GRACE"], "opening_hook_subtitle": "Grace first"}},
+    {"editor_cut_sheet": {"clip_label": "TWO", "in_point": "02:00.00", "out_point": "02:30.00"}},
+]
+
+
+def test_index_is_parsed_once_for_both_formats(monkeypatch):
+    calls = []
+    original = export_subtitles.parse_timestamped_transcript
+
+    def counting(text):
+        calls.append(text)
+        return original(text)
+
+    monkeypatch.setattr(export_subtitles, "parse_timestamped_transcript", counting)
+    index = build_transcript_index(TRANSCRIPT)
+    srt = build_clip_subtitles(MOMENTS, index, "srt")
+    vtt = build_clip_subtitles(MOMENTS, index, "vtt")
+
+    assert len(calls) == 1
+    assert list(srt) == ["01_ONE.srt", "02_TWO.srt"]
+    assert list(vtt) == ["01_ONE.vtt", "02_TWO.vtt"]
+    assert vtt["01_ONE.vtt"].startswith("WEBVTT")
+    assert "GRACE" in srt["01_ONE.srt"]
+
+
+def test_index_gives_same_files_as_raw_transcript():
+    index = build_transcript_index(TRANSCRIPT)
+    for fmt in ("srt", "vtt"):
+        assert build_clip_subtitles(MOMENTS, index, fmt) == build_clip_subtitles(MOMENTS, TRANSCRIPT, fmt)
+
+
+def _cues(srt):
+    """(timing line, text) pairs of an SRT file."""
+    return [tuple(block.splitlines()[1:3]) for block in srt.strip().split("\n\n")]
+
+
+def test_cues_are_retimed_and_clipped_to_the_clip_range():
+    transcript = "\n".join([
+        "[00:16.00–00:20.00] before the clip",
+        "[00:20.00–00:24.00] a graceful opening about grace",
+        "[00:24.00–00:28.00] Grace builds on nature",
+        "[00:28.00–00:32.00] past the out point",
+    ])
+    moment = {"editor_cut_sheet": {"clip_label": "MID", "in_point": "00:21.00", "out_point": "00:30.50",
+                                   "emphasis_words_caps": ["grace"]}}
+
+    srt = build_clip_subtitles([moment], transcript, "srt")["01_MID.srt"]
+
+    assert _cues(srt) == [
+        ("00:00:00,000 --> 00:00:03,000", "a graceful opening about GRACE"),
+        ("00:00:03,000 --> 00:00:07,000", "GRACE builds on nature"),
+        ("00:00:07,000 --> 00:00:09,500", "past the out point"),
+    ]
+
+
+def test_hook_cue_is_capped_at_clip_length_and_placed_at_the_top():
+    moment = {"editor_cut_sheet": {"clip_label": "HOOK", "in_point": "00:20.00", "out_point": "00:22.00",
+                                   "opening_hook_subtitle": "Grace first", "emphasis_words_caps": ["GRACE"]}}
+
+    vtt = build_clip_subtitles([moment], TRANSCRIPT, "vtt")["01_HOOK.vtt"]
+
+    assert "00:00:00.000 --> 00:00:02.000 line:10%\nGRACE first" in vtt
+
+
+def test_clips_without_a_usable_range_give_no_files():
+    moments = [
+        {"editor_cut_sheet": {"clip_label": "NA", "in_point": "N/A", "out_point": "N/A"}},
+        {"editor_cut_sheet": {"clip_label": "BACKWARDS", "in_point": "00:40.00", "out_point": "00:20.00"}},
+    ]
+
+    assert build_clip_subtitles(moments, TRANSCRIPT, "srt") == {}
+    assert build_clip_subtitles(moments, TRANSCRIPT, "vtt") == {}
@@ -0,0 +1,78 @@
+"""Shared HTTP client registry: reuse, HTTP/2 fallback and lifecycle."""
+
+import importlib.util
+import threading
+
+import httpx
+import pytest
+
+from src import http_clients
+from src.http_clients import ClientRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(http_clients, "_registry", None)
+    registry = ClientRegistry()
+    yield registry
+    registry.close()
+
+
+def test_clients_are_built_once_and_reused(registry, monkeypatch):
+    builds = []
+    build = ClientRegistry._build_openai
+    monkeypatch.setattr(ClientRegistry, "_build_openai", staticmethod(lambda: builds.append(1) or build()))
+    http_clients.set_registry(registry)
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(http_clients.get_openai_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert all(client is seen[0] for client in seen)
+    assert http_clients.get_apify_session() is http_clients.get_apify_session() is registry.apify_session()
+
+
+def test_openai_client_falls_back_to_http1_without_h2(registry, monkeypatch):
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *args: None)
+
+    assert not http_clients.http2_available()
+    assert registry.openai()._client._transport._pool._http2 is False
+
+
+def test_openai_client_asks_for_http2_when_h2_is_installed(registry, monkeypatch):
+    requested = []
+
+    class RecordingClient(httpx.Client):
+        def __init__(self, *args, http2=False, **kwargs):
+            requested.append(http2)
+            super().__init__(*args, **kwargs)  # h2 itself may not be installed here
+
+    monkeypatch.setattr(http_clients, "http2_available", lambda: True)
+    monkeypatch.setattr(httpx, "Client", RecordingClient)
+    registry.openai()
+
+    assert requested == [True]
+
+
+def test_close_releases_pools_and_next_use_rebuilds(registry):
+    openai_client, session = registry.openai(), registry.apify_session()
+    http_client = openai_client._client
+
+    registry.close()
+
+    assert http_client.is_closed
+    assert registry.openai() is not openai_client
+    assert registry.apify_session() is not session
+
+
+def test_get_registry_is_a_singleton_until_replaced(registry):
+    default = http_clients.get_registry()
+    assert http_clients.get_registry() is default
+
+    http_clients.set_registry(registry)
+    assert http_clients.get_registry() is registry
@@ -0,0 +1,21 @@
+"""The app module must import without loading heavy or optional dependencies."""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("numpy", "reportlab", "openai", "httpx")
+
+
+def test_app_import_keeps_heavy_dependencies_lazy():
+    # A fresh interpreter: other tests in this session import these modules
+    code = (
+        "import json, sys\n"
+        "import src.app_streamlit\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
@@ -0,0 +1,100 @@
+"""Chunk prompts and scheduling for moment extraction."""
+
+import json
+from dataclasses import replace
+
+import pytest
+
+from src import config
+from src.extraction import parse_moment_response
+from src.llm_client import _schedule_chunks, build_chunk_prompt, encode_chunk_compact
+
+# One chunk per 5-second intensity window; the second is the longest
+CHUNKS = [
+    "[00:00.00–00:04.00] opening remarks",
+    "[00:05.00–00:09.00] the loud and animated middle section of the talk",
+    "[00:10.00–00:14.00] closing",
+]
+INTENSITY = {"window_seconds": 5.0, "scores": [0.2, 0.4, 0.8]}
+
+
+def _run_config(skip_below=0.0):
+    return replace(config.default_run_config(), intensity_skip_below=skip_below)
+
+
+def test_without_intensity_longest_chunks_go_first():
+    assert _schedule_chunks(CHUNKS, None, _run_config()) == [2, 1, 3]
+    assert _schedule_chunks([], INTENSITY, _run_config()) == []
+
+
+def test_intensity_orders_hottest_first_and_skips_flat_chunks():
+    assert _schedule_chunks(CHUNKS, INTENSITY, _run_config()) == [3, 2, 1]
+    assert _schedule_chunks(CHUNKS, INTENSITY, _run_config(0.3)) == [3, 2]
+
+
+def test_hottest_chunk_is_kept_when_everything_is_below_threshold():
+    assert _schedule_chunks(CHUNKS, INTENSITY, _run_config(0.95)) == [3]
+
+
+LINES = [
+    "[00:00.00–00:04.50] Grace does not destroy nature.",
+    "[00:04.50–00:09.00] It perfects it.",
+    "[00:09.00–00:14.25] Every saint has a past.",
+    "[00:14.25–00:20.00] And every sinner has a future.",
+    "[01:05.00–01:09.00] Confession is a hospital.",
+]
+
+
+def _compact_answer(lines_ref, line_map):
+    response = json.dumps({"moments": [{
+        "lines": lines_ref,
+        "viral_trigger": "Contrast",
+        "editor_cut_sheet": {"clip_label": "SAINTS", "in_point": "", "out_point": "", "aspect_ratio": "9:16"},
+    }]})
+    return parse_moment_response(response, expect_cut_sheet=True, line_map=line_map)
+
+
+def test_compact_encoding_uses_line_ids_and_sparse_anchors():
+    encoded, line_map = encode_chunk_compact("\n".join(LINES), anchor_seconds=60)
+
+    assert encoded.splitlines() == [
+        "@00:00", "L1 Grace does not destroy nature.", "L2 It perfects it.", "L3 Every saint has a past.",
+        "L4 And every sinner has a future.", "@01:05", "L5 Confession is a hospital.",
+    ]
+    assert line_map["L3"] == {"start": 9.0, "end": 14.25, "text": "Every saint has a past."}
+    assert "[" not in encoded
+
+
+def test_plain_chunks_are_sent_unchanged():
+    chunk = "No timestamps here.\nJust text."
+    assert encode_chunk_compact(chunk) == (chunk, {})
+    run_config = replace(config.default_run_config(), compact_prompts=True)
+    prompt, line_map = build_chunk_prompt(chunk, 1, 1, run_config)
+    assert prompt.endswith(chunk) and line_map == {}
+
+
+@pytest.mark.parametrize("lines_ref", ["L2-L4", "L4-L2", "L2, L3, L4"])
+def test_compact_answer_round_trips_to_timestamps_and_in_out_points(lines_ref):
+    _, line_map = encode_chunk_compact("\n".join(LINES))
+
+    (moment,) = _compact_answer(lines_ref, line_map)
+
+    assert moment["timestamps"] == "00:04.50-00:20.00"
+    assert moment["clip_duration_seconds"] == 16
+    assert moment["quote"] == "It perfects it. Every saint has a past. And every sinner has a future."
+    assert moment["editor_cut_sheet"]["in_point"] == "00:04.50"
+    assert moment["editor_cut_sheet"]["out_point"] == "00:20.00"
+
+
+def test_out_of_range_line_ids_are_clamped_or_ignored():
+    _, line_map = encode_chunk_compact("\n".join(LINES))
+
+    (moment,) = _compact_answer("L4-L99", line_map)
+    assert moment["timestamps"] == "00:14.25-01:09.00"
+    assert moment["editor_cut_sheet"]["out_point"] == "01:09.00"
+
+    (moment,) = _compact_answer("L0-L1", line_map)
+    assert moment["timestamps"] == "00:00.00-00:04.50"
+
+    # Nothing inside the chunk: no quote to restore, so the moment is dropped
+    assert _compact_answer("L40-L60", line_map) == []
@@ -0,0 +1,87 @@
+"""Lexical pre-filter scoring, span removal and placeholder handling."""
+
+from src.extraction import parse_moment_response
+from src.llm_client import encode_chunk_compact
+from src.prefilter import prefilter_transcript, score_lines
+from src.transcript_utils import is_omitted_span, parse_timestamped_line, seconds_to_timestamp
+
+SERMON = [
+    "The Eucharist is the source and summit of the Christian life, and Christ is truly present.",
+    "Grace does not destroy nature but perfects it, and every soul is made for heaven.",
+    "Why would God become man unless our salvation actually mattered to him?",
+]
+LOGISTICS = [
+    "Quick announcements before we start.",
+    "Parking lot is closed on Sunday.",
+    "Coffee and donuts are in the hall.",
+    "Registration is on the website.",
+    "Um uh the bulletin has the schedule.",
+    "Volunteers please see the link in the description.",
+]
+
+
+def _timestamped(texts, start=0.0, step=5.0):
+    return "\n".join(
+        f"[{seconds_to_timestamp(start + i * step)}–{seconds_to_timestamp(start + (i + 1) * step)}] {text}"
+        for i, text in enumerate(texts)
+    )
+
+
+def test_score_lines_ranks_doctrine_above_logistics():
+    scores, lexicon = score_lines(SERMON + LOGISTICS)
+
+    assert len(scores) == len(lexicon) == len(SERMON) + len(LOGISTICS)
+    assert min(scores[:len(SERMON)]) > max(scores[-3:])
+    assert lexicon[0] > 1.0 > lexicon[-1]
+
+
+def test_score_lines_handles_empty_input():
+    scores, lexicon = score_lines([])
+    assert len(scores) == len(lexicon) == 0
+
+
+def test_prefilter_collapses_logistics_and_keeps_kept_lines_exact():
+    transcript = _timestamped(SERMON + LOGISTICS + SERMON)
+
+    filtered, report = prefilter_transcript(transcript, drop_quantile=0.5, collapse=True)
+
+    lines = filtered.splitlines()
+    placeholders = [line for line in lines if is_omitted_span(parse_timestamped_line(line)["text"])]
+    assert report.spans_removed == len(placeholders) == 1
+    removed = set(transcript.splitlines()) - set(lines)
+    assert {parse_timestamped_line(line)["text"] for line in removed} <= set(LOGISTICS)
+    assert report.lines_kept == report.lines_in - len(removed) >= report.lines_in - len(LOGISTICS)
+    assert set(lines) - set(placeholders) <= set(transcript.splitlines())
+    placeholder = parse_timestamped_line(placeholders[0])
+    assert placeholder["start"] >= 15.0 and placeholder["end"] <= 45.0
+    assert report.chars_out < report.chars_in
+
+
+def test_prefilter_can_drop_without_placeholder_or_do_nothing():
+    transcript = _timestamped(SERMON + LOGISTICS + SERMON)
+
+    dropped, report = prefilter_transcript(transcript, drop_quantile=0.5, collapse=False)
+    assert report.spans_removed == 1
+    assert not any("omitted" in line for line in dropped.splitlines())
+
+    unchanged, report = prefilter_transcript(transcript, drop_quantile=0.0)
+    assert unchanged == transcript and report.spans_removed == 0
+
+
+def test_placeholders_never_reach_line_map_or_quotes():
+    transcript = _timestamped(SERMON + LOGISTICS + SERMON)
+    filtered, report = prefilter_transcript(transcript, drop_quantile=0.5, collapse=True)
+
+    encoded, line_map = encode_chunk_compact(filtered)
+    assert len(line_map) == report.lines_kept
+    assert not any(is_omitted_span(seg["text"]) for seg in line_map.values())
+    assert "low-value lines omitted" in encoded
+
+    # A compact answer spanning the gap only quotes spoken lines
+    moments = parse_moment_response(f'{{"moments": [{{"lines": "L1-L{len(line_map)}"}}]}}', line_map=line_map)
+    assert "omitted" not in moments[0]["quote"]
+    assert moments[0]["quote"].endswith(SERMON[-1])
+
+    # A model copying the placeholder into a verbatim quote gets it stripped
+    response = '{"moments": [{"quote": "Grace perfects nature. [… 6 low-value lines omitted …] Why would God", "timestamps": "00:10.00-00:50.00"}]}'
+    assert parse_moment_response(response)[0]["quote"] == "Grace perfects nature. Why would God"
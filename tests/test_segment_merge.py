@@ -0,0 +1,77 @@
+"""Sentence-level merging of rolling auto-caption fragments."""
+
+from src.segment_merge import merge_caption_fragments
+
+
+def _frag(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+
+def test_pause_ends_a_sentence_with_a_full_stop():
+    fragments = [
+        _frag(0.0, 2.0, "we are going"),
+        _frag(2.0, 4.0, "going to the store"),
+        _frag(6.0, 8.0, "then we went home"),
+    ]
+
+    merged = merge_caption_fragments(fragments, pause_seconds=1.0)
+
+    assert merged == [
+        _frag(0.0, 4.0, "We are going to the store."),
+        _frag(6.0, 8.0, "Then we went home."),
+    ]
+
+
+def test_length_splits_get_no_period_or_capital():
+    fragments = [
+        _frag(0.0, 1.0, "grace builds on"),
+        _frag(1.0, 2.0, "nature and perfects"),
+        _frag(2.0, 3.0, "it in every soul"),
+    ]
+
+    by_chars = merge_caption_fragments(fragments, pause_seconds=5.0, max_chars=20, max_seconds=60.0)
+    by_seconds = merge_caption_fragments(fragments, pause_seconds=5.0, max_chars=500, max_seconds=2.5)
+
+    for merged in (by_chars, by_seconds):
+        # The split continues a sentence; only the end of the input gets a full stop
+        assert [s["text"] for s in merged] == ["Grace builds on nature and perfects", "it in every soul."]
+        assert [(s["start"], s["end"]) for s in merged] == [(0.0, 2.0), (2.0, 3.0)]
+
+
+def test_pure_repeat_only_extends_the_end():
+    fragments = [
+        _frag(0.0, 2.0, "we are going"),
+        _frag(2.0, 3.5, "we are going"),
+        _frag(3.5, 4.0, "are going"),
+    ]
+
+    assert merge_caption_fragments(fragments, pause_seconds=1.0) == [_frag(0.0, 4.0, "We are going.")]
+
+
+def test_consecutive_segments_are_clipped_so_they_never_overlap():
+    fragments = [
+        _frag(0.0, 5.0, "the first thought ends here."),
+        _frag(3.0, 6.0, "a second one starts early"),
+        _frag(5.5, 7.0, "and keeps going."),
+    ]
+
+    merged = merge_caption_fragments(fragments, pause_seconds=1.0)
+
+    assert [(s["start"], s["end"]) for s in merged] == [(0.0, 3.0), (3.0, 7.0)]
+    for current, following in zip(merged, merged[1:]):
+        assert current["end"] <= following["start"]
+
+
+def test_empty_and_whitespace_fragments_are_skipped():
+    fragments = [
+        _frag(0.0, 1.0, "we are"),
+        _frag(1.0, 9.0, ""),
+        _frag(1.0, 9.0, "   \n"),
+        {"start": 1.0, "end": 9.0},
+        _frag(1.2, 2.0, "here now"),
+    ]
+
+    merged = merge_caption_fragments(fragments, pause_seconds=1.0)
+
+    assert merged == [_frag(0.0, 2.0, "We are here now.")]
+    assert merge_caption_fragments([_frag(0.0, 1.0, " ")]) == []